@@ -0,0 +1,103 @@
+"""
+Cleaning Benchmark
+Lines/sec of PDFLoader._remove_legal_bloat on a synthetic 500-page corpus,
+before (per-line loop over 15 markers + 15 uncompiled re.search calls) and after
+(one precompiled combined regex). Both must produce identical output.
+
+    python -m benchmarks.bench_cleaning [--pages 500]
+"""
+import argparse
+import random
+import re
+import time
+from src.ingestion.pdf_loader import PDFLoader
+
+BODY_LINES = [
+    "Data center revenue grew 154% y/y to $26.3bn, ahead of consensus.",
+    "We raise our FY25 EPS estimate to $2.95 from $2.60.",
+    "Gross margin expanded 320bps on mix and pricing.",
+    "Supply constraints on CoWoS capacity ease through 2H.",
+    "Hyperscaler capex guides imply another year of 40%+ growth.",
+    "Our $140 price target implies 35x CY25 EPS.",
+    "Inventory days fell to 77 from 89 last quarter.",
+    "",
+]
+NOISE_LINES = [
+    "Page {n} of 500", "Copyright 2024", "All rights reserved", "Strictly Private & Confidential",
+    "From: analyst@bank.com", "Source: Bloomberg Research", "View in browser",
+]
+
+
+def synthetic_corpus(pages: int, lines_per_page: int = 60, seed: int = 7) -> str:
+    """Report-like text: body lines with page furniture, disclosures on the last page."""
+    rng = random.Random(seed)
+    out = []
+    for n in range(1, pages + 1):
+        for _ in range(lines_per_page - 2):
+            out.append(rng.choice(BODY_LINES))
+        out.append(rng.choice(NOISE_LINES).format(n=n))
+        out.append(f"  Page {n} of {pages}  ")
+    out.append("Important Disclosures")
+    out.extend(["This report is for institutional investors only."] * 200)
+    return "\n".join(out)
+
+
+def legacy_remove_legal_bloat(loader: PDFLoader, text: str) -> str:
+    """The original implementation, kept verbatim as the baseline."""
+    lines = text.split('\n')
+    cleaned_lines = []
+    stop_triggered = False
+    for line in lines:
+        line_strip = line.strip()
+        for marker in loader.LEGAL_STOP_MARKERS:
+            if marker.lower() in line_strip.lower() and len(line_strip) < 100:
+                stop_triggered = True
+                break
+        if stop_triggered: break
+        is_noise = False
+        for pattern in loader.NOISE_PATTERNS:
+            if re.search(pattern, line_strip, re.IGNORECASE):
+                is_noise = True
+                break
+        if not is_noise and line_strip:
+            cleaned_lines.append(line_strip)
+    return "\n".join(cleaned_lines)
+
+
+def _time(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(pages: int = 500, repeat: int = 3) -> dict:
+    loader = PDFLoader(entity_file="__no_entities__.json")
+    text = synthetic_corpus(pages)
+    n_lines = text.count("\n") + 1
+
+    assert loader._remove_legal_bloat(text) == legacy_remove_legal_bloat(loader, text), "outputs differ"
+
+    before = _time(lambda t: legacy_remove_legal_bloat(loader, t), text, repeat)
+    after = _time(loader._remove_legal_bloat, text, repeat)
+    return {
+        "pages": pages,
+        "lines": n_lines,
+        "before_lines_per_s": round(n_lines / before),
+        "after_lines_per_s": round(n_lines / after),
+        "speedup": round(before / after, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    result = run(args.pages, args.repeat)
+    print(f"🧹 Cleaning {result['lines']:,} lines ({result['pages']} pages)")
+    print(f"   before: {result['before_lines_per_s']:>12,} lines/s")
+    print(f"   after:  {result['after_lines_per_s']:>12,} lines/s  ({result['speedup']}x)")
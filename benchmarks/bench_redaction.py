@@ -0,0 +1,96 @@
+"""
+Redaction Benchmark
+Legacy per-entity re.sub loop vs the single-pass trie EntityRedactor on a synthetic
+banned-entity list and report corpus. Both must produce identical output.
+
+    python -m benchmarks.bench_redaction [--entities 10000] [--pages 50]
+"""
+import argparse
+import random
+import re
+import string
+import tempfile
+import time
+from benchmarks.bench_cleaning import synthetic_corpus
+from src.ingestion import redactor as redactor_module
+from src.ingestion.redactor import EntityRedactor
+
+
+def synthetic_entities(n: int, seed: int = 11) -> list:
+    """Analyst-style 'First Last' names plus a few bank names."""
+    rng = random.Random(seed)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))).capitalize()
+
+    names = {f"{word()} {word()}" for _ in range(n)}
+    return sorted(names)[:n]
+
+
+def corpus_with_mentions(entities: list, pages: int, mentions: int = 300, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    lines = synthetic_corpus(pages).split("\n")
+    for _ in range(mentions):
+        i = rng.randrange(len(lines))
+        name = rng.choice(entities)
+        lines[i] = f"{lines[i]} Analyst: {rng.choice([name, name.upper(), name.lower()])}"
+    return "\n".join(lines)
+
+
+def legacy_redact(entities: list, text: str) -> str:
+    """The original implementation, kept verbatim as the baseline."""
+    redacted_text = text
+    for entity in entities:
+        pattern = re.compile(re.escape(entity), re.IGNORECASE)
+        redacted_text = pattern.sub("[REDACTED_ENTITY]", redacted_text)
+    return redacted_text
+
+
+def run(n_entities: int = 10000, pages: int = 50) -> dict:
+    entities = synthetic_entities(n_entities)
+    text = corpus_with_mentions(entities, pages)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        cold = EntityRedactor(entities, cache_dir=cache_dir)
+        cold.regex()
+        build_s = time.perf_counter() - start
+
+        redactor_module._compiled.clear()  # new process: pattern comes from the disk cache
+        re.purge()
+        start = time.perf_counter()
+        warm = EntityRedactor(entities, cache_dir=cache_dir)
+        warm.regex()
+        load_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        after_out = warm.redact(text)
+        after_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    before_out = legacy_redact(entities, text)
+    before_s = time.perf_counter() - start
+
+    assert after_out == before_out, "outputs differ"
+    return {
+        "entities": len(entities),
+        "chars": len(text),
+        "build_s": round(build_s, 3),
+        "cached_load_s": round(load_s, 3),
+        "before_s": round(before_s, 3),
+        "after_s": round(after_s, 3),
+        "speedup": round(before_s / after_s, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entities", type=int, default=10000)
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    result = run(args.entities, args.pages)
+    print(f"🕵️ Redacting {result['chars']:,} chars against {result['entities']:,} entities")
+    print(f"   pattern build: {result['build_s']}s (cold)  /  {result['cached_load_s']}s (disk cache)")
+    print(f"   before: {result['before_s']:>8}s")
+    print(f"   after:  {result['after_s']:>8}s  ({result['speedup']}x)")
@@ -0,0 +1,350 @@
+"""
+Local stand-ins for external services (no network, no API key).
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import default as email_policy
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DIMENSION = {"score": 4, "reasoning": "Solid", "quote_verbatim": "We rate Buy.", "red_flags": []}
+
+SCORE_RESPONSE = {
+    "verdict": "STRONG",
+    "confidence_score": 80,
+    "thesis_logic": DIMENSION,
+    "catalyst_quality": DIMENSION,
+    "risk_analysis": DIMENSION,
+    "professional_standards": DIMENSION,
+    "pm_perspective": {
+        "variant_view": "Margins are underappreciated.",
+        "bear_case": "Demand pull-forward.",
+        "catalyst_timing": "Q3 earnings",
+        "pre_mortem": "Hyperscaler capex cut.",
+        "mosaic_data_points": ["Channel checks"],
+        "decision": "INVESTIGATE",
+    },
+    "improvement_plan": ["Add a DCF"],
+}
+
+MACRO_REPORT = {
+    "topic": "China Agriculture",
+    "summary": "Self-sufficiency is improving.",
+    "variant_view": "Exports, not imports, are the story.",
+    "bear_case": "Climate shock.",
+    "top_5_ideas": [{"name": "Seed Security", "type": "Theme", "rationale": "Breeding push"}],
+    "key_stats": [{"metric": "Grain output", "value": "695m tons", "context": "2023"}],
+    "investment_implication": "Own ag-tech.",
+}
+
+CANNED = {"ScoreResponse": SCORE_RESPONSE, "MacroReport": MACRO_REPORT}
+
+
+class FakeOpenAIServer:
+    """
+    Minimal /chat/completions endpoint. Answers structured-output requests with
+    canned payloads keyed on the response_format schema name. Also serves the
+    /files and /batches endpoints used by batch mode.
+
+    latency:     seconds to sleep per request
+    fail_first:  number of initial requests answered with `fail_status`
+    """
+
+    def __init__(self, latency: float = 0.0, fail_first: int = 0, fail_status: int = 429):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.requests = []
+        # Batch API state
+        self.files = {}      # file id -> bytes
+        self.batches = {}    # batch id -> batch object
+        self.batch_polls_until_done = 1
+        self.max_concurrent = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.startswith("/v1/batches/"):
+                    self._send(200, fake.poll_batch(self.path.rsplit("/", 1)[-1]))
+                elif self.path.startswith("/v1/files/") and self.path.endswith("/content"):
+                    body = fake.files[self.path.split("/")[3]]
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self._send(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length)
+                if self.path.endswith("/files"):
+                    self._send(200, fake.upload(self.headers.get("Content-Type"), raw))
+                    return
+                if self.path.endswith("/batches"):
+                    self._send(200, fake.create_batch(json.loads(raw)))
+                    return
+                request = json.loads(raw or b"{}")
+                with fake._lock:
+                    fake.requests.append(request)
+                    n = len(fake.requests)
+                    fake._active += 1
+                    fake.max_concurrent = max(fake.max_concurrent, fake._active)
+                try:
+                    time.sleep(fake.latency)
+                    if n <= fake.fail_first:
+                        self._send(fake.fail_status, {"error": {"message": "slow down", "type": "rate_limit"}})
+                        return
+                    self._send(200, fake.completion(request))
+                finally:
+                    with fake._lock:
+                        fake._active -= 1
+
+        return Handler
+
+    def completion(self, request: dict) -> dict:
+        schema = request.get("response_format", {}).get("json_schema", {}).get("name", "")
+        content = CANNED.get(schema, {})
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(content)},
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150},
+        }
+
+    # --- Batch API stand-in ---
+    def upload(self, content_type: str, raw: bytes) -> dict:
+        message = BytesParser(policy=email_policy).parsebytes(
+            b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + raw
+        )
+        data = next(p.get_payload(decode=True) for p in message.iter_parts()
+                    if p.get_param("name", header="content-disposition") == "file")
+        file_id = f"file-{uuid.uuid4().hex[:8]}"
+        self.files[file_id] = data
+        return {"id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+                "filename": "requests.jsonl", "purpose": "batch", "status": "processed"}
+
+    def create_batch(self, params: dict) -> dict:
+        """Answers every line up front; the batch reports `in_progress` for a few polls first."""
+        lines = [json.loads(line) for line in self.files[params["input_file_id"]].splitlines() if line.strip()]
+        output = "\n".join(json.dumps({
+            "id": f"req-{i}",
+            "custom_id": line["custom_id"],
+            "response": {"status_code": 200, "body": self.completion(line["body"])},
+            "error": None,
+        }) for i, line in enumerate(lines))
+        output_id = f"file-{uuid.uuid4().hex[:8]}"
+        self.files[output_id] = output.encode()
+
+        batch_id = f"batch_{uuid.uuid4().hex[:8]}"
+        self.batches[batch_id] = {
+            "batch": {
+                "id": batch_id, "object": "batch", "endpoint": params["endpoint"],
+                "input_file_id": params["input_file_id"], "completion_window": params["completion_window"],
+                "status": "validating", "created_at": int(time.time()), "output_file_id": None,
+                "request_counts": {"total": len(lines), "completed": 0, "failed": 0},
+            },
+            "output_file_id": output_id,
+            "polls": 0,
+        }
+        return self.batches[batch_id]["batch"]
+
+    def poll_batch(self, batch_id: str) -> dict:
+        entry = self.batches[batch_id]
+        entry["polls"] += 1
+        batch = entry["batch"]
+        if entry["polls"] > self.batch_polls_until_done:
+            counts = batch["request_counts"]
+            batch.update(status="completed", output_file_id=entry["output_file_id"],
+                         request_counts={**counts, "completed": counts["total"]})
+        else:
+            batch["status"] = "in_progress"
+        return batch
+
+
+# --- SEC EDGAR stand-in ---
+SEC_TICKERS = {
+    "0": {"cik_str": 1045810, "ticker": "NVDA", "title": "NVIDIA CORP"},
+    "1": {"cik_str": 1652044, "ticker": "GOOGL", "title": "Alphabet Inc."},
+    "2": {"cik_str": 1652044, "ticker": "GOOG", "title": "Alphabet Inc."},
+    "3": {"cik_str": 1730168, "ticker": "AVGO", "title": "Broadcom Inc."},
+    "4": {"cik_str": 1045811, "ticker": "NVEC", "title": "NVE CORP"},
+}
+
+
+def company_facts(cik: int, name: str, revenues: dict) -> dict:
+    """Minimal companyfacts payload: {fiscal_year: revenue} as 10-K USD facts."""
+    return {
+        "cik": cik,
+        "entityName": name,
+        "facts": {"us-gaap": {"Revenues": {"label": "Revenues", "units": {"USD": [
+            {"start": f"{fy - 1}-02-01", "end": f"{fy}-01-31", "val": val, "fy": fy, "fp": "FY",
+             "form": "10-K", "filed": f"{fy}-03-01", "accn": f"0001045810-{fy % 100:02d}-000001"}
+            for fy, val in revenues.items()
+        ]}}}},
+    }
+
+
+class FakeSECServer:
+    """
+    Serves /files/company_tickers.json and /api/xbrl/companyfacts/CIK##########.json
+    with ETags (If-None-Match -> 304). Records (path, If-None-Match, time) per request.
+
+    fail_first: number of initial requests answered 429 with Retry-After: 0
+    latency:    seconds to sleep per request
+    """
+
+    def __init__(self, facts: dict = None, fail_first: int = 0, latency: float = 0.0):
+        self.tickers = SEC_TICKERS
+        self.facts = facts if facts is not None else {
+            "0001045810": company_facts(1045810, "NVIDIA CORP", {2023: 26_974_000_000, 2024: 60_922_000_000}),
+        }
+        self.fail_first = fail_first
+        self.latency = latency
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def tickers_url(self) -> str:
+        return self.base_url + "/files/company_tickers.json"
+
+    @property
+    def facts_url(self) -> str:
+        return self.base_url + "/api/xbrl/companyfacts/CIK{cik}.json"
+
+    def paths(self, prefix: str = "") -> list:
+        return [r[0] for r in self.requests if r[0].startswith(prefix)]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests.append((self.path, self.headers.get("If-None-Match"), time.monotonic()))
+                    n = len(fake.requests)
+                time.sleep(fake.latency)
+                if n <= fake.fail_first:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if self.path == "/files/company_tickers.json":
+                    payload = fake.tickers
+                elif self.path.startswith("/api/xbrl/companyfacts/CIK"):
+                    payload = fake.facts.get(self.path.rsplit("CIK", 1)[-1].split(".")[0])
+                else:
+                    payload = None
+                if payload is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                body = json.dumps(payload).encode()
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+# --- Yahoo Finance stand-in ---
+YAHOO_INFO = {
+    "NVDA": {"currentPrice": 120.5, "marketCap": 2.9e12, "targetMeanPrice": 140.0, "forwardEps": 2.95},
+    "AAPL": {"regularMarketPrice": 225.0, "marketCap": 3.4e12, "targetMeanPrice": 240.0, "forwardEps": 7.1},
+}
+
+
+class FakeYFinance:
+    """Stands in for the yfinance module: Ticker(symbol).info, with latency and a call log."""
+
+    def __init__(self, latency: float = 0.0, info: dict = None):
+        self.latency = latency
+        self.info = YAHOO_INFO if info is None else info
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def Ticker(self, symbol):
+        stub = self
+
+        class _Ticker:
+            @property
+            def info(self):
+                with stub._lock:
+                    stub.calls.append(symbol)
+                time.sleep(stub.latency)
+                if symbol not in stub.info:
+                    raise ValueError(f"no data for {symbol}")
+                return stub.info[symbol]
+
+        return _Ticker()
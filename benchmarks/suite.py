@@ -0,0 +1,342 @@
+"""
+Benchmark Suite
+Offline, reproducible performance run: synthetic PDFs, plus local stand-ins for OpenAI,
+SEC EDGAR and Yahoo (benchmarks/fakes.py) with configurable latency. Measures
+
+    ingestion    PDF extract -> clean -> redact, docs/s (serial and process pool)
+    cleaning     legal-bloat removal, lines/s
+    redaction    banned-entity scrub, lines/s
+    tickers      ticker extraction, docs/s
+    validator    claim extraction + SEC/Yahoo checks, ms/doc (cold and warm caches)
+    pipeline     routing + validation + LLM judge end to end, docs/min
+
+Each run is appended to a JSONL history (BENCH_HISTORY, default
+data/benchmarks/history.jsonl) and compared with the last run of the same config.
+
+    python -m benchmarks.suite [--docs 24] [--pages 8] [--llm-latency 0.2] [--quick]
+    python -m benchmarks.suite --compare-only
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+# Metrics tracked across runs (by name suffix); throughputs are higher-is-better
+TRACKED = ("_per_s", "_per_min", "_ms", "first_result_s")
+LOWER_IS_BETTER = ("_ms", "first_result_s")
+DEFAULT_HISTORY = os.getenv("BENCH_HISTORY", "data/benchmarks/history.jsonl")
+
+
+def _configure_env(workdir: str, llm_url: str):
+    """Point every cache and client at the sandbox (before any shared instance is created)."""
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": llm_url,
+        "LLM_CACHE": "off",  # every document pays the (fake) LLM latency
+        "SEC_TICKER_DB": os.path.join(workdir, "sec_tickers.db"),
+        "SEC_FACT_DB": os.path.join(workdir, "sec_facts.db"),
+        "RATE_LIMIT_DB": os.path.join(workdir, "rate_limits.db"),
+        "SEC_MAX_RPS": "1000",
+        "YAHOO_CACHE_PATH": os.path.join(workdir, "yahoo.db"),
+    })
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_ingestion(raw_dir: str, workers: int) -> Dict:
+    from src.ingestion.pdf_loader import PDFLoader
+    loader = PDFLoader(raw_dir=raw_dir, entity_file="__no_entities__.json")
+    mb = sum(os.path.getsize(os.path.join(raw_dir, f)) for f in os.listdir(raw_dir)) / 1e6
+    result = {}
+    for label, n in (("serial", 1), ("pool", workers)):
+        start = time.perf_counter()
+        docs = loader.load_documents(workers=n)
+        elapsed = time.perf_counter() - start
+        result[f"{label}_docs_per_s"] = round(len(docs) / elapsed, 2)
+        result[f"{label}_mb_per_s"] = round(mb / elapsed, 2)
+    return result
+
+
+def bench_text(pages: int, entities: int) -> Dict:
+    from benchmarks.bench_cleaning import synthetic_corpus
+    from benchmarks.bench_redaction import corpus_with_mentions, synthetic_entities
+    from src.ingestion.pdf_loader import PDFLoader
+    from src.ingestion.redactor import EntityRedactor
+
+    loader = PDFLoader(entity_file="__no_entities__.json")
+    text = synthetic_corpus(pages)
+    lines = text.count("\n") + 1
+    clean_s = min(_timed(loader._remove_legal_bloat, text) for _ in range(3))
+
+    names = synthetic_entities(entities)
+    report = corpus_with_mentions(names, pages)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        redactor = EntityRedactor(names, cache_dir=cache_dir)
+        redactor.redact(report)  # build + compile outside the timing
+        redact_s = min(_timed(redactor.redact, report) for _ in range(3))
+    return {
+        "cleaning": {"lines_per_s": round(lines / clean_s)},
+        "redaction": {"lines_per_s": round(lines / redact_s)},
+    }
+
+
+def bench_tickers(texts: List[str]) -> Dict:
+    from src.data.company_lookup import CompanyLookup
+    lookup = CompanyLookup()
+    lookup.index.ensure_fresh()
+    start = time.perf_counter()
+    found = [lookup.extract_ticker(t) for t in texts]
+    elapsed = time.perf_counter() - start
+    return {"docs_per_s": round(len(texts) / elapsed, 1), "resolved_pct": round(100 * sum(map(bool, found)) / len(texts), 1)}
+
+
+def bench_validator(texts: List[str], sec_url: str, yahoo_backend) -> Dict:
+    from src.data.company_lookup import CompanyLookup
+    from src.data.yahoo_finance import YahooFinanceClient
+    from src.evaluation.financial_validator import FinancialValidator
+
+    lookup = CompanyLookup()
+    validator = FinancialValidator()
+    validator.sec.BASE_URL = sec_url
+    validator.yahoo = YahooFinanceClient(backend=yahoo_backend)
+    tickers = [lookup.extract_ticker(t) for t in texts]
+
+    cold, warm, checks = [], [], 0
+    seen = set()
+    for text, ticker in zip(texts, tickers):
+        start = time.perf_counter()
+        checks += len(validator.validate(text, ticker))
+        (warm if ticker in seen else cold).append((time.perf_counter() - start) * 1000)
+        seen.add(ticker)
+    return {
+        "cold_p50_ms": round(statistics.median(cold), 2),
+        "warm_p50_ms": round(statistics.median(warm), 2) if warm else None,
+        "warm_p95_ms": round(_percentile(warm, 95), 2) if warm else None,
+        "checks_per_doc": round(checks / len(texts), 2),
+    }
+
+
+def bench_pipeline(raw_dir: str, sec_url: str, yahoo_backend, concurrency: int, ingest_workers: int) -> Dict:
+    from functools import partial
+    from main import process_document
+    from src.data.company_lookup import CompanyLookup
+    from src.data.yahoo_finance import YahooFinanceClient
+    from src.evaluation.financial_validator import FinancialValidator
+    from src.evaluation.macro_extractor import MacroExtractor
+    from src.evaluation.scorer import EquityScorer
+    from src.ingestion.pdf_loader import PDFLoader
+    from src.pipeline.engine import ConcurrentRunner, StageRunner
+    from src.pipeline.metrics import get_metrics
+
+    validator = FinancialValidator()
+    validator.sec.BASE_URL = sec_url
+    validator.yahoo = YahooFinanceClient(backend=yahoo_backend)
+    stages = StageRunner(timeouts={"fact_checks": 30, "score": 120}, max_workers=concurrency * 2 + 4)
+    runner = ConcurrentRunner(
+        partial(process_document, scorer=EquityScorer(), validator=validator, lookup=CompanyLookup(),
+                macro_tool=MacroExtractor(), stages=stages),
+        max_in_flight=concurrency,
+    )
+    loader = PDFLoader(raw_dir=raw_dir, entity_file="__no_entities__.json")
+
+    get_metrics().reset()
+    scored = sum(1 for _, record in runner.run(loader.iter_documents(workers=ingest_workers)) if record)
+    stages.shutdown()
+    snapshot = get_metrics().snapshot()
+    return {
+        "docs_per_min": round(runner.stats.docs_per_minute, 1),
+        "first_result_s": round(runner.stats.first_result_s, 3),
+        "scored": scored,
+        "failed": runner.stats.failed,
+        "stage_wall_s": {name: round(s["wall_s"], 3) for name, s in snapshot["stages"].items()},
+    }
+
+
+def _timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def run(docs: int = 24, pages: int = 8, llm_latency: float = 0.2, sec_latency: float = 0.05,
+        yahoo_latency: float = 0.1, concurrency: int = 4, workers: int = 0, entities: int = 5000,
+        text_pages: int = 200) -> Dict:
+    from benchmarks.synthetic import COMPANIES, REVENUE, write_pdfs
+    from benchmarks.fakes import FakeOpenAIServer, FakeSECServer, FakeYFinance, company_facts
+
+    workers = workers or os.cpu_count() or 1
+    config = {"docs": docs, "pages": pages, "llm_latency": llm_latency, "sec_latency": sec_latency,
+              "yahoo_latency": yahoo_latency, "concurrency": concurrency, "workers": workers,
+              "entities": entities, "text_pages": text_pages}
+    facts = {f"{cik:010d}": company_facts(cik, name, REVENUE[ticker]) for ticker, name, cik in COMPANIES}
+    yahoo = FakeYFinance(latency=yahoo_latency,
+                         info={t: {"currentPrice": 100.0, "forwardEps": 2.95} for t, _, _ in COMPANIES})
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir, \
+            FakeOpenAIServer(latency=llm_latency) as llm, \
+            FakeSECServer(facts=facts, latency=sec_latency) as sec:
+        _configure_env(workdir, llm.base_url)
+        from src.data.ticker_index import get_shared_index
+        get_shared_index().url = sec.tickers_url
+
+        raw_dir = os.path.join(workdir, "raw_pdfs")
+        print(f"📝 Writing {docs} synthetic PDFs ({pages} pages each)...")
+        write_pdfs(raw_dir, docs, pages)
+
+        print("📄 Ingestion...")
+        results["ingestion"] = bench_ingestion(raw_dir, workers)
+        print("🧹 Cleaning / redaction...")
+        results.update(bench_text(text_pages, entities))
+
+        from src.ingestion.pdf_loader import PDFLoader
+        texts = [d["content"] for d in PDFLoader(raw_dir=raw_dir, entity_file="__no_entities__.json").load_documents()]
+        print("🔎 Ticker extraction...")
+        results["tickers"] = bench_tickers(texts)
+        print("🧾 Validator...")
+        results["validator"] = bench_validator(texts, sec.facts_url, yahoo)
+
+        os.environ["SEC_FACT_DB"] = os.path.join(workdir, "sec_facts_pipeline.db")  # cold again
+        os.environ["YAHOO_CACHE_PATH"] = os.path.join(workdir, "yahoo_pipeline.db")
+        print("⚙️  Full pipeline...")
+        results["pipeline"] = bench_pipeline(raw_dir, sec.facts_url, yahoo, concurrency, min(workers, 4))
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        "config": config,
+        "results": results,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# --- HISTORY ---
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path: str, run_record: Dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(run_record) + "\n")
+
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """{"pipeline": {"docs_per_min": 40}} -> {"pipeline.docs_per_min": 40} (numbers only)."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current: Dict, previous: Dict) -> List[Dict]:
+    """Per tracked metric change; `regression_pct` > 0 means worse (direction-aware)."""
+    before, after = flatten(previous["results"]), flatten(current["results"])
+    rows = []
+    for name, new in after.items():
+        old = before.get(name)
+        if old in (None, 0) or not name.endswith(TRACKED) or ".stage_wall_s." in name:
+            continue
+        change = (new - old) / abs(old) * 100
+        lower_better = name.endswith(LOWER_IS_BETTER)
+        rows.append({"metric": name, "before": old, "after": new, "change_pct": round(change, 1),
+                     "regression_pct": round(change if lower_better else -change, 1)})
+    return rows
+
+
+def previous_run(history: List[Dict], config: Dict) -> Optional[Dict]:
+    same = [r for r in history if r.get("config") == config]
+    return same[-1] if same else None
+
+
+def print_report(run_record: Dict, rows: Optional[List[Dict]], threshold: float):
+    print(f"\n📊 Benchmark @ {run_record['commit'] or 'unknown'} ({run_record['machine']})")
+    for name, value in flatten(run_record["results"]).items():
+        if ".stage_wall_s." in name:
+            continue
+        row = next((r for r in rows or [] if r["metric"] == name), None)
+        delta = ""
+        if row:
+            icon = "⚠️" if row["regression_pct"] > threshold else ("🚀" if row["regression_pct"] < -threshold else "  ")
+            delta = f"  {icon} {row['change_pct']:+.1f}% vs {row['before']:g}"
+        print(f"   {name:<34} {value:>12g}{delta}")
+    if rows is None:
+        print("   (no earlier run with this config to compare against)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark suite (synthetic PDFs, local fakes).")
+    parser.add_argument("--docs", type=int, default=24)
+    parser.add_argument("--pages", type=int, default=8, help="Pages per synthetic PDF")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per fake OpenAI call")
+    parser.add_argument("--sec-latency", type=float, default=0.05, help="Seconds per fake SEC request")
+    parser.add_argument("--yahoo-latency", type=float, default=0.1, help="Seconds per fake Yahoo lookup")
+    parser.add_argument("--concurrency", type=int, default=4, help="Documents in flight in the pipeline run")
+    parser.add_argument("--workers", type=int, default=0, help="Ingestion processes (0 = one per core)")
+    parser.add_argument("--quick", action="store_true", help="Small smoke run (6 docs, 2 pages, no latency)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSONL file runs are appended to")
+    parser.add_argument("--no-save", action="store_true", help="Don't append this run to the history")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent change flagged as a regression / improvement")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit 1 if any metric regressed by more than --threshold")
+    parser.add_argument("--compare-only", action="store_true",
+                        help="Compare the last two runs in the history instead of running")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    if args.compare_only:
+        if not history:
+            parser.error(f"no runs in {args.history}")
+        current = history[-1]
+        previous = previous_run(history[:-1], current["config"])
+    else:
+        params = dict(docs=args.docs, pages=args.pages, llm_latency=args.llm_latency,
+                      sec_latency=args.sec_latency, yahoo_latency=args.yahoo_latency,
+                      concurrency=args.concurrency, workers=args.workers)
+        if args.quick:
+            params.update(docs=6, pages=2, llm_latency=0.0, sec_latency=0.0, yahoo_latency=0.0,
+                          entities=500, text_pages=20)
+        current = run(**params)
+        previous = previous_run(history, current["config"])
+        if not args.no_save:
+            append_history(args.history, current)
+
+    rows = compare(current, previous) if previous else None
+    print_report(current, rows, args.threshold)
+    if not args.compare_only and not args.no_save:
+        print(f"💾 Appended to {args.history}")
+    regressions = [r for r in rows or [] if r["regression_pct"] > args.threshold]
+    if regressions and args.fail_on_regression:
+        print(f"❌ {len(regressions)} metric(s) regressed by more than {args.threshold:g}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Synthetic Reports
+Deterministic single-stock research notes (text and PDF) for the benchmark suite:
+a ticker header, body lines with revenue / EPS / margin claims, page furniture and
+a disclosures tail, so every pipeline stage has realistic work to do.
+"""
+import os
+import random
+from typing import List
+import fitz  # PyMuPDF
+from benchmarks.bench_cleaning import BODY_LINES, NOISE_LINES
+
+LINES_PER_PAGE = 60
+
+# (ticker, company, CIK) - all resolvable through benchmarks.fakes.SEC_TICKERS
+COMPANIES = [
+    ("NVDA", "NVIDIA Corporation", 1045810),
+    ("GOOGL", "Alphabet Inc.", 1652044),
+    ("AVGO", "Broadcom Inc.", 1730168),
+]
+REVENUE = {"NVDA": {2023: 26_974e6, 2024: 60_922e6},
+           "GOOGL": {2023: 307_394e6, 2024: 350_018e6},
+           "AVGO": {2023: 35_819e6, 2024: 51_574e6}}
+
+
+def report_text(ticker: str, company: str, pages: int, seed: int = 0) -> List[str]:
+    """One page of lines per list entry."""
+    rng = random.Random(f"{ticker}-{seed}")
+    revenue = REVENUE[ticker][2024] / 1e9
+    out = []
+    for n in range(1, pages + 1):
+        lines = []
+        if n == 1:
+            lines += [f"{company} ({ticker}) - Initiate at Buy",
+                      f"Ticker: {ticker} | Price target $140",
+                      f"FY2024 revenue of ${revenue:.1f} billion, gross margin of 72.7%.",
+                      "For FY2025E we model EPS of $2.95."]
+        while len(lines) < LINES_PER_PAGE - 2:
+            lines.append(rng.choice(BODY_LINES))
+        lines.append(rng.choice(NOISE_LINES).format(n=n))
+        lines.append(f"Page {n} of {pages}")
+        out.append(lines)
+    out[-1] += ["Important Disclosures", "This report is for institutional investors only."]
+    return out
+
+
+def write_pdfs(out_dir: str, docs: int, pages: int) -> List[str]:
+    """Writes `docs` reports of `pages` pages each, cycling through COMPANIES. Returns the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(docs):
+        ticker, company, _ = COMPANIES[i % len(COMPANIES)]
+        path = os.path.join(out_dir, f"{i:04d}_{ticker.lower()}_note.pdf")
+        pdf = fitz.open()
+        for lines in report_text(ticker, company, pages, seed=i):
+            pdf.new_page().insert_text((36, 36), "\n".join(lines), fontsize=8)
+        pdf.save(path)
+        pdf.close()
+        paths.append(path)
+    return paths
@@ -1,130 +1,570 @@
-import json
 import os
-import datetime
+import argparse
+import json
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from functools import partial
 from dotenv import load_dotenv  # <--- THIS WAS MISSING
 from src.ingestion.pdf_loader import PDFLoader
 from src.evaluation.scorer import EquityScorer
 from src.evaluation.financial_validator import FinancialValidator
 from src.data.company_lookup import CompanyLookup
 from src.evaluation.macro_extractor import MacroExtractor
+from src.pipeline.engine import ConcurrentRunner, StageResult, StageRunner
+from src.pipeline.metrics import get_metrics, profile
+from src.pipeline.records import single_stock_record, macro_record
+from src.pipeline.batch import BatchRunner
+from src.pipeline.daemon import IngestDaemon
+from src.pipeline.job_queue import JobQueue, LeaseLost, owner_id
+from src.pipeline.cluster import Cluster
+from src.pipeline.watcher import FolderWatcher
+from src.storage.file_index import ProcessedIndex
+from src.storage.score_store import ScoreStore
+from src.evaluation.response_cache import get_shared_cache
 
 # Load environment variables immediately
 load_dotenv()
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Equity research scoring pipeline")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("SCORER_CONCURRENCY", 4)),
+                        help="Max scorer/extractor calls in flight (1 = serial)")
+    parser.add_argument("--ingest-workers", type=int, default=int(os.getenv("INGEST_WORKERS", 1)),
+                        help="Processes for PDF extraction/cleaning/redaction (0 = all cores)")
+    parser.add_argument("--chunk-tokens", type=int, default=int(os.getenv("CHUNK_TOKENS", 0)) or None,
+                        help="Score long reports map-reduce style in chunks of N tokens (default: truncate)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Submit pending documents through the OpenAI Batch API (resumes an open batch)")
+    parser.add_argument("--poll-interval", type=float, default=60,
+                        help="Seconds between batch status polls")
+    parser.add_argument("--validate-timeout", type=float, default=float(os.getenv("VALIDATE_TIMEOUT", 30)),
+                        help="Seconds to wait for SEC/Yahoo fact checks before scoring without them (0 = no limit)")
+    parser.add_argument("--score-timeout", type=float, default=float(os.getenv("SCORE_TIMEOUT", 600)),
+                        help="Seconds to wait for the LLM judge before failing the document (0 = no limit)")
+    parser.add_argument("--metrics-out", default=os.getenv("RUN_METRICS_PATH", "data/metrics/last_run.json"),
+                        help="Where to write the per-stage run summary (JSON)")
+    parser.add_argument("--prometheus", default=os.getenv("RUN_METRICS_PROM"), metavar="PATH",
+                        help="Also write the run summary in Prometheus text format")
+    parser.add_argument("--profile", metavar="PDF",
+                        help="Profile one PDF from data/raw_pdfs end to end (nothing is stored) and exit")
+    parser.add_argument("--profiler", choices=["cprofile", "pyinstrument"], default="cprofile",
+                        help="Profiler used by --profile (pyinstrument must be installed)")
+    parser.add_argument("--lease", type=float, default=float(os.getenv("JOB_LEASE", 900)),
+                        help="Seconds a worker holds a queued document before another may take it over")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Re-queue documents that used up their attempts in earlier runs")
+    parser.add_argument("--watch", action="store_true",
+                        help="Run as a daemon: score PDFs as they land in data/raw_pdfs until Ctrl-C / SIGTERM")
+    parser.add_argument("--watch-backend", choices=["auto", "watchdog", "poll"],
+                        default=os.getenv("WATCH_BACKEND", "auto"),
+                        help="File events from watchdog (inotify) or by polling (auto = watchdog if installed)")
+    parser.add_argument("--settle", type=float, default=float(os.getenv("WATCH_SETTLE", 2.0)),
+                        help="Seconds a dropped file must stay unchanged before it is picked up")
+    parser.add_argument("--watch-poll", type=float, default=float(os.getenv("WATCH_POLL_INTERVAL", 1.0)),
+                        help="Seconds between folder scans when polling")
+    parser.add_argument("--coordinator", action="store_true",
+                        help="Stage new PDFs on the cluster's shards and merge worker results into scores.db")
+    parser.add_argument("--worker", action="store_true",
+                        help="Score documents from the cluster's shards (run on any host that mounts --cluster-dir)")
+    parser.add_argument("--cluster-dir", default=os.getenv("CLUSTER_DIR", "data/cluster"),
+                        help="Shared directory the coordinator and workers exchange jobs through")
+    parser.add_argument("--shards", type=int, default=int(os.getenv("CLUSTER_SHARDS", 16)),
+                        help="Shard count, fixed when the cluster directory is created")
+    parser.add_argument("--local-workers", type=int, default=int(os.getenv("CLUSTER_LOCAL_WORKERS", 0)),
+                        help="Worker processes the coordinator starts on this host (remote workers join on their own)")
+    parser.add_argument("--merge-interval", type=float, default=2.0,
+                        help="Seconds between outbox merges (coordinator) and shard polls (idle workers)")
+    parser.add_argument("--exit-when-idle", action="store_true",
+                        help="Worker: exit once no shard has open jobs instead of waiting for more")
+    args = parser.parse_args()
+    if args.batch and args.chunk_tokens:
+        parser.error("--batch scores each report in one request (truncated text) and cannot be combined "
+                     "with --chunk-tokens / CHUNK_TOKENS; run chunked scoring live instead")
+    return args
+
+
+def process_document(doc, scorer, validator, lookup, macro_tool, stages=None, job=None):
+    """
+    Runs one document through routing + validation + LLM. Safe to call from worker threads.
+    On the single-stock route the fact checks and the LLM judge run concurrently on
+    `stages` (a StageRunner), so document latency is the slower of the two, not the sum.
+    With a `job` (JobQueue), each stage is checkpointed as soon as it finishes, and stages
+    an earlier attempt already checkpointed are not run (or paid for) again.
+    """
+    # --- STEP 4a: IDENTIFY TICKER ---
+    ticker = lookup.extract_ticker(doc['content'])
+
+    # ====================================================
+    # ROUTE A: SINGLE STOCK PITCH (e.g., "Buy NVDA")
+    # ====================================================
+    if ticker:
+        # 1. Financial Fact Check (SEC + Yahoo I/O) alongside 2. AI Judge
+        todo = {}
+        if _saved(job, "validated") is None:
+            todo["fact_checks"] = _checkpointed(job, "validated", lambda: validator.validate(doc['content'], ticker))
+        if _saved(job, "scored") is None:
+            todo["score"] = _checkpointed(job, "scored", lambda: scorer.evaluate(doc['content'], doc['source']))
+        results = (stages or _default_stages).run(**todo) if todo else {}
+        checks = results.get("fact_checks") or StageResult(_saved(job, "validated"))
+        score = results.get("score") or StageResult(_saved(job, "scored"))
+        if not checks.ok:
+            print(f"   ⚠️ Fact checks skipped for {doc['source']}: {checks.error}")
+        if not score.ok:
+            print(f"   ❌ Scoring failed for {doc['source']}: {score.error}")
+            return None
+        if not score.value:
+            return None
+        return single_stock_record(doc, ticker, checks.value or [], score.value)
+
+    # ====================================================
+    # ROUTE B: MACRO / SECTOR DEEP DIVE (e.g. "China Ag")
+    # ====================================================
+    macro_data = _saved(job, "scored")
+    if macro_data is None:
+        macro_data = _checkpointed(job, "scored", lambda: macro_tool.analyze(doc['content'], doc['source']))()
+    if macro_data is None:
+        print(f"   ❌ Macro extraction failed for {doc['source']}")
+        return None
+    return macro_record(doc, macro_data)
+
+
+def _saved(job, stage):
+    return job.checkpoint(stage) if job else None
+
+
+def _checkpointed(job, stage, fn):
+    """Wraps a stage so its result is saved on the job the moment it is ready."""
+    if job is None:
+        return fn
+
+    def run():
+        value = fn()
+        if value is not None:
+            job.save(stage, value)
+        return value
+    return run
+
+
+_default_stages = StageRunner(timeouts={"fact_checks": 30, "score": 600})
+
+
+def build_stages(args):
+    # Two stages per in-flight document, plus headroom for stages that outlive their timeout
+    return StageRunner(timeouts={"fact_checks": args.validate_timeout, "score": args.score_timeout},
+                       max_workers=args.concurrency * 2 + 4)
+
+
+def build_ingest_pool(args):
+    """Process pool for PDF extraction (None = extract in the calling thread)."""
+    return ProcessPoolExecutor(max_workers=args.ingest_workers or None) if args.ingest_workers != 1 else None
+
+
+def run_job(job, loader, process_fn, ingest_pool=None, filename=None):
+    """
+    Worker: takes one queued document as far as it gets, starting from its last checkpoint.
+    Returns (doc, record); a failed attempt is released back to the queue for a retry.
+    filename is the PDF's path under loader.raw_dir when it differs from job.source.
+    """
+    try:
+        doc = job.checkpoint("ingested")
+        if doc is not None:
+            print(f"   ♻️  Resuming {job.source} (checkpoint: {job.state}, attempt {job.attempts})")
+        else:
+            doc = loader.load_file(filename or job.source, content_hash=job.content_hash, pool=ingest_pool)
+            if doc is None:
+                job.queue.release(job, "could not load PDF")
+                return None, None
+            doc["source"] = job.source
+            job.save("ingested", doc)
+        record = process_fn(doc, job=job)
+        if record is None:
+            job.queue.release(job, "no result")
+        return doc, record
+    except LeaseLost as e:
+        print(f"   ⚠️ {e}")
+        raise
+    except Exception as e:
+        job.queue.release(job, str(e) or type(e).__name__)
+        raise
+
+
+def persist_job(job, record, store, index):
+    """Stores the record, marks the file done and closes the job. Safe to repeat after a crash."""
+    with get_metrics().stage("persist"):
+        # An earlier attempt may have died between writing the record and closing the job
+        record_id = store.find_content_hash(job.content_hash) if job.attempts > 1 else None
+        if record_id is None:
+            record_id = store.append(record)
+        index.mark_processed([(job.content_hash, job.source)])
+        try:
+            job.queue.complete(job, record_id)
+        except LeaseLost as e:
+            print(f"   ⚠️ {e}")
+
+
+def profile_document(filename, loader, scorer, validator, lookup, macro_tool, kind="cprofile"):
+    """Load -> route -> validate -> score one PDF in this thread under a profiler. Nothing is persisted."""
+    label = os.path.splitext(os.path.basename(filename))[0]
+    with profile(label, kind=kind, out_dir="data/profiles") as out:
+        doc = loader.load_file(os.path.basename(filename))
+        record = process_document(doc, scorer, validator, lookup, macro_tool,
+                                  stages=StageRunner(max_workers=0)) if doc else None
+    if doc:
+        print_record(doc, record)
+    print(f"🔬 Profile written to {out['path']}")
+
+
+def report_metrics(args, **extra):
+    """Prints the per-stage breakdown and exports the run summary."""
+    metrics = get_metrics()
+    print("⏱️  Stage breakdown:")
+    for line in metrics.summary_lines():
+        print(f"      {line}")
+    metrics.write_json(args.metrics_out, **extra)
+    if args.prometheus:
+        metrics.write_prometheus(args.prometheus)
+    print(f"📈 Run metrics: {args.metrics_out}" + (f" + {args.prometheus}" if args.prometheus else ""))
+
+
+def _on_stop_signal(stop, what):
+    """SIGINT / SIGTERM set `stop`; a second signal gives up on the documents in hand."""
+    def handler(signum, frame):
+        if stop.is_set():
+            raise KeyboardInterrupt
+        print(f"\n🛑 Received {signal.Signals(signum).name}, {what}...")
+        stop.set()
+    signal.signal(signal.SIGINT, handler)
+    signal.signal(signal.SIGTERM, handler)
+
+
+def run_watch(args, raw_dir, loader, stages, process_fn, store, index, queue):
+    """
+    Daemon mode: blocks until SIGINT / SIGTERM, then drains the documents in hand and exits.
+    Dropped files go through the durable job queue, so checkpoints survive a crash and
+    failed attempts are retried without a restart.
+    """
+    ingest_pool = build_ingest_pool(args)
+    daemon = IngestDaemon(queue, index, raw_dir,
+                          partial(run_job, loader=loader, process_fn=process_fn, ingest_pool=ingest_pool),
+                          partial(persist_job, store=store, index=index),
+                          workers=args.concurrency, on_result=print_record)
+    watcher = FolderWatcher(raw_dir, daemon.submit, settle_s=args.settle, poll_s=args.watch_poll,
+                            backend=args.watch_backend)
+
+    stop = threading.Event()
+    _on_stop_signal(stop, "finishing documents in progress")
+
+    daemon.start()
+    backend = watcher.start()
+    print(f"👀 Watching {raw_dir} ({backend}, settle {args.settle:g}s, {args.concurrency} workers, "
+          f"{daemon.backlog()} jobs carried over)")
+    while not stop.wait(1.0):
+        pass
+
+    watcher.stop()
+    left = daemon.stop()
+    stages.shutdown()
+    if ingest_pool:
+        ingest_pool.shutdown(cancel_futures=True)
+    print("==================================================")
+    print(f"⚡ Daemon: {daemon.stats.summary()}")
+    if left:
+        print(f"📥 {left} jobs left unscored; they are resumed at the next start")
+    print(f"💾 Database: {store.db_path} ({store.count()} records)")
+    report_metrics(args, mode="watch", daemon=asdict(daemon.stats), queued_left=left)
+
+
+def run_cluster_worker(args, cluster, loader, process_fn, stages, stop=None):
+    """
+    Worker node: leases one shard at a time and drains it through the usual job checkpoints,
+    publishing each record to the cluster outbox. Stops after the documents in hand on
+    SIGINT / SIGTERM (or, with --exit-when-idle, once the cluster has no open jobs).
+    """
+    owner = owner_id()
+    stop = stop or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        _on_stop_signal(stop, "finishing documents in progress")
+    loader.raw_dir = os.path.join(cluster.root, "docs")
+    cluster.join(owner, "worker")
+    ingest_pool = build_ingest_pool(args)
+    runner = ConcurrentRunner(
+        lambda job: run_job(job, loader, process_fn, ingest_pool, filename=cluster.staged_name(job)),
+        max_in_flight=args.concurrency,
+    )
+    print(f"🛠️  Worker {owner} joined {cluster.root} ({cluster.shards} shards, {args.concurrency} in flight)")
+
+    published, skip = 0, set()
+    while not stop.is_set():
+        shard = cluster.claim_shard(owner, skip=skip)
+        if shard is None:
+            skip.clear()
+            cluster.heartbeat(owner)
+            if args.exit_when_idle and cluster.open_jobs() == 0:
+                break
+            stop.wait(args.merge_interval)
+            continue
+
+        queue = cluster.queue(shard, owner)
+
+        def claims():
+            # Each claim renews the shard lease; stop taking jobs once it is lost
+            while not stop.is_set() and cluster.renew_shard(shard, owner):
+                job = queue.claim()
+                if job is None:
+                    return
+                yield job
+
+        for job, result in runner.run(claims()):
+            doc, record = result or (None, None)
+            if doc:
+                print_record(doc, record)
+            if record:
+                try:
+                    cluster.publish(job, record)
+                except LeaseLost as e:
+                    print(f"   ⚠️ {e}")
+                    continue
+                published += 1
+                cluster.heartbeat(owner, jobs_done=1)
+        cluster.release_shard(shard, owner)
+        skip.add(shard)  # visit the other shards before coming back to this one
+
+    cluster.leave(owner)
+    stages.shutdown()
+    if ingest_pool:
+        ingest_pool.shutdown()
+    print(f"👋 Worker {owner}: {published} records published")
+    get_metrics().write_json(os.path.join(cluster.root, "metrics", f"{owner.replace(':', '_')}.json"),
+                             mode="worker", owner=owner, published=published)
+    return published
+
+
+def run_coordinator(args, cluster, loader, store, index):
+    """
+    Stages every new PDF on its shard, starts --local-workers worker processes, and merges
+    the outbox into the central score store until no shard has open jobs.
+    """
+    staged = sum(cluster.stage(os.path.join(loader.raw_dir, filename), sha, retry_failed=args.retry_failed)
+                 for filename, sha in loader.pending_files(index))
+    print(f"📥 Staged {staged} new PDFs on {cluster.shards} shards in {cluster.root}")
+
+    command = [sys.executable, os.path.abspath(__file__), "--worker", "--exit-when-idle",
+               "--cluster-dir", cluster.root, "--concurrency", str(args.concurrency),
+               "--validate-timeout", str(args.validate_timeout), "--score-timeout", str(args.score_timeout),
+               "--lease", str(args.lease), "--merge-interval", str(args.merge_interval)]
+    if args.chunk_tokens:
+        command += ["--chunk-tokens", str(args.chunk_tokens)]
+    workers = [subprocess.Popen(command) for _ in range(args.local_workers if cluster.open_jobs() else 0)]
+
+    stop = threading.Event()
+    _on_stop_signal(stop, "merging finished results and leaving the queue to the workers")
+    start, merged, last_report = time.perf_counter(), 0, None
+    while True:
+        merged += cluster.merge(store, index)
+        counts = cluster.counts()
+        open_jobs = sum(n for state, n in counts.items() if state not in ("persisted", "failed"))
+        report = (merged, open_jobs)
+        if report != last_report:
+            live = cluster.members(max_age_s=max(60.0, args.merge_interval * 10))
+            print(f"🔀 Merged {merged} | {open_jobs} open | {len(live)} workers alive")
+            last_report = report
+        if open_jobs == 0 and cluster.outbox_size() == 0:
+            break
+        if stop.wait(args.merge_interval):
+            break
+    merged += cluster.merge(store, index)
+
+    for worker in workers:
+        try:
+            worker.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            worker.terminate()
+            worker.wait()
+    _merge_worker_metrics(cluster)
+
+    elapsed = time.perf_counter() - start
+    print("==================================================")
+    print(f"⚡ Cluster: {merged} records merged in {elapsed:.1f}s "
+          f"({merged / elapsed * 60 if elapsed else 0:.1f} docs/min)")
+    if counts.get("failed"):
+        print(f"🚫 {counts['failed']} documents failed on the workers")
+    print(f"💾 Database updated: {store.db_path} ({store.count()} records)")
+    report_metrics(args, mode="coordinator", merged=merged, jobs=counts)
+
+
+def _merge_worker_metrics(cluster):
+    """Folds the stage metrics each worker left in <root>/metrics into this run's summary."""
+    metrics_dir = os.path.join(cluster.root, "metrics")
+    if not os.path.isdir(metrics_dir):
+        return
+    for entry in os.listdir(metrics_dir):
+        path = os.path.join(metrics_dir, entry)
+        if entry.endswith(".json"):
+            with open(path) as f:
+                get_metrics().merge(json.load(f))
+            os.remove(path)
+
+
+def print_record(doc, record):
+    """Prints the per-document summary (called in input order from the main thread)."""
+    print(f"\n📄 Analyzed: {doc['source']}")
+    if record is None:
+        print("   ❌ No result (scorer failed)")
+        return
+
+    if record['type'] == "single_stock":
+        print(f"   🎯 Mode: Single Stock ({record['ticker']})")
+        print("   🔍 Verified Financials:")
+        for check in record['fact_checks']:
+            icon = "✅" if check['status'] == "MATCH" else "❌"
+            print(f"      {icon} {check['metric']}: Claimed {check['claimed']} vs Actual {check['actual']}")
+        print(f"   ✅ Final Score: {record['overall_score']}/5.0")
+        return
+
+    print("   🌍 Mode: Macro/Sector Deep Dive (No single ticker found)")
+    print(f"      📊 Topic: {record['topic']}")
+    print(f"      💡 Implication: {record['investment_implication'][:100]}...")
+    print("      🏆 Top 5 Investable Ideas:")
+    for idea in record['top_ideas']:
+        icon = "🏢" if idea['type'] == 'Ticker' else "🌊"
+        print(f"         {icon} {idea['name']}: {idea['rationale']}")
+    print("   ✅ Macro Analysis Complete")
+
+
 def main():
+    args = parse_args()
+    cluster = None
+    if args.worker or args.coordinator:
+        # Before any client exists: SEC / OpenAI budgets are shared by every node
+        cluster = Cluster(args.cluster_dir, shards=args.shards, lease_s=args.lease)
+        cluster.configure_env()
+
     # 1. Setup paths
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     RAW_DIR = os.path.join(BASE_DIR, "data/raw_pdfs")
-    OUTPUT_FILE = os.path.join(BASE_DIR, "data/processed/scores.json")
-    
+    LEGACY_FILE = os.path.join(BASE_DIR, "data/processed/scores.json")
+    DB_FILE = os.path.join(BASE_DIR, "data/processed/scores.db")
+    INDEX_FILE = os.path.join(BASE_DIR, "data/processed/file_index.db")
+    QUEUE_FILE = os.path.join(BASE_DIR, "data/processed/jobs.db")
+
     # 2. Initialize Engines
     # Now this will work because env vars are loaded
     loader = PDFLoader(raw_dir=RAW_DIR)
-    scorer = EquityScorer()
+    scorer = EquityScorer(chunk_tokens=args.chunk_tokens)
     validator = FinancialValidator()
     lookup = CompanyLookup()
-    macro_tool = MacroExtractor()
-    
+    macro_tool = MacroExtractor(chunk_tokens=args.chunk_tokens)
+
     print("\n🚀 STARTING RESEARCH PIPELINE")
     print("==================================================")
 
-    # 3. Ingestion
-    documents = loader.load_documents()
-    
-    if not documents:
-        print("⚠️  No documents found. Please drop PDFs in data/raw_pdfs/")
+    if args.profile:
+        profile_document(args.profile, loader, scorer, validator, lookup, macro_tool, kind=args.profiler)
         return
 
-    # 4. Processing Loop
-    all_results = []
-    
-    # Load existing history to append to it
-    if os.path.exists(OUTPUT_FILE):
-        try:
-            with open(OUTPUT_FILE, 'r') as f:
-                all_results = json.load(f)
-        except:
-            all_results = []
-
-    for doc in documents:
-        print(f"\n📄 Analyzing: {doc['source']}")
-        
-        # Check cache (skip if already processed)
-        if any(r['file'] == doc['source'] for r in all_results):
-            print("   ⏩ Skipping (Already in database)")
-            continue
+    if args.worker:
+        # Cluster worker: same engines, documents come from the shared shards
+        stages = build_stages(args)
+        process_fn = partial(process_document, scorer=scorer, validator=validator,
+                             lookup=lookup, macro_tool=macro_tool, stages=stages)
+        run_cluster_worker(args, cluster, loader, process_fn, stages)
+        return
+
+    # 3. Open the score store (one-shot import of the legacy scores.json)
+    store = ScoreStore(DB_FILE)
+    migrated = store.migrate_from_json(LEGACY_FILE)
+    if migrated:
+        print(f"📦 Migrated {migrated} records from {LEGACY_FILE}")
+
+    # Content-hash index: unchanged files are skipped before they are even opened
+    index = ProcessedIndex(INDEX_FILE)
+    seeded = index.seed_from_history(store.files(), RAW_DIR)
+    if seeded:
+        print(f"🗂️  Indexed {seeded} previously scored files by content hash")
+
+    if args.coordinator:
+        run_coordinator(args, cluster, loader, store, index)
+        return
+
+
+    if args.batch:
+        # Overnight mode: one Batch API job instead of live calls
+        pending = loader.iter_documents(workers=args.ingest_workers, index=index)
+        batch = BatchRunner(scorer, macro_tool, validator, lookup, store, index,
+                            state_dir=os.path.join(BASE_DIR, "data/batches"))
+        if batch.has_open_job():
+            print(f"♻️  Resuming open batch ({batch.state['status']})")
+        persisted = batch.run(pending, poll_interval=args.poll_interval)
+        print("==================================================")
+        print(f"💾 Batch persisted {persisted} records to {DB_FILE}")
+        report_metrics(args, mode="batch", persisted=persisted)
+        return
+
+    # 4. Durable queue: every new file becomes a job, checkpointed after each stage
+    # (ingested -> validated -> scored -> persisted). A rerun after a crash resumes each
+    # document from its last checkpoint; several main.py processes can share the queue.
+    queue = JobQueue(QUEUE_FILE, lease_s=args.lease)
+    if args.retry_failed:
+        print(f"🔁 Re-queued {queue.retry_failed()} failed documents")
+
+    if args.watch:
+        # Daemon mode: the same engines stay warm and score each PDF as it lands (same job queue)
+        stages = build_stages(args)
+        process_fn = partial(process_document, scorer=scorer, validator=validator,
+                             lookup=lookup, macro_tool=macro_tool, stages=stages)
+        run_watch(args, RAW_DIR, loader, stages, process_fn, store, index, queue)
+        return
+
+    enqueued = sum(queue.enqueue(sha, filename) for filename, sha in loader.pending_files(index))
+    counts = queue.counts()
+    print(f"📥 Queue: {enqueued} new | " + ", ".join(f"{n} {state}" for state, n in counts.items() if n))
+
+    # 5. Streaming Pipeline: ingest -> ticker lookup -> validate -> score
+    # Jobs are claimed as slots free up; only the in-flight window is held in memory.
+    print(f"⚙️  Streaming documents into the scorer ({args.concurrency} in flight)...")
+    stages = build_stages(args)
+    ingest_pool = build_ingest_pool(args)
+    process_fn = partial(process_document, scorer=scorer, validator=validator,
+                         lookup=lookup, macro_tool=macro_tool, stages=stages)
+    runner = ConcurrentRunner(
+        partial(run_job, loader=loader, process_fn=process_fn, ingest_pool=ingest_pool),
+        max_in_flight=args.concurrency,
+    )
+    for job, result in runner.run(queue.drain()):
+        doc, record = result or (None, None)
+        if doc:
+            print_record(doc, record)
+        if record:
+            # 6. Persist immediately (transactional), then mark the file and the job done
+            persist_job(job, record, store, index)
+    if ingest_pool:
+        ingest_pool.shutdown()
+
+    if runner.stats.submitted == 0:
+        print("⚠️  No new documents found. Please drop PDFs in data/raw_pdfs/")
+        return
+    failed = queue.counts()["failed"]
+    if failed:
+        print(f"🚫 {failed} documents failed {queue.max_attempts} attempts (rerun with --retry-failed)")
 
-        # --- STEP 4a: IDENTIFY TICKER ---
-        ticker = lookup.extract_ticker(doc['content'])
-
-        # ====================================================
-        # ROUTE A: SINGLE STOCK PITCH (e.g., "Buy NVDA")
-        # ====================================================
-        if ticker:
-            print(f"   🎯 Mode: Single Stock ({ticker})")
-            
-            # 1. Financial Fact Check
-            print("   🔍 Verifying Financials...")
-            fact_checks = validator.validate(doc['content'], ticker)
-            for check in fact_checks:
-                icon = "✅" if check['status'] == "MATCH" else "❌"
-                print(f"      {icon} {check['metric']}: Claimed {check['claimed']} vs Actual {check['actual']}")
-
-            # 2. AI Judge
-            print("   🧠 Running AI Judge...")
-            score_data = scorer.evaluate(doc['content'], doc['source'])
-            
-            if score_data:
-                record = {
-                    "file": doc['source'],
-                    "timestamp": datetime.datetime.now().isoformat(),
-                    "type": "single_stock",
-                    "ticker": ticker,
-                    "boilerplate_removed": doc.get('boilerplate_removed_pct', "0%"),
-                    "fact_checks": fact_checks,
-                    **score_data
-                }
-                all_results.insert(0, record)
-                print(f"   ✅ Final Score: {record['overall_score']}/5.0")
-
-        # ====================================================
-        # ROUTE B: MACRO / SECTOR DEEP DIVE (e.g. "China Ag")
-        # ====================================================
-        else:
-            print("   🌍 Mode: Macro/Sector Deep Dive (No single ticker found)")
-            
-            # 1. Run Macro Extraction
-            print("   ⛏️  Extracting Thematic Data...")
-            macro_data = macro_tool.analyze(doc['content'], doc['source'])
-            
-            # 2. Print Summary for User
-            print(f"      📊 Topic: {macro_data['topic']}")
-            print(f"      💡 Implication: {macro_data['investment_implication'][:100]}...")
-            
-            print("      🏆 Top 5 Investable Ideas:")
-            for idea in macro_data['top_ideas']:
-                icon = "🏢" if idea['type'] == 'Ticker' else "🌊"
-                print(f"         {icon} {idea['name']}: {idea['rationale']}")
-            
-            # 3. Save Record
-            record = {
-                "file": doc['source'],
-                "timestamp": datetime.datetime.now().isoformat(),
-                "type": "macro_deep_dive",
-                "ticker": "MACRO", # Placeholder for UI sorting
-                "boilerplate_removed": doc.get('boilerplate_removed_pct', "0%"),
-                **macro_data
-            }
-            all_results.insert(0, record)
-            print("   ✅ Macro Analysis Complete")
-
-    # 5. Save Database
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(all_results, f, indent=2)
-    
     print("==================================================")
-    print(f"💾 Database updated: {OUTPUT_FILE}")
+    print(f"⏱️  First result after {runner.stats.first_result_s:.1f}s")
+    print(f"⚡ Throughput: {runner.stats.summary()}")
+    if stages.timed_out:
+        print(f"⏳ Stage timeouts: {', '.join(f'{n} x{c}' for n, c in stages.timed_out.items())}")
+    stages.shutdown()
+    cache = get_shared_cache()
+    if cache:
+        stats = cache.stats()
+        print(f"🗃️  LLM cache: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%})")
+    print(f"💾 Database updated: {DB_FILE} ({store.count()} records)")
+    report_metrics(args, mode="live", run=asdict(runner.stats), stage_timeouts=stages.timed_out)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,10 +2,11 @@
 Company Lookup Module
 Maps tickers to CIK numbers (for SEC) and standardizes company names.
 """
-import requests
-import re
 from dataclasses import dataclass
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+from src.data.ticker_index import TickerIndex, get_shared_index
+from src.data.ticker_extractor import TickerExtractor, TickerCandidate
+from src.pipeline.metrics import get_metrics
 
 @dataclass
 class CompanyInfo:
@@ -15,9 +16,7 @@ class CompanyInfo:
     fiscal_year_end: str = "12-31"
 
 class CompanyLookup:
-    SEC_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
-    
-    def __init__(self):
+    def __init__(self, index: Optional[TickerIndex] = None):
         # Local cache of common tech/finance names to save API calls
         self._cache: Dict[str, CompanyInfo] = {
             "AAPL": CompanyInfo("AAPL", "0000320193", "Apple Inc.", "09-30"),
@@ -30,7 +29,9 @@ class CompanyLookup:
             "META": CompanyInfo("META", "0001326801", "Meta Platforms, Inc.", "12-31"),
             "LLY":  CompanyInfo("LLY",  "0000059478", "Eli Lilly & Co", "12-31"),
         }
-        self._sec_map_loaded = False
+        # Full SEC map lives on disk, shared by every CompanyLookup in the process
+        self.index = index or get_shared_index()
+        self.extractor = TickerExtractor(lambda: set(self._cache) | self.index.tickers(), version=self.index.version)
 
     def lookup(self, ticker: str) -> Optional[CompanyInfo]:
         """Returns metadata for a given ticker."""
@@ -40,47 +41,27 @@ class CompanyLookup:
         if ticker in self._cache:
             return self._cache[ticker]
         
-        # 2. Lazy Load SEC Database (only if needed)
-        if not self._sec_map_loaded:
-            self._load_sec_data()
-            
-        return self._cache.get(ticker)
+        # 2. SEC ticker index (refreshed lazily on its TTL)
+        row = self.index.by_ticker(ticker)
+        return CompanyInfo(*row) if row else None
+
+    def lookup_cik(self, cik: str) -> List[CompanyInfo]:
+        """Returns every ticker filed under a CIK (share classes share one)."""
+        rows = self.index.by_cik(cik)
+        if rows:
+            return [CompanyInfo(*row) for row in rows]
+        cik = str(cik).strip().zfill(10)
+        return [info for info in self._cache.values() if info.cik == cik]
+
+    def search(self, name_prefix: str, limit: int = 10) -> List[CompanyInfo]:
+        """Case-insensitive company-name prefix search, e.g. "nvid" -> NVIDIA CORP."""
+        return [CompanyInfo(*row) for row in self.index.search_name(name_prefix, limit)]
 
     def extract_ticker(self, text: str) -> Optional[str]:
-        """Smart Regex to find the primary ticker in a document."""
-        # Priority 1: "NVIDIA (NVDA)" format
-        match = re.search(r'\b[A-Z][a-zA-Z\s,\.]+\(([A-Z]{1,5})\)', text)
-        if match:
-            return match.group(1)
-            
-        # Priority 2: "Ticker: NVDA"
-        match = re.search(r'(?:Ticker|Symbol)[:\s]+([A-Z]{1,5})\b', text, re.IGNORECASE)
-        if match:
-            return match.group(1)
-            
-        # Priority 3: Look for known tickers in the first 200 chars
-        header = text[:500].upper()
-        for known_ticker in self._cache.keys():
-            # Check for standalone word (e.g. " NVDA ")
-            if re.search(rf'\b{known_ticker}\b', header):
-                return known_ticker
-                
-        return None
+        """Finds the primary ticker in a document (None routes it as a macro note)."""
+        with get_metrics().stage("ticker_lookup", len(text)):
+            return self.extractor.extract(text)
 
-    def _load_sec_data(self):
-        """Fetches the official SEC ticker map."""
-        try:
-            headers = {"User-Agent": "EquityScorerBot/1.0 (contact@example.com)"}
-            resp = requests.get(self.SEC_TICKERS_URL, headers=headers, timeout=5)
-            data = resp.json()
-            
-            for entry in data.values():
-                t = entry['ticker']
-                self._cache[t] = CompanyInfo(
-                    ticker=t,
-                    cik=str(entry['cik_str']).zfill(10),
-                    name=entry['title']
-                )
-            self._sec_map_loaded = True
-        except Exception as e:
-            print(f"⚠️ Warning: Failed to load SEC ticker list: {e}")
\ No newline at end of file
+    def rank_tickers(self, text: str, limit: int = 5) -> List[TickerCandidate]:
+        """All ticker candidates, best first, with their scores and confidence."""
+        return self.extractor.rank(text, limit)
@@ -0,0 +1,226 @@
+"""
+XBRL Fact Store
+Normalized SQLite copy of SEC companyfacts: one row per reported fact, keyed by
+(CIK, concept, form, period end, ...). A filer's JSON is parsed once, when it is
+downloaded; latest-value and time-series queries are then primary-key range scans.
+"""
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class Fact:
+    concept: str
+    unit: str
+    form: str
+    period_end: str
+    period_start: Optional[str]
+    val: float
+    fy: Optional[int]
+    fp: Optional[str]
+    filed: Optional[str]
+    accn: Optional[str]
+
+
+@dataclass
+class FactSet:
+    """
+    One filer's annual (10-K) figures by fiscal year, materialized once so a whole
+    document's claims can be checked without another query or fetch per metric.
+    """
+    revenue: Dict[int, float] = field(default_factory=dict)
+    gross_profit: Dict[int, float] = field(default_factory=dict)
+    operating_cash_flow: Dict[int, float] = field(default_factory=dict)
+    capex: Dict[int, float] = field(default_factory=dict)
+    eps_diluted: Dict[int, float] = field(default_factory=dict)
+    form: str = "10-K"
+
+    @staticmethod
+    def _pick(series: Dict[int, float], fy: Optional[int]) -> Optional[Tuple[float, int]]:
+        if not series:
+            return None
+        year = max(series) if fy is None else fy
+        return (series[year], year) if year in series else None
+
+    def get(self, metric: str, fy: Optional[int] = None) -> Optional[Tuple[float, int]]:
+        """(value, fiscal_year) for revenue | eps | gross_margin (%) | fcf; latest year if fy is None."""
+        if metric == "revenue":
+            return self._pick(self.revenue, fy)
+        if metric == "eps":
+            return self._pick(self.eps_diluted, fy)
+        if metric == "gross_margin":
+            margins = {y: self.gross_profit[y] / self.revenue[y] * 100
+                       for y in self.gross_profit if self.revenue.get(y)}
+            return self._pick(margins, fy)
+        if metric == "fcf":
+            fcf = {y: self.operating_cash_flow[y] - self.capex[y] for y in self.operating_cash_flow if y in self.capex}
+            return self._pick(fcf, fy)
+        return None
+
+
+FACT_COLUMNS = "concept, unit, form, period_end, period_start, val, fy, fp, filed, accn"
+
+
+class FactStore:
+    def __init__(self, db_path: str = "data/cache/sec_facts.db"):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WITHOUT ROWID: rows live in the primary-key b-tree, whose prefix
+        # (cik, concept, form, period_end) is the lookup index - no second copy.
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS facts (
+                cik TEXT NOT NULL,
+                concept TEXT NOT NULL,
+                form TEXT NOT NULL,
+                period_end TEXT NOT NULL,
+                unit TEXT NOT NULL,
+                taxonomy TEXT NOT NULL,
+                period_start TEXT NOT NULL DEFAULT '',
+                accn TEXT NOT NULL DEFAULT '',
+                fp TEXT,
+                fy INTEGER,
+                filed TEXT,
+                val REAL NOT NULL,
+                PRIMARY KEY (cik, concept, form, period_end, unit, taxonomy, period_start, accn)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS filers (
+                cik TEXT PRIMARY KEY,
+                name TEXT,
+                fetched_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                facts INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+
+    # --- WRITES ---
+    def ingest(self, cik: str, payload: Dict, etag: Optional[str] = None,
+               last_modified: Optional[str] = None, fetched_at: Optional[float] = None) -> int:
+        """Replaces everything stored for `cik` with the facts in a companyfacts payload."""
+        rows = list(_flatten(cik, payload))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM facts WHERE cik = ?", (cik,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO facts (cik, concept, form, period_end, unit, taxonomy, period_start, "
+                "accn, fp, fy, filed, val) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO filers (cik, name, fetched_at, etag, last_modified, facts) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cik, payload.get("entityName"), fetched_at or time.time(), etag, last_modified, len(rows)),
+            )
+        return len(rows)
+
+    def touch(self, cik: str):
+        """Upstream answered 304: the stored facts are current again."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE filers SET fetched_at = ? WHERE cik = ?", (time.time(), cik))
+
+    # --- READS ---
+    def filer(self, cik: str) -> Optional[Dict]:
+        """Freshness + HTTP validators for a filer, or None if it was never ingested."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, fetched_at, etag, last_modified, facts FROM filers WHERE cik = ?", (cik,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("name", "fetched_at", "etag", "last_modified", "facts"), row))
+
+    def latest(self, cik: str, concepts: Iterable[str], form: Optional[str] = "10-K",
+               unit: str = "USD") -> Optional[Fact]:
+        """Most recent period for the first concept (in priority order) that has any facts."""
+        form_clause = "AND form = ?" if form else ""
+        for concept in concepts:
+            params = [cik, concept] + ([form] if form else []) + [unit]
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT {FACT_COLUMNS} FROM facts WHERE cik = ? AND concept = ? {form_clause} AND unit = ? "
+                    "ORDER BY period_end DESC, filed DESC LIMIT 1", params
+                ).fetchone()
+            if row:
+                return Fact(*row)
+        return None
+
+    def series(self, cik: str, concept: str, form: Optional[str] = "10-K", unit: str = "USD",
+               start: Optional[str] = None, end: Optional[str] = None) -> List[Fact]:
+        """Facts for one concept ordered by period end (latest filing wins per period)."""
+        clauses, params = ["cik = ?", "concept = ?", "unit = ?"], [cik, concept, unit]
+        for clause, value in (("form = ?", form), ("period_end >= ?", start), ("period_end <= ?", end)):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {FACT_COLUMNS} FROM facts WHERE {' AND '.join(clauses)} "
+                "ORDER BY period_end, period_start, filed", params
+            ).fetchall()
+        by_period = {}
+        for row in rows:
+            by_period[(row[3], row[4])] = Fact(*row)  # later filings (restatements) overwrite
+        return list(by_period.values())
+
+    def annual(self, cik: str, concepts: Iterable[str], unit: str = "USD") -> Dict[int, float]:
+        """
+        {fiscal_year: value} for full-year 10-K periods, taking each year from the first
+        concept (in priority order) that reports it - filers switch concepts over time.
+        The fiscal year is the calendar year the period ends in (NVDA FY2024 ends Jan 2024).
+        """
+        by_year: Dict[int, float] = {}
+        for concept in concepts:
+            for fact in self.series(cik, concept, form="10-K", unit=unit):
+                if fact.period_start and not _is_annual(fact.period_start, fact.period_end):
+                    continue  # quarterly figures inside a 10-K
+                by_year.setdefault(int(fact.period_end[:4]), fact.val)
+        return by_year
+
+    def count(self, cik: Optional[str] = None) -> int:
+        with self._lock:
+            if cik:
+                return self._conn.execute("SELECT COUNT(*) FROM facts WHERE cik = ?", (cik,)).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+def _is_annual(start: str, end: str) -> bool:
+    try:
+        days = (datetime.date.fromisoformat(end) - datetime.date.fromisoformat(start)).days
+    except ValueError:
+        return True
+    return 340 <= days <= 380
+
+
+def _flatten(cik: str, payload: Dict):
+    """companyfacts {"facts": {taxonomy: {concept: {"units": {unit: [fact, ...]}}}}} -> rows."""
+    for taxonomy, concepts in (payload.get("facts") or {}).items():
+        for concept, body in concepts.items():
+            for unit, entries in (body.get("units") or {}).items():
+                for e in entries:
+                    if e.get("end") is None or e.get("val") is None:
+                        continue
+                    yield (cik, concept, e.get("form") or "", e["end"], unit, taxonomy,
+                           e.get("start") or "", e.get("accn") or "", e.get("fp"), e.get("fy"),
+                           e.get("filed"), float(e["val"]))
+
+
+_shared: Dict[str, FactStore] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_fact_store() -> FactStore:
+    """Process-wide store. SEC_FACT_DB overrides the location."""
+    path = os.getenv("SEC_FACT_DB", "data/cache/sec_facts.db")
+    with _shared_lock:
+        if path not in _shared:
+            _shared[path] = FactStore(path)
+        return _shared[path]
@@ -0,0 +1,183 @@
+"""
+HTTP Plumbing
+Pooled requests.Session, a token-bucket rate limiter shared by every thread (and,
+through SQLite, every process on the machine - or every node, with the bucket file on
+a shared filesystem) and conditional GETs, so data clients can fan out without
+breaking provider rate limits (SEC: 10 req/s).
+"""
+import email.utils
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests/second with bursts of up to `burst`.
+    With db_path the bucket lives in a SQLite row, so separate processes draw from
+    the same budget; without it the bucket is per-process (still thread-safe).
+    journal_mode="DELETE" lets hosts sharing db_path over a network filesystem use it.
+    """
+
+    def __init__(self, rate: float, burst: float = 1, db_path: Optional[str] = None, name: str = "default",
+                 journal_mode: str = "WAL"):
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self.waited_s = 0.0
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+            self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def acquire(self, tokens: float = 1):
+        """Blocks until `tokens` are available, then takes them."""
+        while True:
+            with self._lock:
+                wait = self._take_shared(tokens) if self._conn else self._take_local(tokens)
+            if wait <= 0:
+                return
+            self.waited_s += wait
+            time.sleep(wait)
+
+    def _take_local(self, tokens: float) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def _take_shared(self, tokens: float) -> float:
+        # Wall clock, not monotonic: the timestamp is compared across processes
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+            available = self.burst if row is None else min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+            wait = 0.0
+            if available >= tokens:
+                available -= tokens
+            else:
+                wait = (tokens - available) / self.rate
+            self._conn.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                               (self.name, available, now))
+            self._conn.execute("COMMIT")
+            return wait
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+
+def create_session(pool_size: int = 16) -> requests.Session:
+    """Session with a connection pool sized for `pool_size` concurrent requests per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HttpClient:
+    """
+    Rate-limited GETs over a pooled session. Retries 429/5xx (honouring Retry-After),
+    and each attempt draws a token, so retries cannot burst past the limit either.
+    """
+
+    def __init__(self, user_agent: str, limiter: Optional[TokenBucket] = None,
+                 session: Optional[requests.Session] = None, timeout: float = 10, max_attempts: int = 3):
+        self.headers = {"User-Agent": user_agent, "Accept-Encoding": "gzip, deflate"}
+        self.limiter = limiter
+        self.session = session or get_shared_session()
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.requests_made = 0
+        self.not_modified = 0
+        self.bytes_received = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> requests.Response:
+        """GET with If-None-Match / If-Modified-Since when validators are given (304 = unchanged)."""
+        headers = dict(self.headers)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        for attempt in range(1, self.max_attempts + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+            with self._stats_lock:
+                self.requests_made += 1
+                self.bytes_received += len(resp.content)
+                if resp.status_code == 304:
+                    self.not_modified += 1
+            if resp.status_code not in RETRYABLE_STATUSES or attempt == self.max_attempts:
+                break
+            time.sleep(_retry_after(resp) or min(2 ** attempt, 30))
+        if resp.status_code != 304:
+            resp.raise_for_status()
+        return resp
+
+    def stats(self) -> Dict:
+        return {"requests": self.requests_made, "not_modified": self.not_modified,
+                "bytes": self.bytes_received}
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_session: Optional[requests.Session] = None
+_limiters: Dict[tuple, TokenBucket] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_session() -> requests.Session:
+    """One pooled session per process (connections to a host are reused across clients)."""
+    global _session
+    with _shared_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def get_shared_limiter(name: str = "sec", rate: Optional[float] = None, burst: float = 2) -> TokenBucket:
+    """
+    Machine-wide limiter for a provider. SEC_MAX_RPS (default 8, burst 2) keeps every
+    one-second window within SEC's 10 req/s; RATE_LIMIT_DB is the shared bucket file
+    (RATE_LIMIT_JOURNAL=DELETE when it sits on a filesystem shared by several hosts).
+    """
+    config = (name, os.getenv("RATE_LIMIT_DB", "data/cache/rate_limits.db"),
+              rate if rate is not None else float(os.getenv(f"{name.upper()}_MAX_RPS", 8)), burst,
+              os.getenv("RATE_LIMIT_JOURNAL", "WAL"))
+    with _shared_lock:
+        if config not in _limiters:
+            _limiters[config] = TokenBucket(rate=config[2], burst=burst, db_path=config[1], name=name,
+                                            journal_mode=config[4])
+        return _limiters[config]
@@ -0,0 +1,159 @@
+"""
+SEC Prefetch
+Warms the SEC fact store for a whole ticker universe ahead of a scoring run, so
+validation finds every filer fresh and makes no network calls. Filers are synced
+concurrently; the shared token bucket keeps the fan-out within SEC's rate limit.
+
+    python -m src.data.prefetch NVDA AAPL MSFT
+    python -m src.data.prefetch --file universe.txt
+    python -m src.data.prefetch --from-pdfs          # tickers of the pending PDFs
+"""
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+from src.data.sec_edgar import SECEdgarClient
+
+HIT_STATUSES = ("fresh", "not_modified")
+
+
+@dataclass
+class PrefetchReport:
+    tickers: int = 0
+    companies: int = 0
+    unresolved: List[str] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    requests: int = 0
+    bytes: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of filers that needed no download (fresh, or a 304 revalidation)."""
+        if not self.companies:
+            return 0.0
+        return sum(self.statuses[s] for s in HIT_STATUSES) / self.companies
+
+    @property
+    def failed(self) -> int:
+        return self.statuses["failed"] + self.statuses["stale"]
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{n} {s}" for s, n in sorted(self.statuses.items()))
+        return (f"{self.companies} filers for {self.tickers} tickers in {self.elapsed_s:.1f}s "
+                f"({counts or 'nothing to do'}); {self.requests} requests, "
+                f"{self.bytes / 1e6:.1f} MB, hit rate {self.hit_rate:.0%}")
+
+
+def prefetch_sec(tickers: Iterable[str], client: Optional[SECEdgarClient] = None, workers: int = 8,
+                 progress: Optional[Callable[[int, int, str, str], None]] = None) -> PrefetchReport:
+    """
+    Syncs the filer of every ticker (share classes of one CIK are fetched once).
+    progress(done, total, label, status) is called after each filer; prints by default.
+    """
+    client = client or SECEdgarClient()
+    progress = progress or _print_progress
+    report = PrefetchReport()
+    start = time.perf_counter()
+    requests_before, bytes_before = client.http.requests_made, client.http.bytes_received
+
+    by_cik: Dict[str, List[str]] = {}
+    for ticker in dict.fromkeys(t.upper().strip() for t in tickers if t and t.strip()):
+        report.tickers += 1
+        company = client.lookup.lookup(ticker)
+        if company is None:
+            report.unresolved.append(ticker)
+            continue
+        by_cik.setdefault(company.cik, []).append(ticker)
+    report.companies = len(by_cik)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(client.sync_facts, cik): "/".join(names) for cik, names in by_cik.items()}
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                status = future.result()
+            except Exception as e:
+                print(f"   ❌ {futures[future]}: {e}")
+                status = "failed"
+            report.statuses[status] += 1
+            progress(done, report.companies, futures[future], status)
+
+    report.requests = client.http.requests_made - requests_before
+    report.bytes = client.http.bytes_received - bytes_before
+    report.elapsed_s = time.perf_counter() - start
+    return report
+
+
+def tickers_from_documents(documents: Iterable[Dict], lookup) -> Counter:
+    """Ticker-extraction pass: how many pending documents route to each ticker."""
+    counts = Counter()
+    for doc in documents:
+        ticker = lookup.extract_ticker(doc['content'])
+        if ticker:
+            counts[ticker] += 1
+    return counts
+
+
+def _print_progress(done: int, total: int, label: str, status: str):
+    icon = "✅" if status in HIT_STATUSES or status == "downloaded" else "⚠️"
+    print(f"   {icon} [{done}/{total}] {label}: {status}")
+
+
+def _read_ticker_file(path: str) -> List[str]:
+    with open(path, 'r') as f:
+        return [token for line in f for token in line.split("#")[0].replace(",", " ").split()]
+
+
+def main(argv: Optional[List[str]] = None) -> PrefetchReport:
+    parser = argparse.ArgumentParser(description="Warm the SEC fact store before a scoring run.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to prefetch")
+    parser.add_argument("--file", help="File with tickers (whitespace/comma separated, # comments)")
+    parser.add_argument("--from-pdfs", nargs="?", const="data/raw_pdfs", metavar="DIR",
+                        help="Also prefetch the tickers of every not-yet-scored PDF in DIR")
+    parser.add_argument("--yahoo", action="store_true",
+                        help="Also warm the Yahoo consensus cache for the same tickers")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PREFETCH_WORKERS", 8)),
+                        help="Filers synced concurrently (the SEC rate limit still applies)")
+    parser.add_argument("--ingest-workers", type=int, default=int(os.getenv("INGEST_WORKERS", 1)),
+                        help="Processes for PDF extraction with --from-pdfs (0 = one per core)")
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers)
+    if args.file:
+        tickers += _read_ticker_file(args.file)
+
+    client = SECEdgarClient()
+    if args.from_pdfs:
+        from src.ingestion.pdf_loader import PDFLoader
+        from src.storage.file_index import ProcessedIndex
+        loader = PDFLoader(raw_dir=args.from_pdfs)
+        index = ProcessedIndex("data/processed/file_index.db")
+        found = tickers_from_documents(loader.iter_documents(workers=args.ingest_workers, index=index),
+                                       client.lookup)
+        print(f"🔎 Ticker pass: {sum(found.values())} single-stock docs -> {len(found)} tickers "
+              f"({', '.join(t for t, _ in found.most_common(10))}{', ...' if len(found) > 10 else ''})")
+        tickers += list(found)
+
+    if not tickers:
+        parser.error("no tickers given (pass tickers, --file or --from-pdfs)")
+
+    print(f"🛰️  Prefetching SEC facts for {len(set(tickers))} tickers ({args.workers} workers)...")
+    report = prefetch_sec(tickers, client=client, workers=args.workers)
+    print(f"📦 Prefetch: {report.summary()}")
+    if report.unresolved:
+        print(f"⚠️ Unresolved tickers: {', '.join(report.unresolved)}")
+
+    if args.yahoo:
+        from src.data.yahoo_finance import YahooFinanceClient
+        yahoo = YahooFinanceClient(max_workers=args.workers)
+        quotes = yahoo.get_consensus_many(tickers)
+        stats = yahoo.stats()
+        print(f"💹 Yahoo consensus: {len(quotes)} tickers ({stats['hits']} cached, {stats['fetches']} fetched)")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -2,91 +2,123 @@
 SEC EDGAR Client
 Fetches verified financial numbers (Revenue, EPS) from official XBRL filings.
 """
-import requests
 import json
 import time
 import os
-from datetime import datetime
+import threading
+from collections import defaultdict
 from typing import Optional, Tuple
 from src.data.company_lookup import CompanyLookup
+from src.data.fact_store import FactSet, FactStore, get_shared_fact_store
+from src.data.http import HttpClient, get_shared_limiter
+from src.pipeline.metrics import get_metrics
 
 class SECEdgarClient:
     BASE_URL = "https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
+    CACHE_TTL = 7 * 86400  # after this, revalidate with the server (304 = keep the stored facts)
+
+    # Concepts to search for (GAAP Revenue), in priority order
+    REVENUE_CONCEPTS = [
+        "RevenueFromContractWithCustomerExcludingAssessedTax",
+        "Revenues",
+        "SalesRevenueNet"
+    ]
+    # Everything the claim validator checks, fetched together (see get_fact_set)
+    FACT_SET_CONCEPTS = {
+        "revenue": (REVENUE_CONCEPTS, "USD"),
+        "gross_profit": (["GrossProfit"], "USD"),
+        "operating_cash_flow": (["NetCashProvidedByUsedInOperatingActivities"], "USD"),
+        "capex": (["PaymentsToAcquirePropertyPlantAndEquipment", "PaymentsToAcquireProductiveAssets"], "USD"),
+        "eps_diluted": (["EarningsPerShareDiluted", "EarningsPerShareBasic"], "USD/shares"),
+    }
     
-    def __init__(self, user_agent: str = "EquityResearchBot/1.0 (internal@test.com)"):
+    def __init__(self, user_agent: str = "EquityResearchBot/1.0 (internal@test.com)",
+                 cache_dir: str = "data/cache/sec", store: Optional[FactStore] = None):
         self.user_agent = user_agent
         self.lookup = CompanyLookup()
-        
-        # Auto-create a cache folder to prevent rate-limit bans
-        self.cache_dir = "data/cache/sec"
-        os.makedirs(self.cache_dir, exist_ok=True)
+        # Pooled connections + machine-wide token bucket (SEC allows 10 req/s)
+        self.http = HttpClient(user_agent, limiter=get_shared_limiter("sec"))
+        # Facts are parsed once on download into an indexed store (no JSON on the hot path)
+        self.store = store or get_shared_fact_store()
+        # Raw companyfacts JSON cache of earlier versions: imported into the store on first use
+        self.cache_dir = cache_dir
+        self._cik_locks = defaultdict(threading.Lock)
+        self._cik_locks_guard = threading.Lock()
 
     def get_latest_revenue(self, ticker: str) -> Optional[Tuple[float, int, str]]:
         """
         Returns (Revenue_Value, Fiscal_Year, Form_Type)
         Example: (52000000000.0, 2024, '10-K')
         """
-        facts = self._get_company_facts(ticker)
-        if not facts: return None
-        
-        # Concepts to search for (GAAP Revenue)
-        concepts = [
-            "RevenueFromContractWithCustomerExcludingAssessedTax",
-            "Revenues",
-            "SalesRevenueNet"
-        ]
+        cik = self.ensure_facts(ticker)
+        if not cik: return None
         
-        us_gaap = facts.get("facts", {}).get("us-gaap", {})
-        
-        best_fact = None
-        
-        for concept in concepts:
-            if concept in us_gaap:
-                # Get all annual filings (10-K)
-                entries = [x for x in us_gaap[concept]["units"].get("USD", []) 
-                           if x.get("form") == "10-K"]
-                
-                if entries:
-                    # Sort by latest date
-                    entries.sort(key=lambda x: x["end"], reverse=True)
-                    latest = entries[0]
-                    
-                    # Return immediately if we found a valid 10-K number
-                    return (float(latest["val"]), latest["fy"], "10-K")
-                    
-        return None
+        # Latest annual filing (10-K) of the first concept that has any
+        fact = self.store.latest(cik, self.REVENUE_CONCEPTS, form="10-K", unit="USD")
+        if fact is None:
+            return None
+        return (fact.val, fact.fy, "10-K")
+
+    def get_fact_set(self, ticker: str) -> Optional[FactSet]:
+        """All annual figures the validator needs for a ticker: one sync, a few index scans."""
+        cik = self.ensure_facts(ticker)
+        if not cik:
+            return None
+        return FactSet(**{name: self.store.annual(cik, concepts, unit)
+                          for name, (concepts, unit) in self.FACT_SET_CONCEPTS.items()})
 
-    def _get_company_facts(self, ticker: str) -> dict:
-        """Fetches XBRL JSON with filesystem caching."""
+    def ensure_facts(self, ticker: str) -> Optional[str]:
+        """Makes sure the fact store holds current facts for the ticker's filer. Returns the CIK."""
         company = self.lookup.lookup(ticker)
         if not company:
             print(f"❌ SEC Client: Could not resolve CIK for {ticker}")
-            return {}
+            return None
+        status = self.sync_facts(company.cik)
+        return company.cik if status != "failed" else None
 
-        cik = company.cik
-        cache_path = os.path.join(self.cache_dir, f"{cik}.json")
-        
-        # 1. Check Cache (Valid for 7 days)
-        if os.path.exists(cache_path):
-            mtime = os.path.getmtime(cache_path)
-            if (time.time() - mtime) < (7 * 86400): 
-                with open(cache_path, 'r') as f:
-                    return json.load(f)
+    def sync_facts(self, cik: str) -> str:
+        """
+        Brings one filer up to date. Returns how:
+        fresh (within TTL) | not_modified (304) | downloaded | stale (fetch failed, old facts kept) | failed
+        """
+        with self._cik_locks_guard:
+            lock = self._cik_locks[cik]
+        with lock:  # concurrent validations of one company share a single download
+            filer = self.store.filer(cik) or self._import_legacy_cache(cik)
+            if filer and (time.time() - filer["fetched_at"]) < self.CACHE_TTL:
+                return "fresh"
+
+            url = self.BASE_URL.format(cik=cik)
+            try:
+                with get_metrics().stage("sec_fetch") as span:
+                    resp = self.http.get(url, etag=filer and filer["etag"],
+                                         last_modified=filer and filer["last_modified"])
+                    span.add_bytes(len(resp.content))
+                    if resp.status_code == 304:
+                        self.store.touch(cik)
+                        return "not_modified"
+                    self.store.ingest(cik, resp.json(), etag=resp.headers.get("ETag"),
+                                      last_modified=resp.headers.get("Last-Modified"))
+                    return "downloaded"
+            except Exception as e:
+                print(f"⚠️ SEC Fetch failed for CIK {cik}: {e}")
+                return "stale" if filer else "failed"  # stale beats nothing
 
-        # 2. Fetch from SEC (Rate Limited)
-        url = self.BASE_URL.format(cik=cik)
+    def _import_legacy_cache(self, cik: str) -> Optional[dict]:
+        cache_path = os.path.join(self.cache_dir, f"{cik}.json")
+        if not os.path.exists(cache_path):
+            return None
         try:
-            # Sleep to respect SEC 10 req/sec limit
-            time.sleep(0.15) 
-            resp = requests.get(url, headers={"User-Agent": self.user_agent}, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            # Save to cache
-            with open(cache_path, 'w') as f:
-                json.dump(data, f)
-                
-            return data
+            with open(cache_path, 'r') as f:
+                payload = json.load(f)
+            meta = {}
+            meta_path = os.path.join(self.cache_dir, f"{cik}.meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+            self.store.ingest(cik, payload, etag=meta.get("etag"), last_modified=meta.get("last_modified"),
+                              fetched_at=os.path.getmtime(cache_path))
         except Exception as e:
-            print(f"⚠️ SEC Fetch failed for {ticker}: {e}")
-            return {}
\ No newline at end of file
+            print(f"⚠️ Could not import cached SEC facts {cache_path}: {e}")
+            return None
+        return self.store.filer(cik)
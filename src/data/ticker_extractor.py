@@ -0,0 +1,126 @@
+"""
+Ticker Extractor
+Finds the ticker a research note is about. The text is tokenized once with a single
+regex; bare tokens are checked against the set of known tickers (hash lookups, not a
+regex per ticker), and every mention is scored by how it was written and where, so
+a note that merely name-drops a few tickers is not routed as a single-stock report.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+EXCHANGES = r"NASDAQ|NYSE|NYSE\s?American|AMEX|OTC|TSX|LSE"
+
+# One pass over the text; each alternative is a different kind of evidence
+TOKEN_RE = re.compile(rf"""
+    (?i:ticker|symbol)[:\s]+(?P<label>[A-Z]{{1,5}})\b                     # "Ticker: NVDA"
+  | (?<=[A-Za-z.,])\s?\((?:(?:{EXCHANGES})\s?:\s?)?(?P<paren>[A-Z]{{1,5}})\) # "NVIDIA (NVDA)", "Corp (NASDAQ: NVDA)"
+  | (?:{EXCHANGES})\s?:\s?(?P<exchange>[A-Z]{{1,5}})\b                    # "NASDAQ: NVDA"
+  | \b(?P<bare>[A-Z]{{2,5}})\b                                            # "NVDA"
+""", re.VERBOSE)
+
+KIND_WEIGHTS = {"label": 6.0, "paren": 5.0, "exchange": 5.0, "bare": 1.0}
+STRONG_KINDS = {"label", "paren", "exchange"}
+
+HEADER_CHARS = 500     # the title block: mentions here count double
+HEADER_BOOST = 2.0
+UNKNOWN_PENALTY = 0.5  # "(XYZ)" that is not a known ticker (foreign listing, acronym, stale map)
+
+# Uppercase words that are also listed tickers but in a research note almost never mean the company
+COMMON_WORDS = frozenset("""
+    AI ALL AM AN AND ANY ARE AS AT BE BIG BUT BY CAN DAY FOR GO HAS HE IF IN IS IT ITS KEY
+    LOW ME MY NEW NO NOT NOW OF OLD ON ONE OR OUR OUT PM SEE SO THE TO TOP TWO UP US WAY WE
+    BUY SELL HOLD OW UW EW NA PT EST TBD YTD YOY QOQ TTM CAGR BPS PCT
+    CEO CFO COO CTO IR PR VP HR EPS FCF ROE ROA ROI ROIC EBIT GAAP DCF NAV TAM ASP ARPU
+    EV PE IPO ETF ESG AUM NII NIM LTV OEM API SAAS CPI PPI PMI GDP FED ECB BOJ IMF OECD
+    SEC USA USD EUR GBP JPY CNY EU UK CN JP LLC INC CORP PLC LTD CO Q1 Q2 Q3 Q4 FY
+""".split())
+
+
+@dataclass
+class TickerCandidate:
+    ticker: str
+    score: float = 0.0
+    mentions: int = 0
+    first_position: int = -1
+    evidence: Set[str] = field(default_factory=set)
+    confidence: float = 0.0  # share of the document's total ticker evidence
+
+    @property
+    def strong(self) -> bool:
+        return bool(self.evidence & STRONG_KINDS)
+
+
+class TickerExtractor:
+    """
+    known_tickers: a set, or a zero-arg callable returning one (resolved on first use,
+    so building an extractor never triggers the SEC download).
+    version: optional zero-arg callable; the known set is resolved again whenever its
+    value changes (e.g. TickerIndex.version after a TTL refresh).
+    """
+
+    MIN_CONFIDENCE = 0.5  # bare-mention-only winners need at least half the evidence...
+    MIN_BARE_MENTIONS = 3  # ...and either a header mention or this many mentions
+
+    def __init__(self, known_tickers, version: Optional[Callable[[], Any]] = None):
+        self._known_source = known_tickers
+        self._version_source = version
+        self._known: Optional[Set[str]] = None
+        self._version = None
+
+    @property
+    def known(self) -> Set[str]:
+        version = self._version_source() if self._version_source else None
+        if self._known is None or version != self._version:
+            source = self._known_source
+            self._known = set(source() if callable(source) else source)
+            self._version = version
+        return self._known
+
+    def rank(self, text: str, limit: int = 5) -> List[TickerCandidate]:
+        """Every ticker candidate in the text, best first, with confidence."""
+        known = self.known
+        candidates: Dict[str, TickerCandidate] = {}
+
+        for match in TOKEN_RE.finditer(text):
+            kind = match.lastgroup
+            ticker = match.group(kind).upper()
+            is_known = ticker in known
+            if kind == "bare" and (not is_known or ticker in COMMON_WORDS):
+                continue
+            if kind == "paren" and ticker in COMMON_WORDS:
+                continue  # "Artificial Intelligence (AI)", "Earnings per Share (EPS)"
+
+            position = match.start(kind)
+            weight = KIND_WEIGHTS[kind]
+            if position < HEADER_CHARS:
+                weight *= HEADER_BOOST
+            if kind in STRONG_KINDS and not is_known:
+                weight *= UNKNOWN_PENALTY
+
+            candidate = candidates.get(ticker)
+            if candidate is None:
+                candidate = candidates[ticker] = TickerCandidate(ticker, first_position=position)
+            candidate.score += weight
+            candidate.mentions += 1
+            candidate.evidence.add(kind)
+
+        total = sum(c.score for c in candidates.values())
+        ranked = sorted(candidates.values(), key=lambda c: (-c.score, c.first_position))
+        for candidate in ranked:
+            candidate.score = round(candidate.score, 2)
+            candidate.confidence = round(candidate.score / total, 3) if total else 0.0
+        return ranked[:limit]
+
+    def extract(self, text: str) -> Optional[str]:
+        """The primary ticker, or None if the evidence does not single one out (macro notes)."""
+        ranked = self.rank(text, limit=1)
+        if not ranked:
+            return None
+        top = ranked[0]
+        if top.strong:
+            return top.ticker
+        in_header = 0 <= top.first_position < HEADER_CHARS
+        if top.confidence >= self.MIN_CONFIDENCE and (in_header or top.mentions >= self.MIN_BARE_MENTIONS):
+            return top.ticker
+        return None
@@ -0,0 +1,174 @@
+"""
+SEC Ticker Index
+Local SQLite copy of the SEC `company_tickers.json` map (ticker -> CIK -> name),
+refreshed on a TTL (also in long-running processes) and shared by every CompanyLookup
+in the process. Lookups by ticker, CIK or name prefix are indexed queries - nothing
+is loaded into Python objects up front.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from src.data.http import HttpClient, get_shared_limiter
+
+SEC_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+SEC_USER_AGENT = "EquityScorerBot/1.0 (contact@example.com)"
+
+Row = Tuple[str, str, str]  # (ticker, cik, name)
+RECHECK_S = 900  # minimum gap between TTL checks, so a failed refresh is not retried on every lookup
+
+
+class TickerIndex:
+    def __init__(self, db_path: str = "data/cache/sec_tickers.db", ttl_days: float = 7,
+                 url: str = SEC_TICKERS_URL, timeout: float = 10):
+        self.db_path = db_path
+        self.ttl = ttl_days * 86400
+        self.url = url
+        self.timeout = timeout
+        self._next_check = 0.0  # TTL is checked when the loaded copy expires, not per lookup
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS companies (
+                ticker TEXT PRIMARY KEY,
+                cik TEXT NOT NULL,
+                name TEXT NOT NULL,
+                name_key TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_companies_cik ON companies(cik);
+            CREATE INDEX IF NOT EXISTS idx_companies_name ON companies(name_key);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    # --- FRESHNESS ---
+    @property
+    def fetched_at(self) -> float:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'fetched_at'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    def is_stale(self) -> bool:
+        return time.time() - self.fetched_at > self.ttl
+
+    def ensure_fresh(self):
+        """Refreshes from the SEC if the local copy is older than the TTL (checked again once it expires)."""
+        with self._lock:
+            now = time.time()
+            if now < self._next_check:
+                return
+            if self.is_stale():
+                self.refresh()
+            self._next_check = max(self.fetched_at + self.ttl, now + RECHECK_S)
+
+    def version(self) -> float:
+        """Changes whenever a new copy is fetched (here or by another process), e.g. to invalidate memos."""
+        self.ensure_fresh()
+        with self._lock:
+            return self.fetched_at
+
+    def refresh(self) -> bool:
+        """Downloads the SEC map and swaps it in atomically. On failure the old copy is kept."""
+        validators = dict(self._conn.execute(
+            "SELECT key, value FROM meta WHERE key IN ('etag', 'last_modified')").fetchall()) if len(self) else {}
+        try:
+            http = HttpClient(SEC_USER_AGENT, limiter=get_shared_limiter("sec"), timeout=self.timeout)
+            resp = http.get(self.url, etag=validators.get("etag"), last_modified=validators.get("last_modified"))
+            if resp.status_code == 304:
+                with self._lock:
+                    self._set_meta(fetched_at=time.time())
+                return True
+            data = resp.json()
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to refresh SEC ticker list: {e}"
+                  + (" (using stale local copy)" if len(self) else ""))
+            return False
+        rows = {}
+        for entry in data.values():
+            ticker = str(entry['ticker']).upper()
+            rows.setdefault(ticker, (ticker, str(entry['cik_str']).zfill(10), entry['title'],
+                                     entry['title'].lower()))
+        self.load_rows(rows.values())
+        with self._lock:
+            self._set_meta(etag=resp.headers.get("ETag"), last_modified=resp.headers.get("Last-Modified"))
+        print(f"📇 SEC ticker index refreshed: {len(rows):,} tickers")
+        return True
+
+    def load_rows(self, rows, fetched_at: Optional[float] = None):
+        """Replaces the table contents in one transaction (readers never see a half-loaded map)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM companies")
+                self._conn.execute("DELETE FROM meta WHERE key IN ('etag', 'last_modified')")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO companies (ticker, cik, name, name_key) VALUES (?, ?, ?, ?)", rows
+                )
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fetched_at', ?)",
+                                   (str(fetched_at if fetched_at is not None else time.time()),))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _set_meta(self, **values):
+        self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               [(k, str(v)) for k, v in values.items() if v is not None])
+
+    # --- LOOKUPS ---
+    def by_ticker(self, ticker: str) -> Optional[Row]:
+        self.ensure_fresh()
+        with self._lock:
+            return self._conn.execute(
+                "SELECT ticker, cik, name FROM companies WHERE ticker = ?", (ticker.upper().strip(),)
+            ).fetchone()
+
+    def by_cik(self, cik) -> List[Row]:
+        """All share classes filed under a CIK (e.g. GOOG and GOOGL)."""
+        self.ensure_fresh()
+        with self._lock:
+            return self._conn.execute(
+                "SELECT ticker, cik, name FROM companies WHERE cik = ? ORDER BY ticker",
+                (str(cik).strip().zfill(10),),
+            ).fetchall()
+
+    def search_name(self, prefix: str, limit: int = 10) -> List[Row]:
+        """Case-insensitive company-name prefix search (an index range scan, not LIKE)."""
+        key = prefix.lower().strip()
+        if not key:
+            return []
+        self.ensure_fresh()
+        with self._lock:
+            return self._conn.execute(
+                "SELECT ticker, cik, name FROM companies WHERE name_key >= ? AND name_key < ? "
+                "ORDER BY name_key, ticker LIMIT ?",
+                (key, key + "\uffff", limit),
+            ).fetchall()
+
+    def tickers(self) -> Set[str]:
+        """Every known ticker (one column scan), e.g. for matching tokens in a document."""
+        self.ensure_fresh()
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT ticker FROM companies")}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+_shared: Dict[tuple, TickerIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_index() -> TickerIndex:
+    """Process-wide index (per configuration). SEC_TICKER_DB / SEC_TICKER_TTL_DAYS override defaults."""
+    config = (os.getenv("SEC_TICKER_DB", "data/cache/sec_tickers.db"),
+              float(os.getenv("SEC_TICKER_TTL_DAYS", 7)))
+    with _shared_lock:
+        if config not in _shared:
+            _shared[config] = TickerIndex(db_path=config[0], ttl_days=config[1])
+        return _shared[config]
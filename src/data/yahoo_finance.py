@@ -1,57 +1,192 @@
 """
 Yahoo Finance Client
 Fetches market consensus, pricing, and forward estimates.
+Quotes are cached in-process and on disk (SQLite) per ticker with separate TTLs for
+price fields (short) and analyst estimates (long); concurrent lookups of one ticker
+share a single fetch, and get_consensus_many fans a ticker list out in parallel.
 """
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
 import yfinance as yf
-from typing import Optional, Dict
+from src.pipeline.metrics import get_metrics
+
+# Field groups and how long each stays fresh (seconds)
+FIELD_GROUPS = {
+    "price": ("current_price", "market_cap"),
+    "estimates": ("consensus_eps", "target_mean"),
+}
+DEFAULT_TTLS = {"price": 15 * 60, "estimates": 24 * 3600}
+
+
+def _empty_result() -> Dict:
+    return {
+        "current_price": None,
+        "consensus_eps": None,
+        "target_mean": None,
+        "market_cap": None
+    }
+
+
+class QuoteCache:
+    """Per-(ticker, field group) cache: dict in front of a SQLite table."""
+
+    def __init__(self, db_path: Optional[str] = "data/cache/yahoo.db", ttls: Optional[Dict[str, float]] = None):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._memory: Dict[Tuple[str, str], Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS quotes (
+                    ticker TEXT NOT NULL,
+                    field_group TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (ticker, field_group)
+                )
+            """)
+
+    @classmethod
+    def from_env(cls) -> "QuoteCache":
+        """YAHOO_CACHE_PATH (empty = memory only), YAHOO_PRICE_TTL / YAHOO_ESTIMATES_TTL in seconds."""
+        return cls(
+            db_path=os.getenv("YAHOO_CACHE_PATH", "data/cache/yahoo.db") or None,
+            ttls={"price": float(os.getenv("YAHOO_PRICE_TTL", DEFAULT_TTLS["price"])),
+                  "estimates": float(os.getenv("YAHOO_ESTIMATES_TTL", DEFAULT_TTLS["estimates"]))},
+        )
+
+    def get(self, ticker: str, group: str, allow_stale: bool = False) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get((ticker, group))
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT fetched_at, payload FROM quotes WHERE ticker = ? AND field_group = ?", (ticker, group)
+                ).fetchone()
+                if row:
+                    entry = self._memory[(ticker, group)] = (row[0], json.loads(row[1]))
+        if entry is None or (not allow_stale and now - entry[0] > self.ttls[group]):
+            return None
+        return entry[1]
+
+    def put(self, ticker: str, values: Dict):
+        """Stores every field group of a freshly fetched quote."""
+        now = time.time()
+        groups = {g: {f: values.get(f) for f in fields} for g, fields in FIELD_GROUPS.items()}
+        with self._lock:
+            for group, payload in groups.items():
+                self._memory[(ticker, group)] = (now, payload)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO quotes (ticker, field_group, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                        [(ticker, g, json.dumps(p), now) for g, p in groups.items()],
+                    )
+
 
 class YahooFinanceClient:
-    def __init__(self):
-        pass
+    """
+    backend: anything with yfinance's `Ticker(symbol).info` interface (the yfinance
+    module by default; tests pass a stub).
+    """
+
+    def __init__(self, backend=None, cache: Optional[QuoteCache] = None, max_workers: int = 8):
+        self.backend = backend or yf
+        self.cache = cache or QuoteCache.from_env()
+        self.max_workers = max_workers
+        self.fetches = 0
+        self.hits = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
 
-    def get_consensus(self, ticker: str) -> Dict:
+    def get_consensus(self, ticker: str, need: Iterable[str] = tuple(FIELD_GROUPS)) -> Dict:
         """
         Fetches analyst estimates to compare against the pitch.
         Returns: { 'consensus_eps': 5.20, 'current_price': 150.00, 'target_mean': 180.00 }
+        `need` names the field groups that must be fresh ("price", "estimates"): a caller
+        that only needs estimates is not refetched when just the price has expired.
         """
-        result = {
-            "current_price": None,
-            "consensus_eps": None,
-            "target_mean": None,
-            "market_cap": None
-        }
-        
+        ticker = ticker.upper().strip()
+        if all(self.cache.get(ticker, group) is not None for group in need):
+            with self._lock:
+                self.hits += 1
+            result = _empty_result()
+            for group in FIELD_GROUPS:  # groups not needed fresh are served even if expired
+                result.update(self.cache.get(ticker, group, allow_stale=True) or {})
+            return result
+
+        return dict(self._fetch_coalesced(ticker))
+
+    def get_consensus_many(self, tickers: Iterable[str], need: Iterable[str] = tuple(FIELD_GROUPS)) -> Dict[str, Dict]:
+        """Batch lookup: cached tickers are answered locally, the rest fetched in parallel."""
+        unique = list(dict.fromkeys(t.upper().strip() for t in tickers if t and t.strip()))
+        need = tuple(need)
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique))) as pool:
+            results = pool.map(lambda t: self.get_consensus(t, need=need), unique)
+            return dict(zip(unique, results))
+
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "fetches": self.fetches, "coalesced": self.coalesced}
+
+    def _fetch_coalesced(self, ticker: str) -> Dict:
+        """One backend call per ticker at a time; concurrent callers wait for the same result."""
+        with self._lock:
+            future = self._inflight.get(ticker)
+            owner = future is None
+            if owner:
+                future = self._inflight[ticker] = Future()
+                self.fetches += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._fetch(ticker)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(ticker, None)
+
+    def _fetch(self, ticker: str) -> Dict:
+        result = _empty_result()
+
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            
+            with get_metrics().stage("yahoo_fetch"):
+                info = self.backend.Ticker(ticker).info
+
             # 1. Price Data
             result["current_price"] = info.get("currentPrice") or info.get("regularMarketPrice")
             result["market_cap"] = info.get("marketCap")
-            
+
             # 2. Analyst Targets
             result["target_mean"] = info.get("targetMeanPrice")
-            
+
             # 3. EPS Estimates (Forward)
-            # Try to grab the basic forward EPS from info first
             result["consensus_eps"] = info.get("forwardEps")
-            
-            # If missing, try deeper logic (calendar year estimates)
-            if not result["consensus_eps"]:
-                # Sometimes yfinance moves this data structure
-                try:
-                    calendar = stock.calendar
-                    if calendar and "Earnings" in calendar:
-                        # Logic to extract estimate would go here
-                        pass
-                except:
-                    pass
-                    
+
         except Exception as e:
             print(f"⚠️ Yahoo Finance lookup failed for {ticker}: {e}")
-            
+            return result  # not cached: the next lookup retries
+
+        self.cache.put(ticker, result)
         return result
 
 if __name__ == "__main__":
     client = YahooFinanceClient()
-    print(client.get_consensus("NVDA"))
\ No newline at end of file
+    print(client.get_consensus("NVDA"))
@@ -0,0 +1,157 @@
+"""
+Token-Aware Chunking
+Splits cleaned report text on section boundaries into chunks that fit a token budget,
+so long reports can be scored/extracted map-reduce style instead of being truncated.
+"""
+import re
+import threading
+from typing import Callable, Iterable, List, Optional
+
+# Heading heuristics for sell-side notes (cleaned text has one stripped line per row)
+SECTION_KEYWORDS = (
+    "investment thesis", "investment summary", "executive summary", "summary", "key takeaways",
+    "valuation", "price target", "risks", "key risks", "risks to", "catalysts", "earnings",
+    "financials", "financial summary", "estimates", "model", "outlook", "guidance",
+    "industry", "competition", "management", "conclusion", "appendix",
+)
+NUMBERED_HEADING_RE = re.compile(r"^\d{1,2}(?:\.\d{1,2})*[.)]?\s+[A-Z][^.!?]{0,80}$")  # "3. Valuation"
+ALL_CAPS_HEADING_RE = re.compile(r"^[A-Z][A-Z0-9&/,'\- ]{3,80}$")                  # "VALUATION AND RISKS"
+KEYWORD_HEADING_RE = re.compile(
+    r"^(?:" + "|".join(re.escape(k) for k in SECTION_KEYWORDS) + r")\b[^.!?]{0,60}$", re.IGNORECASE
+)
+
+
+class TokenCounter:
+    """
+    Counts tokens with tiktoken when it (and its encoding file) is available,
+    otherwise falls back to the ~4 characters per token rule of thumb.
+    """
+
+    def __init__(self, model: str = "gpt-4o"):
+        self.model = model
+        self._encode: Optional[Callable[[str], list]] = None
+        self._resolved = False
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        with self._lock:
+            if self._resolved:
+                return
+            try:
+                import tiktoken
+                try:
+                    encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("o200k_base")
+                self._encode = encoding.encode
+            except Exception as e:
+                print(f"ℹ️ Note: tiktoken unavailable ({type(e).__name__}). Estimating tokens as chars/4.")
+                self._encode = None
+            self._resolved = True
+
+    @property
+    def exact(self) -> bool:
+        self._resolve()
+        return self._encode is not None
+
+    def count(self, text: str) -> int:
+        self._resolve()
+        if self._encode is not None:
+            return len(self._encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+
+def _is_heading(line: str) -> bool:
+    if not line or len(line) > 90 or line[-1] in ".,;":
+        return False
+    if not (line[0].isupper() or line[0].isdigit()):
+        return False
+    return bool(
+        ALL_CAPS_HEADING_RE.match(line) or NUMBERED_HEADING_RE.match(line) or KEYWORD_HEADING_RE.match(line)
+    )
+
+
+def split_sections(text: str) -> List[str]:
+    """Splits text into sections, each starting at a heading-like line."""
+    sections, current = [], []
+    for line in text.split("\n"):
+        if current and _is_heading(line.strip()):
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+    return [s for s in sections if s.strip()]
+
+
+def _split_oversized(section: str, max_tokens: int, counter: TokenCounter) -> List[str]:
+    """Falls back to line boundaries (then characters) for a section bigger than the budget."""
+    pieces, current, current_tokens = [], [], 0
+    for line in section.split("\n"):
+        line_tokens = counter.count(line) + 1
+        if line_tokens > max_tokens:
+            # A single giant line (tables flattened by PDF extraction)
+            if current:
+                pieces.append("\n".join(current))
+                current, current_tokens = [], 0
+            pieces.extend(_split_line(line, max_tokens, counter))
+            continue
+        if current and current_tokens + line_tokens > max_tokens:
+            pieces.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def _split_line(line: str, max_tokens: int, counter: TokenCounter) -> List[str]:
+    """
+    Character slices of one line, each re-counted: numeric tables can run under 3 chars
+    per token, so a slice over the budget is halved until it fits.
+    """
+    pieces, start = [], 0
+    while start < len(line):
+        end = min(len(line), start + max_tokens * 3)
+        while end - start > 1 and counter.count(line[start:end]) > max_tokens:
+            end = start + (end - start) // 2
+        pieces.append(line[start:end])
+        start = end
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int, counter: Optional[TokenCounter] = None) -> List[str]:
+    """
+    Greedily packs whole sections into chunks of at most `max_tokens`.
+    A section is only broken up if it alone exceeds the budget.
+    """
+    counter = counter or TokenCounter()
+    if counter.count(text) <= max_tokens:
+        return [text]
+
+    chunks, current, current_tokens = [], [], 0
+    for section in split_sections(text):
+        tokens = counter.count(section)
+        parts = [section] if tokens <= max_tokens else _split_oversized(section, max_tokens, counter)
+        for part in parts:
+            part_tokens = tokens if len(parts) == 1 else counter.count(part)
+            if current and current_tokens + part_tokens > max_tokens:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def unique(items: Iterable[str]) -> List[str]:
+    """Order-preserving, case-insensitive de-duplication (for merging chunk outputs)."""
+    seen, out = set(), []
+    for item in items:
+        key = item.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            out.append(item)
+    return out
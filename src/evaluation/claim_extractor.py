@@ -0,0 +1,135 @@
+"""
+Claim Extractor
+Pulls every numeric financial claim (revenue, EPS, gross margin, free cash flow,
+guidance) out of a report in one pass of a single precompiled regex, with units
+normalized, the period it refers to and its character offsets.
+"""
+import re
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+NUM = r"\d[\d,]*(?:\.\d+)?"
+UNIT = r"trillion|billion|million|tn|bn|mm|[tbm]"
+LEAD = r"\s*(?:(?:of|was|were|at|to|reached|came\s+in\s+at|grew\s+to|rose\s+to|fell\s+to|expanded\s+to)\b)?[:\s]*"
+# "revenue grew 20% y/y to $60.9bn": a growth rate between the metric and the amount
+GROWTH = (r"\s+(?:grew|rose|increased|climbed|jumped|fell|declined|decreased|(?:was|were)\s+(?:up|down))"
+          r"\s+(?:by\s+)?\d+(?:\.\d+)?\s*%(?:\s+(?:y/y|yoy|q/q|year[-\s]over[-\s]year|sequentially))?\s+to\s+")
+# Revenue needs a currency marker, so unit volumes ("sales of 5 million iPhones") are not read as dollars
+CURRENCY = r"(?:US)?\$\s*|USD\s*"
+
+UNIT_SCALE = {"trillion": 1e12, "tn": 1e12, "t": 1e12, "billion": 1e9, "bn": 1e9, "b": 1e9,
+              "million": 1e6, "mm": 1e6, "m": 1e6}
+
+# Alternatives are tried left to right at each position; the outer group names the metric
+CLAIM_RE = re.compile(rf"""
+    (?P<guidance>\b(?:guid(?:ance|es|ed|ing)|outlook)\b[^$\n]{{0,40}}?\$(?P<guide_num>{NUM})\s*(?P<guide_unit>{UNIT})\b)
+  | (?P<revenue>\b(?:revenues?|sales|top[-\s]line)\b(?:{GROWTH}|{LEAD})(?:{CURRENCY})(?P<rev_num>{NUM})\s*(?P<rev_unit>{UNIT})\b)
+  | (?P<eps>\b(?:EPS|earnings\s+per\s+share)\b(?:\s*\((?:GAAP|non-GAAP|diluted|adj\.?|adjusted)\))?{LEAD}\$?(?P<eps_num>\d+(?:\.\d+)?)\b(?!\s*%))
+  | (?P<gross_margin>\bgross\s+margins?\b{LEAD}(?P<gm_num>\d{{1,2}}(?:\.\d+)?)\s*%)
+  | (?P<gross_margin_pre>(?P<gm_pre_num>\d{{1,2}}(?:\.\d+)?)\s*%\s+gross\s+margins?\b)
+  | (?P<fcf>\b(?:free\s+cash\s+flow|FCF)\b{LEAD}\$?(?P<fcf_num>{NUM})\s*(?P<fcf_unit>{UNIT})\b)
+""", re.VERBOSE | re.IGNORECASE)
+
+# Small-window scans around each claim (not full-text passes)
+PERIOD_RE = re.compile(r"""
+    \b(?:FY|fiscal\s+(?:year\s+)?)'?(?P<fy>\d{4}|\d{2})(?P<fy_est>E)?\b
+  | \b(?P<qn>[1-4])Q'?(?P<qn_year>\d{4}|\d{2})\b
+  | \bQ(?P<q>[1-4])(?:\s*(?:FY)?'?(?P<q_year>\d{4}|\d{2}))?\b
+  | \b(?:CY|calendar\s+(?:year\s+)?)'?(?P<cy>\d{4}|\d{2})(?P<cy_est>E)?\b
+  | \b(?P<year_est>20\d{2})E\b
+""", re.VERBOSE | re.IGNORECASE)
+GUIDANCE_RE = re.compile(r"\b(?:guid(?:ance|es|ed|ing)|outlook|expects?|expected|forecasts?|projects?)\b",
+                         re.IGNORECASE)
+SENTENCE_END_RE = re.compile(r"[.;!?](?=\s)|\n\s*\n")
+PERIOD_WINDOW_BEFORE = 100
+PERIOD_WINDOW_AFTER = 60
+GUIDANCE_WINDOW = 60
+
+
+@dataclass
+class Claim:
+    metric: str             # revenue | eps | gross_margin | fcf
+    value: float            # USD for revenue/fcf, USD per share for eps, percent for gross_margin
+    unit: str               # "USD" | "USD/share" | "%"
+    raw: str                # the matched text
+    start: int              # character offsets into the scanned text
+    end: int
+    period: Optional[str] = None  # "FY2024", "Q3 2024", "CY2025", "FY2025E"
+    fiscal_year: Optional[int] = None
+    quarterly: bool = False
+    forward: bool = False   # guidance / estimate rather than a reported figure
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _year(token: Optional[str]) -> Optional[int]:
+    if not token:
+        return None
+    year = int(token)
+    return year + 2000 if year < 100 else year
+
+
+def _amount(num: str, unit: str) -> float:
+    return float(num.replace(",", "")) * UNIT_SCALE[unit.lower()]
+
+
+class ClaimExtractor:
+    def extract(self, text: str) -> List[Claim]:
+        """Every claim in document order."""
+        claims = []
+        for match in CLAIM_RE.finditer(text):
+            kind = match.lastgroup
+            if kind == "revenue":
+                claim = Claim("revenue", _amount(match["rev_num"], match["rev_unit"]), "USD", match[0], *match.span())
+            elif kind == "guidance":
+                claim = Claim("revenue", _amount(match["guide_num"], match["guide_unit"]), "USD", match[0],
+                              *match.span(), forward=True)
+            elif kind == "eps":
+                claim = Claim("eps", float(match["eps_num"]), "USD/share", match[0], *match.span())
+            elif kind in ("gross_margin", "gross_margin_pre"):
+                num = match["gm_num"] or match["gm_pre_num"]
+                claim = Claim("gross_margin", float(num), "%", match[0], *match.span())
+            else:
+                claim = Claim("fcf", _amount(match["fcf_num"], match["fcf_unit"]), "USD", match[0], *match.span())
+            self._annotate(claim, text)
+            claims.append(claim)
+        return claims
+
+    def _annotate(self, claim: Claim, text: str):
+        """Period (nearest mention in the claim's sentence) and forward-looking flag."""
+        lo = max(0, claim.start - PERIOD_WINDOW_BEFORE)
+        for boundary in SENTENCE_END_RE.finditer(text, lo, claim.start):
+            lo = boundary.end()
+        hi = claim.end + PERIOD_WINDOW_AFTER
+        boundary = SENTENCE_END_RE.search(text, claim.end, hi)
+        if boundary:
+            hi = boundary.start()
+        sentence_start, window = lo, text[lo:hi]
+        best, best_distance = None, None
+        for match in PERIOD_RE.finditer(window):
+            start, end = match.start() + lo, match.end() + lo
+            distance = 0 if claim.start <= start < claim.end else min(abs(start - claim.end), abs(claim.start - end))
+            if best is None or distance < best_distance:
+                best, best_distance = match, distance
+        if best is not None:
+            if best["fy"]:
+                claim.fiscal_year = _year(best["fy"])
+                claim.period = f"FY{claim.fiscal_year}" + ("E" if best["fy_est"] else "")
+                claim.forward = claim.forward or bool(best["fy_est"])
+            elif best["qn"] or best["q"]:
+                quarter, year = best["qn"] or best["q"], _year(best["qn_year"] or best["q_year"])
+                claim.period = f"Q{quarter}" + (f" {year}" if year else "")
+                claim.fiscal_year, claim.quarterly = year, True
+            elif best["cy"]:
+                claim.fiscal_year = _year(best["cy"])
+                claim.period = f"CY{claim.fiscal_year}" + ("E" if best["cy_est"] else "")
+                claim.forward = claim.forward or bool(best["cy_est"])
+            else:
+                claim.fiscal_year = _year(best["year_est"])
+                claim.period = f"FY{claim.fiscal_year}E"
+                claim.forward = True
+
+        lead = text[max(sentence_start, claim.start - GUIDANCE_WINDOW):claim.start]
+        if GUIDANCE_RE.search(lead) or GUIDANCE_RE.search(claim.raw):
+            claim.forward = True
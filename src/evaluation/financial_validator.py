@@ -1,8 +1,13 @@
-import re
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import Callable, Dict, List, Optional
 from src.data.sec_edgar import SECEdgarClient
 from src.data.yahoo_finance import YahooFinanceClient
+from src.evaluation.claim_extractor import Claim, ClaimExtractor
+
+# Relative tolerances; gross margin is compared in percentage points
+TOLERANCES = {"revenue": 0.05, "fcf": 0.10, "eps_reported": 0.05, "eps_consensus": 0.10}
+GROSS_MARGIN_TOLERANCE_PP = 1.0
+
 
 @dataclass
 class FactCheck:
@@ -13,82 +18,108 @@ class FactCheck:
     status: str
     diff_pct: float
 
+
+def _usd(value: float) -> str:
+    if abs(value) >= 1e9:
+        return f"${value / 1e9:.2f}B"
+    return f"${value / 1e6:.1f}M"
+
+
 class FinancialValidator:
     def __init__(self):
         self.sec = SECEdgarClient()
         self.yahoo = YahooFinanceClient()
+        self.extractor = ClaimExtractor()
 
     def validate(self, text: str, ticker: str) -> List[Dict]:
         """
         Scans text for financial claims and cross-references them with real data.
         Returns a list of dicts.
         """
-        results = []
         if not ticker:
             return []
+        return self.check_claims(self.extractor.extract(text), ticker)
 
-        # --- CHECK 1: REVENUE (SEC Data) ---
-        # UPDATED REGEX: Now handles "Revenue of $52B", "Revenue: $52B", "Revenue $52B"
-        rev_pattern = r"revenue\s*(?:of\b)?[:\s]*\$?([\d,.]+)\s*(?:billion|B)"
-        matches = re.findall(rev_pattern, text, re.IGNORECASE)
-        
-        if matches:
-            try:
-                # Take the first revenue number found (heuristic)
-                claimed_raw = float(matches[0].replace(",", ""))
-                claimed_rev = claimed_raw * 1e9 
-                
-                # Fetch Actuals
-                actual_data = self.sec.get_latest_revenue(ticker) # (val, year, form)
-                
-                if actual_data:
-                    actual_val, year, form = actual_data
-                    
-                    # Calculate mismatch
-                    diff = (claimed_rev - actual_val) / actual_val
-                    abs_diff = abs(diff)
-                    
-                    status = "MATCH" if abs_diff < 0.05 else "MISMATCH" # 5% tolerance
-                    
-                    results.append({
-                        "metric": f"Revenue (FY{year})",
-                        "claimed": f"${claimed_raw}B",
-                        "actual": f"${actual_val/1e9:.2f}B",
-                        "source": f"SEC {form}",
-                        "status": status,
-                        "diff_pct": round(diff * 100, 1)
-                    })
-            except Exception as e:
-                print(f"⚠️ Revenue validation error: {e}")
+    def check_claims(self, claims: List[Claim], ticker: str) -> List[Dict]:
+        """
+        Checks a document's claims in one batch: the SEC fact set and the Yahoo
+        consensus are each fetched at most once, and only if some claim needs them.
+        A figure repeated in the text (same metric, period and value) is reported once.
+        """
+        sources = {}
+
+        def fetch(name: str, loader: Callable):
+            if name not in sources:
+                try:
+                    sources[name] = loader()
+                except Exception as e:
+                    print(f"⚠️ {name} lookup failed for {ticker}: {e}")
+                    sources[name] = None
+            return sources[name]
+
+        facts = lambda: fetch("SEC", lambda: self.sec.get_fact_set(ticker))
+        consensus = lambda: fetch("Yahoo", lambda: self.yahoo.get_consensus(ticker, need=("estimates",)))
 
-        # --- CHECK 2: CONSENSUS EPS (Yahoo Data) ---
-        # Pattern: "EPS of $3.50" or "EPS: $3.50"
-        eps_pattern = r"EPS\s*(?:of\b)?[:\s]*\$?([\d.]+)"
-        matches = re.findall(eps_pattern, text, re.IGNORECASE)
-        
-        if matches:
+        results, seen = [], set()
+        for claim in claims:
+            if claim.quarterly:
+                continue  # annual filings only; quarterly claims are extracted but not checked
             try:
-                claimed_eps = float(matches[0])
-                
-                # Fetch Consensus
-                consensus_data = self.yahoo.get_consensus(ticker)
-                actual_eps = consensus_data.get("consensus_eps")
-                
-                if actual_eps:
-                    diff = (claimed_eps - actual_eps) / actual_eps
-                    abs_diff = abs(diff)
-                    
-                    status = "MATCH" if abs_diff < 0.10 else "MISMATCH" # 10% tolerance for estimates
-                    
-                    results.append({
-                        "metric": "Forward EPS (Consensus)",
-                        "claimed": f"${claimed_eps}",
-                        "actual": f"${actual_eps}",
-                        "source": "Yahoo Analyst Consensus",
-                        "status": status,
-                        "diff_pct": round(diff * 100, 1)
-                    })
+                check = self._check(claim, facts, consensus)
             except Exception as e:
-                print(f"⚠️ EPS validation error: {e}")
-        
-        return results
\ No newline at end of file
+                print(f"⚠️ {claim.metric} validation error: {e}")
+                continue
+            if check and (check["metric"], check["claimed"]) not in seen:
+                seen.add((check["metric"], check["claimed"]))
+                check.update({"period": claim.period, "offset": claim.start})
+                results.append(check)
+        return results
+
+    def _check(self, claim: Claim, facts: Callable, consensus: Callable) -> Optional[Dict]:
+        if claim.metric == "eps":
+            reported = None
+            if claim.fiscal_year and not claim.forward and facts():
+                reported = facts().get("eps", claim.fiscal_year)
+            if reported:
+                actual, year = reported
+                return self._compare(f"Diluted EPS (FY{year})", claim.value, actual, "SEC 10-K",
+                                     TOLERANCES["eps_reported"], fmt=lambda v: f"${v:.2f}")
+            actual = (consensus() or {}).get("consensus_eps")
+            if not actual:
+                return None
+            return self._compare("Forward EPS (Consensus)", claim.value, actual, "Yahoo Analyst Consensus",
+                                 TOLERANCES["eps_consensus"], fmt=lambda v: f"${v:.2f}")
+
+        # Revenue, gross margin and FCF are checked against reported annual figures;
+        # there is no consensus source for them, so guidance / estimates are skipped
+        if claim.forward or not facts():
+            return None
+        found = facts().get(claim.metric, claim.fiscal_year)
+        if not found:
+            return None
+        actual, year = found
+        source = f"SEC {facts().form}"
+        if claim.metric == "revenue":
+            return self._compare(f"Revenue (FY{year})", claim.value, actual, source, TOLERANCES["revenue"], fmt=_usd)
+        if claim.metric == "fcf":
+            return self._compare(f"Free Cash Flow (FY{year})", claim.value, actual, source, TOLERANCES["fcf"],
+                                 fmt=_usd)
+        if claim.metric == "gross_margin":
+            check = self._compare(f"Gross Margin (FY{year})", claim.value, actual, source, 0,
+                                  fmt=lambda v: f"{v:.1f}%")
+            check["status"] = "MATCH" if abs(claim.value - actual) <= GROSS_MARGIN_TOLERANCE_PP else "MISMATCH"
+            return check
+        return None
+
+    @staticmethod
+    def _compare(metric: str, claimed: float, actual: float, source: str, tolerance: float,
+                 fmt: Callable[[float], str]) -> Dict:
+        diff = (claimed - actual) / abs(actual) if actual else 0.0
+        return {
+            "metric": metric,
+            "claimed": fmt(claimed),
+            "actual": fmt(actual),
+            "source": source,
+            "status": "MATCH" if abs(diff) < tolerance else "MISMATCH",
+            "diff_pct": round(diff * 100, 1)
+        }
@@ -0,0 +1,143 @@
+"""
+LLM Client Helpers
+Shared OpenAI client factory, retry policy (jittered backoff on 429/5xx), optional
+request / token budgets shared across processes and nodes, and the instrumented
+structured-call helper used by the scorer and extractor.
+"""
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
+from openai import OpenAI, APIConnectionError
+from pydantic import BaseModel
+from src.data.http import get_shared_limiter
+from src.pipeline.metrics import get_metrics
+
+T = TypeVar("T")
+
+DEFAULT_MODEL = "gpt-4o-2024-08-06"
+
+
+def create_client() -> OpenAI:
+    """
+    Builds the OpenAI client used by the scorer and extractor.
+    OPENAI_BASE_URL lets us point the pipeline at a local stand-in (tests, benchmarks).
+    SDK-level retries are disabled so RetryPolicy is the only retry layer.
+    """
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        max_retries=0,
+    )
+
+
+def is_retryable(exc: Exception) -> bool:
+    """429 (rate limit), any 5xx, and transport failures are worth retrying."""
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(exc, APIConnectionError)
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """Reads the server's Retry-After hint (seconds) if the error carries one."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay: float = 1.0  # seconds
+    max_delay: float = 30.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform(0, min(cap, base * 2^attempt))."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Runs fn, retrying retryable errors. The last error is re-raised."""
+        for attempt in range(self.max_attempts):
+            try:
+                return fn()
+            except Exception as e:
+                if attempt == self.max_attempts - 1 or not is_retryable(e):
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                time.sleep(min(delay, self.max_delay))
+        raise RuntimeError("unreachable")
+
+
+def throttle(prompt_tokens: int):
+    """
+    Waits for the shared OpenAI budgets, if configured: OPENAI_MAX_RPS requests/second
+    and OPENAI_MAX_TPM prompt tokens/minute (both off by default). The buckets live in
+    RATE_LIMIT_DB, so every process - and every cluster node - draws from one budget.
+    """
+    rps = float(os.getenv("OPENAI_MAX_RPS", 0))
+    tpm = float(os.getenv("OPENAI_MAX_TPM", 0))
+    if rps:
+        get_shared_limiter("openai", rate=rps).acquire()
+    if tpm:
+        # Burst = one minute of budget, so a single large prompt can always be admitted
+        get_shared_limiter("openai_tokens", rate=tpm / 60, burst=tpm).acquire(min(prompt_tokens, tpm))
+
+
+def response_format(schema: Type[BaseModel]) -> Dict:
+    """
+    The `response_format` payload for a raw request body (Batch API lines), built from the
+    pydantic schema: strict json_schema mode, as client.beta.chat.completions.parse sends.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.__name__, "strict": True,
+                        "schema": _strict_schema(schema.model_json_schema())},
+    }
+
+
+def _strict_schema(node: Any) -> Any:
+    """Strict mode: every object closed (additionalProperties: false) with all properties required."""
+    if isinstance(node, list):
+        return [_strict_schema(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    node = {key: _strict_schema(value) for key, value in node.items()}
+    if node.get("type") == "object" and "properties" in node:
+        node["required"] = list(node["properties"])
+        node["additionalProperties"] = False
+    if node.get("default", ...) is None:
+        node.pop("default")
+    return node
+
+
+def structured_call(client: OpenAI, retry: RetryPolicy, messages: List[dict], schema: Type[BaseModel]):
+    """
+    One retried structured completion. Timed as the `llm_call` stage (bytes = prompt size)
+    and counts token usage; returns the parsed response (None on refusal).
+    """
+    metrics = get_metrics()
+    prompt_bytes = sum(len(m["content"].encode("utf-8")) for m in messages)
+
+    def attempt():
+        throttle(prompt_bytes // 4)  # ~4 bytes per token; every retry draws again
+        return client.beta.chat.completions.parse(
+            model=DEFAULT_MODEL,
+            messages=messages,
+            response_format=schema,
+        )
+
+    with metrics.stage("llm_call", prompt_bytes):
+        completion = retry.call(attempt)
+    usage = getattr(completion, "usage", None)
+    if usage is not None:
+        metrics.incr("llm_prompt_tokens", usage.prompt_tokens or 0)
+        metrics.incr("llm_completion_tokens", usage.completion_tokens or 0)
+    return completion.choices[0].message.parsed
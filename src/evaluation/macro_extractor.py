@@ -1,9 +1,10 @@
-import os
-import json
-from typing import List, Optional
-from openai import OpenAI
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel, Field
 from src.prompts.manager import PromptManager # <--- NEW IMPORT
+from src.evaluation.llm_client import create_client, structured_call, RetryPolicy, DEFAULT_MODEL
+from src.evaluation.response_cache import CacheKey, get_shared_cache
+from src.evaluation.chunking import TokenCounter, chunk_text
 
 # --- 1. DATA STRUCTURES ---
 class InvestableIdea(BaseModel):
@@ -25,14 +26,65 @@ class MacroReport(BaseModel):
     key_stats: List[KeyStat] = Field(..., description="Crucial data points.")
     investment_implication: str = Field(..., description="The 'So What?'")
 
-# --- 2. THE EXTRACTOR ENGINE ---
+# --- 2. MAP-REDUCE MERGE (chunked mode) ---
+def merge_reports(partials: List[MacroReport]) -> MacroReport:
+    """
+    Combines per-chunk extractions into one MacroReport.
+    Narrative fields come from the opening chunk (executive summary); ideas are
+    ranked by how many chunks cite them, and key stats are unioned by metric name.
+    """
+    lead = partials[0]
+
+    votes: Dict[str, int] = {}
+    first_seen: Dict[str, InvestableIdea] = {}
+    for p in partials:
+        for idea in p.top_5_ideas:
+            key = idea.name.strip().lower()
+            votes[key] = votes.get(key, 0) + 1
+            first_seen.setdefault(key, idea)
+    ranked = sorted(first_seen, key=lambda k: -votes[k])  # stable: ties keep document order
+
+    stats: Dict[str, KeyStat] = {}
+    for p in partials:
+        for stat in p.key_stats:
+            stats.setdefault(stat.metric.strip().lower(), stat)
+
+    return MacroReport(
+        topic=lead.topic,
+        summary=lead.summary,
+        variant_view=lead.variant_view,
+        bear_case=lead.bear_case,
+        top_5_ideas=[first_seen[k] for k in ranked[:5]],
+        key_stats=list(stats.values()),
+        investment_implication=lead.investment_implication,
+    )
+
+# --- 3. THE EXTRACTOR ENGINE ---
 class MacroExtractor:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    PROMPT_NAME = "macro_extractor_system"
+    MAX_CHARS = 60000  # Single-call truncation when chunking is off
+
+    def __init__(self, chunk_tokens: Optional[int] = None, chunk_concurrency: int = 4):
+        self.client = create_client()
         self.prompts = PromptManager() # <--- Initialize Manager
+        self.retry = RetryPolicy() # Jittered backoff on 429/5xx
+        self.cache = get_shared_cache() # None when LLM_CACHE=off
+        if self.cache:
+            self.cache.invalidate_prompt(self.PROMPT_NAME, self.prompts.get_version(self.PROMPT_NAME))
+
+        # Chunked map-reduce mode (None = legacy hard truncation at MAX_CHARS)
+        self.chunk_tokens = chunk_tokens
+        self.chunk_concurrency = chunk_concurrency
+        self.token_counter = TokenCounter(DEFAULT_MODEL)
+
+    def analyze(self, text: str, filename: str) -> Optional[dict]:
+        """The stored dict for one report, or None if extraction failed (the caller may retry)."""
+        report = self._llm_extract(text)
+        return self.to_dict(report, filename) if report is not None else None
 
-    def analyze(self, text: str, filename: str) -> dict:
-        structured_data = self._llm_extract(text)
+    @staticmethod
+    def to_dict(structured_data: MacroReport, filename: str) -> dict:
+        """Flattens a MacroReport into the stored dict (shared by live and batch modes)."""
         return {
             "source_file": filename,
             "topic": structured_data.topic,
@@ -44,25 +96,62 @@ class MacroExtractor:
             "key_stats": [k.model_dump() for k in structured_data.key_stats],
         }
 
-    def _llm_extract(self, text: str) -> MacroReport:
-        truncated_text = text[:60000] 
-        
-        # <--- LOAD FROM YAML
-        system_prompt = self.prompts.get_prompt("macro_extractor_system")
-        
+    def _llm_extract(self, text: str) -> Optional[MacroReport]:
         try:
-            completion = self.client.beta.chat.completions.parse(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Analyze this report:\n\n{truncated_text}"}
-                ],
-                response_format=MacroReport,
-            )
-            return completion.choices[0].message.parsed
+            if self.chunk_tokens:
+                chunks = chunk_text(text, self.chunk_tokens, self.token_counter)
+            else:
+                chunks = [text[:self.MAX_CHARS]]
+
+            if len(chunks) == 1:
+                return self._extract(self.user_message(chunks[0]))
+            return merge_reports(self._extract_chunks(chunks))
         except Exception as e:
             print(f"⚠️ Extraction Failed: {e}")
-            return MacroReport(
-                topic="Error", summary="Failed", variant_view="N/A", bear_case="N/A", 
-                top_5_ideas=[], key_stats=[], investment_implication=""
-            )
\ No newline at end of file
+            return None
+
+    def user_message(self, text: str) -> str:
+        """Prompt body for a whole (already truncated or within-budget) document."""
+        return f"Analyze this report:\n\n{text}"
+
+    def build_messages(self, user_message: str) -> List[dict]:
+        return [
+            {"role": "system", "content": self.prompts.get_prompt(self.PROMPT_NAME)},  # <--- LOAD FROM YAML
+            {"role": "user", "content": user_message}
+        ]
+
+    def cache_key(self, user_message: str) -> CacheKey:
+        return CacheKey.build(user_message, self.PROMPT_NAME, self.prompts.get_version(self.PROMPT_NAME),
+                              DEFAULT_MODEL, MacroReport)
+
+    def _extract_chunks(self, chunks: List[str]) -> List[MacroReport]:
+        """Map step: extracts chunks in parallel. Failed chunks are dropped (all failing raises)."""
+        n = len(chunks)
+        messages = [
+            f"Analyze this excerpt (part {i + 1} of {n}) of a longer report. "
+            f"Extract only what this excerpt supports:\n\n{chunk}"
+            for i, chunk in enumerate(chunks)
+        ]
+        partials = []
+        with ThreadPoolExecutor(max_workers=min(self.chunk_concurrency, n)) as pool:
+            for future in [pool.submit(self._extract, m) for m in messages]:
+                try:
+                    partials.append(future.result())
+                except Exception as e:
+                    print(f"⚠️ Chunk extraction failed: {e}")
+        if not partials:
+            raise RuntimeError(f"all {n} chunks failed")
+        return partials
+
+    def _extract(self, user_message: str) -> MacroReport:
+        """One (cached, retried) structured LLM call."""
+        def call_llm() -> Optional[MacroReport]:
+            return structured_call(self.client, self.retry, self.build_messages(user_message), MacroReport)
+
+        if self.cache:
+            parsed = self.cache.get_or_call(self.cache_key(user_message), MacroReport, call_llm)
+        else:
+            parsed = call_llm()
+        if parsed is None:
+            raise ValueError("model returned no parsed response (refusal?)")
+        return parsed
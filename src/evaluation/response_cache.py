@@ -0,0 +1,175 @@
+"""
+LLM Response Cache
+Disk-backed (SQLite) cache of structured LLM responses.
+Keyed on (text hash, prompt name + version, model, response schema), so bumping a
+prompt's `version` in prompts.yaml or changing a Pydantic schema is an automatic miss.
+Size-bounded with least-recently-used eviction.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Type, TypeVar
+from pydantic import BaseModel
+from src.pipeline.metrics import get_metrics
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _sha256(data: str) -> str:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def schema_fingerprint(schema: Type[BaseModel]) -> str:
+    return _sha256(json.dumps(schema.model_json_schema(), sort_keys=True))[:16]
+
+
+@dataclass(frozen=True)
+class CacheKey:
+    text_hash: str
+    prompt_name: str
+    prompt_version: str
+    model: str
+    schema_hash: str
+
+    @classmethod
+    def build(cls, text: str, prompt_name: str, prompt_version: str, model: str,
+              schema: Type[BaseModel]) -> "CacheKey":
+        return cls(_sha256(text), prompt_name, str(prompt_version), model, schema_fingerprint(schema))
+
+    @property
+    def digest(self) -> str:
+        return _sha256("|".join([self.text_hash, self.prompt_name, self.prompt_version,
+                                 self.model, self.schema_hash]))
+
+
+class ResponseCache:
+    def __init__(self, db_path: str = "data/cache/llm_responses.db", max_bytes: int = 256 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                prompt_name TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                model TEXT NOT NULL,
+                schema_hash TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access);
+        """)
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """LLM_CACHE=off disables caching; LLM_CACHE_PATH / LLM_CACHE_MAX_MB override defaults."""
+        if os.getenv("LLM_CACHE", "on").lower() in ("off", "0", "false"):
+            return None
+        return cls(
+            db_path=os.getenv("LLM_CACHE_PATH", "data/cache/llm_responses.db"),
+            max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", 256)) * 1024 * 1024),
+        )
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key.digest,)).fetchone()
+            if row is None:
+                self.misses += 1
+                get_metrics().incr("llm_cache_misses")
+                return None
+            self.hits += 1
+            get_metrics().incr("llm_cache_hits")
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key.digest))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: CacheKey, response: str):
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key.digest,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, prompt_name, prompt_version, model, schema_hash, response, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key.digest, key.prompt_name, key.prompt_version, key.model, key.schema_hash,
+                 response, size, time.time()),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+
+    def get_or_call(self, key: CacheKey, schema: Type[M], fn: Callable[[], Optional[M]]) -> Optional[M]:
+        """Returns the cached response parsed into `schema`, or calls fn and caches its result."""
+        cached = self.get(key)
+        if cached is not None:
+            return schema.model_validate_json(cached)
+        result = fn()
+        if result is not None:
+            self.put(key, result.model_dump_json())
+        return result
+
+    def invalidate_prompt(self, prompt_name: str, current_version: str) -> int:
+        """Drops entries written under older versions of a prompt (they can never hit again)."""
+        with self._lock, self._conn:
+            freed = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses WHERE prompt_name = ? AND prompt_version != ?",
+                (prompt_name, str(current_version)),
+            ).fetchone()
+            self._conn.execute(
+                "DELETE FROM responses WHERE prompt_name = ? AND prompt_version != ?",
+                (prompt_name, str(current_version)),
+            )
+            self._total_bytes -= freed[0]
+        return freed[1]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            hits, misses, evictions, total_bytes = self.hits, self.misses, self.evictions, self._total_bytes
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "evictions": evictions,
+            "entries": entries,
+            "bytes": total_bytes,
+        }
+
+    def _evict(self):
+        """Caller holds the lock and the transaction. Drops least-recently-used entries over budget."""
+        while self._total_bytes > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self._total_bytes -= row[1]
+            self.evictions += 1
+
+
+_shared: Dict[tuple, Optional[ResponseCache]] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[ResponseCache]:
+    """Process-wide cache instance (per configuration), so the scorer and extractor share counters."""
+    config = (os.getenv("LLM_CACHE", "on"), os.getenv("LLM_CACHE_PATH"), os.getenv("LLM_CACHE_MAX_MB"))
+    with _shared_lock:
+        if config not in _shared:
+            _shared[config] = ResponseCache.from_env()
+        return _shared[config]
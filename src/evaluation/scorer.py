@@ -1,9 +1,10 @@
-import os
-import json
-from openai import OpenAI
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from src.prompts.manager import PromptManager  # <--- NEW IMPORT
+from src.evaluation.llm_client import create_client, structured_call, RetryPolicy, DEFAULT_MODEL
+from src.evaluation.response_cache import CacheKey, get_shared_cache
+from src.evaluation.chunking import TokenCounter, chunk_text, unique
 
 # --- 1. ROBUST DATA STRUCTURES ---
 class DimensionScore(BaseModel):
@@ -30,40 +31,158 @@ class ScoreResponse(BaseModel):
     pm_perspective: PMPerspective
     improvement_plan: List[str]
 
-# --- 2. THE SCORER ENGINE ---
+# --- 2. MAP-REDUCE MERGE (chunked mode) ---
+NO_QUOTE = {"", "n/a", "na", "none", "not applicable", "-"}
+
+
+def merge_scores(partials: List[ScoreResponse], weights: List[int]) -> ScoreResponse:
+    """
+    Combines per-chunk scores into one report-level ScoreResponse.
+    A dimension is judged on the chunks that cover it - those that quote evidence for it
+    (e.g. the risk section carries risk_analysis) - as a length-weighted mean, so
+    splitting a report into more chunks does not push its score up or down. Chunks
+    with no evidence for a dimension only count when none has any. Red flags, mosaic
+    ideas and improvement steps are unioned across chunks.
+    """
+    total = sum(weights) or 1
+
+    def merged(dim: str) -> DimensionScore:
+        dims = [getattr(p, dim) for p in partials]
+        covering = [(d, w) for d, w in zip(dims, weights) if d.quote_verbatim.strip().lower() not in NO_QUOTE]
+        scored = covering or list(zip(dims, weights))
+        weight = sum(w for _, w in scored) or 1
+        lead = max(scored, key=lambda dw: dw[1])[0]  # the largest covering chunk explains the score
+        return DimensionScore(
+            score=int(sum(d.score * w for d, w in scored) / weight + 0.5),  # half-up, not banker's rounding
+            reasoning=lead.reasoning,
+            quote_verbatim=lead.quote_verbatim,
+            red_flags=unique(flag for d in dims for flag in d.red_flags),
+        )
+
+    verdict_votes: Dict[str, int] = {}
+    for p, w in zip(partials, weights):
+        verdict_votes[p.verdict] = verdict_votes.get(p.verdict, 0) + w
+
+    # Thesis framing lives up front, so the opening chunk owns the narrative fields
+    lead = partials[0].pm_perspective
+    pm = PMPerspective(
+        variant_view=lead.variant_view,
+        bear_case=lead.bear_case,
+        catalyst_timing=lead.catalyst_timing,
+        pre_mortem=lead.pre_mortem,
+        mosaic_data_points=unique(m for p in partials for m in p.pm_perspective.mosaic_data_points),
+        decision="INVESTIGATE" if any(p.pm_perspective.decision == "INVESTIGATE" for p in partials) else lead.decision,
+    )
+
+    return ScoreResponse(
+        verdict=max(verdict_votes, key=verdict_votes.get),
+        confidence_score=round(sum(p.confidence_score * w for p, w in zip(partials, weights)) / total),
+        thesis_logic=merged("thesis_logic"),
+        catalyst_quality=merged("catalyst_quality"),
+        risk_analysis=merged("risk_analysis"),
+        professional_standards=merged("professional_standards"),
+        pm_perspective=pm,
+        improvement_plan=unique(step for p in partials for step in p.improvement_plan),
+    )
+
+# --- 3. THE SCORER ENGINE ---
 class EquityScorer:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.prompts = PromptManager()  # <--- Initialize Manager
+    PROMPT_NAME = "equity_scorer_system"
+    MAX_CHARS = 50000  # Single-call truncation when chunking is off
 
-    def evaluate(self, text: str, filename: str) -> Optional[dict]:
-        truncated_text = text[:50000]
+    def __init__(self, chunk_tokens: Optional[int] = None, chunk_concurrency: int = 4):
+        self.client = create_client()
+        self.prompts = PromptManager()  # <--- Initialize Manager
+        self.retry = RetryPolicy()  # Jittered backoff on 429/5xx
+        self.cache = get_shared_cache()  # None when LLM_CACHE=off
+        if self.cache:
+            self.cache.invalidate_prompt(self.PROMPT_NAME, self.prompts.get_version(self.PROMPT_NAME))
 
-        # <--- LOAD FROM YAML INSTEAD OF HARDCODING
-        system_prompt = self.prompts.get_prompt("equity_scorer_system")
+        # Chunked map-reduce mode (None = legacy hard truncation at MAX_CHARS)
+        self.chunk_tokens = chunk_tokens
+        self.chunk_concurrency = chunk_concurrency
+        self.token_counter = TokenCounter(DEFAULT_MODEL)
 
+    def evaluate(self, text: str, filename: str) -> Optional[dict]:
         try:
-            completion = self.client.beta.chat.completions.parse(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Review this research note:\n\n{truncated_text}"}
-                ],
-                response_format=ScoreResponse,
-            )
-            
-            result = completion.choices[0].message.parsed.model_dump()
+            if self.chunk_tokens:
+                chunks = chunk_text(text, self.chunk_tokens, self.token_counter)
+            else:
+                chunks = [text[:self.MAX_CHARS]]
+
+            if len(chunks) == 1:
+                parsed = self._score(self.user_message(chunks[0]))
+            else:
+                parsed = merge_scores(*self._score_chunks(chunks))
             
-            # Deterministic Math for Overall Score
-            math_score = (
-                (result['thesis_logic']['score'] * 0.3) +
-                (result['catalyst_quality']['score'] * 0.3) +
-                (result['risk_analysis']['score'] * 0.2) +
-                (result['professional_standards']['score'] * 0.2)
-            )
-            result['overall_score'] = round(math_score, 1)
+            result = self.finalize(parsed)
+            if len(chunks) > 1:
+                result['chunks_scored'] = len(chunks)
             return result
 
         except Exception as e:
             print(f"❌ Scorer Error: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def finalize(parsed: ScoreResponse) -> dict:
+        """Turns a parsed response into the stored dict (shared by live and batch modes)."""
+        result = parsed.model_dump()
+        
+        # Deterministic Math for Overall Score
+        math_score = (
+            (result['thesis_logic']['score'] * 0.3) +
+            (result['catalyst_quality']['score'] * 0.3) +
+            (result['risk_analysis']['score'] * 0.2) +
+            (result['professional_standards']['score'] * 0.2)
+        )
+        result['overall_score'] = round(math_score, 1)
+        return result
+
+    def user_message(self, text: str) -> str:
+        """Prompt body for a whole (already truncated or within-budget) document."""
+        return f"Review this research note:\n\n{text}"
+
+    def build_messages(self, user_message: str) -> List[dict]:
+        return [
+            {"role": "system", "content": self.prompts.get_prompt(self.PROMPT_NAME)},  # <--- LOAD FROM YAML
+            {"role": "user", "content": user_message}
+        ]
+
+    def cache_key(self, user_message: str) -> CacheKey:
+        return CacheKey.build(user_message, self.PROMPT_NAME, self.prompts.get_version(self.PROMPT_NAME),
+                              DEFAULT_MODEL, ScoreResponse)
+
+    def _score_chunks(self, chunks: List[str]) -> Tuple[List[ScoreResponse], List[int]]:
+        """Map step: scores chunks in parallel. Failed chunks are dropped (all failing raises)."""
+        n = len(chunks)
+        messages = [
+            f"Review this excerpt (part {i + 1} of {n}) of a longer research note. "
+            f"Score only what this excerpt supports:\n\n{chunk}"
+            for i, chunk in enumerate(chunks)
+        ]
+        partials, weights = [], []
+        with ThreadPoolExecutor(max_workers=min(self.chunk_concurrency, n)) as pool:
+            futures = [pool.submit(self._score, m) for m in messages]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    partials.append(future.result())
+                    weights.append(len(chunk))
+                except Exception as e:
+                    print(f"⚠️ Chunk scoring failed: {e}")
+        if not partials:
+            raise RuntimeError(f"all {n} chunks failed")
+        return partials, weights
+
+    def _score(self, user_message: str) -> ScoreResponse:
+        """One (cached, retried) structured LLM call."""
+        def call_llm() -> Optional[ScoreResponse]:
+            return structured_call(self.client, self.retry, self.build_messages(user_message), ScoreResponse)
+
+        if self.cache:
+            parsed = self.cache.get_or_call(self.cache_key(user_message), ScoreResponse, call_llm)
+        else:
+            parsed = call_llm()
+        if parsed is None:
+            raise ValueError("model returned no parsed response (refusal?)")
+        return parsed
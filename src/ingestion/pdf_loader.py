@@ -2,7 +2,12 @@ import os
 import fitz  # PyMuPDF
 import re
 import json
-from typing import List, Dict
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Iterator, Tuple
+from src.ingestion.redactor import EntityRedactor
+from src.pipeline.metrics import Metrics, get_metrics
 
 class PDFLoader:
     def __init__(self, raw_dir: str = "data/raw_pdfs", entity_file: str = "banned_entities.json"):
@@ -10,6 +15,7 @@ class PDFLoader:
         
         # 1. LOAD PRIVATE ENTITY LIST (Hidden from GitHub)
         self.BANNED_ENTITIES = self._load_banned_entities(entity_file)
+        self.redactor = EntityRedactor(self.BANNED_ENTITIES)
 
         # 2. STOP MARKERS (Generic, safe to share)
         self.LEGAL_STOP_MARKERS = [
@@ -29,6 +35,21 @@ class PDFLoader:
             r"Subscribe to .*", r"Before it’s here, it’s on the .*", r"Sent from my iPhone",
             r"For the exclusive use of", r"Source: \w+ Research", r"Download the \w+ app"
         ]
+        self._compile_cleaner()
+
+    def _compile_cleaner(self):
+        """
+        Precompiles the stop markers and the noise patterns into one regex each.
+        Lines are lowercased up front (one pass over the whole text), so the regexes
+        run case-sensitive - re.IGNORECASE disables the literal-prefix fast path and
+        costs ~5x. Patterns using uppercase escapes (\\D, \\W, ...) keep a scoped (?i:).
+        Call again after editing LEGAL_STOP_MARKERS / NOISE_PATTERNS.
+        """
+        def fold(pattern: str) -> str:
+            return f"(?i:{pattern})" if re.search(r"\\[A-Z]", pattern) else pattern.lower()
+
+        self._stop_re = re.compile("|".join(re.escape(m.lower()) for m in self.LEGAL_STOP_MARKERS))
+        self._noise_re = re.compile("|".join(f"(?:{fold(p)})" for p in self.NOISE_PATTERNS))
 
     def _load_banned_entities(self, filepath: str) -> List[str]:
         """Loads sensitive names from a private JSON file ignored by Git."""
@@ -43,96 +64,185 @@ class PDFLoader:
             print(f"ℹ️ Note: {filepath} not found. Running without entity redaction.")
             return []
 
-    def load_documents(self) -> List[Dict]:
+    def load_documents(self, workers: int = 1, index=None) -> List[Dict]:
         """Scans folder, cleans text, redacts entities, and returns content."""
-        documents = []
+        return list(self.iter_documents(workers=workers, index=index))
+
+    def iter_documents(self, workers: int = 1, index=None) -> Iterator[Dict]:
+        """
+        Streaming version of load_documents: yields each cleaned document as soon
+        as it (and every file before it) is ready, so callers can start scoring
+        while the rest of the folder is still being extracted.
+
+        workers > 1 fans extraction/cleaning/redaction out over a process pool
+        (0 = one process per core). At most 2 * workers files are read ahead,
+        so memory is bounded by the window, not by the folder size.
+
+        index (a ProcessedIndex) skips files whose content hash was already
+        scored *before* they are opened, and tags each doc with `content_hash`.
+        """
+        files = self._list_files()
+        if not files:
+            return
+
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(files))
+
+        print(f"📄 Found {len(files)} PDFs. Processing with Redaction ({workers} process(es))...")
+
+        pending = self._pending_files(files, index)
+
+        if workers <= 1:
+            for filename, sha in pending:
+                doc = self._load_file(filename)
+                if doc is not None:
+                    yield self._tag(doc, sha)
+            return
+
+        pool = ProcessPoolExecutor(max_workers=workers)
+        window = deque()
+        try:
+            for filename, sha in itertools.islice(pending, workers * 2):
+                window.append((filename, sha, pool.submit(self._load_file, filename)))
+
+            while window:
+                filename, sha, future = window.popleft()
+                nxt = next(pending, None)
+                if nxt is not None:
+                    window.append((*nxt, pool.submit(self._load_file, nxt[0])))
+                try:
+                    doc = future.result()
+                except Exception as e:
+                    # Worker crashed (e.g. segfault in a malformed PDF) - isolate it
+                    print(f"   ❌ Failed to load {filename}: {e}")
+                    continue
+                if doc is not None:
+                    yield self._tag(doc, sha)
+        finally:
+            # Consumer may stop early - don't leave queued files running
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def load_file(self, filename: str, content_hash: Optional[str] = None, pool=None) -> Optional[Dict]:
+        """
+        Extract -> clean -> redact one file of raw_dir (no index check), in this process
+        or on `pool` (e.g. a ProcessPoolExecutor). content_hash is tagged onto the doc.
+        """
+        doc = pool.submit(self._load_file, filename).result() if pool else self._load_file(filename)
+        return self._tag(doc, content_hash) if doc is not None else None
+
+    def pending_files(self, index) -> Iterator[Tuple[str, str]]:
+        """(filename, content_hash) of every PDF in raw_dir not yet scored according to `index`."""
+        return self._pending_files(self._list_files(), index)
+
+    def _pending_files(self, files: List[str], index) -> Iterator[Tuple[str, Optional[str]]]:
+        """Yields (filename, content_hash), dropping files the index has already seen."""
+        seen_this_run = set()
+        for filename in files:
+            if index is None:
+                yield filename, None
+                continue
+            try:
+                status = index.check(os.path.join(self.raw_dir, filename))
+            except OSError as e:
+                print(f"   ❌ Failed to stat {filename}: {e}")
+                continue
+            if status.processed:
+                print(f"   ⏩ Skipping {filename} (unchanged content already in database)")
+                continue
+            if status.sha256 in seen_this_run:
+                print(f"   ⏩ Skipping {filename} (duplicate content in this batch)")
+                continue
+            seen_this_run.add(status.sha256)
+            yield filename, status.sha256
+
+    @staticmethod
+    def _tag(doc: Dict, sha: Optional[str]) -> Dict:
+        # Stage timings travel with the doc out of worker processes
+        get_metrics().merge(doc.pop("metrics", {}))
+        if sha:
+            doc["content_hash"] = sha
+        return doc
+
+    def _list_files(self) -> List[str]:
         if not os.path.exists(self.raw_dir):
             os.makedirs(self.raw_dir)
             print(f"📁 Created {self.raw_dir}. Drop research PDFs here.")
             return []
 
-        files = [f for f in os.listdir(self.raw_dir) if f.lower().endswith(".pdf")]
+        files = sorted(f for f in os.listdir(self.raw_dir) if f.lower().endswith(".pdf"))
         
         if not files:
             print(f"⚠️ No PDFs found in {self.raw_dir}")
-            return []
-
-        print(f"📄 Found {len(files)} PDFs. Processing with Redaction...")
+        return files
 
-        for filename in files:
-            path = os.path.join(self.raw_dir, filename)
-            try:
-                # 1. Extract Raw Text
+    def _load_file(self, filename: str) -> Optional[Dict]:
+        """Extract -> clean -> redact a single PDF. Returns None on failure."""
+        path = os.path.join(self.raw_dir, filename)
+        metrics = Metrics()  # local: this may run in a worker process
+        try:
+            # 1. Extract Raw Text
+            with metrics.stage("pdf_extract", os.path.getsize(path)):
                 raw_text = self._extract_text(path)
-                
-                # 2. Structural Cleaning (Cut disclaimers, headers)
+            
+            # 2. Structural Cleaning (Cut disclaimers, headers)
+            with metrics.stage("pdf_clean", len(raw_text)):
                 clean_text = self._remove_legal_bloat(raw_text)
-                
-                # 3. Entity Redaction (The "Clean Room" scrub)
+            
+            # 3. Entity Redaction (The "Clean Room" scrub)
+            with metrics.stage("redact", len(clean_text)):
                 final_text = self._redact_entities(clean_text)
-                
-                # Metrics
-                reduction = 1 - (len(final_text) / len(raw_text)) if len(raw_text) > 0 else 0
-                doc_type = "newsletter" if "newsletter" in filename.lower() else "sellside_research"
-
-                documents.append({
-                    "source": filename,
-                    "content": final_text,
-                    "type": doc_type,
-                    # This is the key your main.py was looking for:
-                    "boilerplate_removed_pct": f"{reduction:.1%}" 
-                })
-                print(f"   ✅ Loaded & Anonymized: {filename}")
-                
-            except Exception as e:
-                print(f"   ❌ Failed to load {filename}: {e}")
-                
-        return documents
+            
+            # Metrics
+            reduction = 1 - (len(final_text) / len(raw_text)) if len(raw_text) > 0 else 0
+            doc_type = "newsletter" if "newsletter" in filename.lower() else "sellside_research"
+
+            print(f"   ✅ Loaded & Anonymized: {filename}")
+            return {
+                "source": filename,
+                "content": final_text,
+                "type": doc_type,
+                # This is the key your main.py was looking for:
+                "boilerplate_removed_pct": f"{reduction:.1%}",
+                "metrics": metrics.snapshot()
+            }
+            
+        except Exception as e:
+            print(f"   ❌ Failed to load {filename}: {e}")
+            get_metrics().merge(metrics.snapshot())
+            return None
 
     def _extract_text(self, filepath: str) -> str:
-        doc = fitz.open(filepath)
         text_blocks = []
-        for page in doc:
-            text_blocks.append(page.get_text())
+        with fitz.open(filepath) as doc:
+            for page in doc:
+                text_blocks.append(page.get_text())
         return "\n".join(text_blocks)
 
     def _remove_legal_bloat(self, text: str) -> str:
-        lines = text.split('\n')
+        is_stop, is_noise = self._stop_re.search, self._noise_re.search
         cleaned_lines = []
-        stop_triggered = False
         
-        for line in lines:
+        # str.lower() never creates or removes a newline, so the two splits stay aligned
+        for line, lowered in zip(text.split('\n'), text.lower().split('\n')):
             line_strip = line.strip()
+            if not line_strip:
+                continue
+            lowered = lowered.strip()
             
-            # Check Stop Markers
-            for marker in self.LEGAL_STOP_MARKERS:
-                if marker.lower() in line_strip.lower() and len(line_strip) < 100:
-                    stop_triggered = True
-                    break
-            if stop_triggered: break 
+            # Stop Markers: only short lines (headings), not body sentences quoting them
+            if len(line_strip) < 100 and is_stop(lowered):
+                break
             
-            # Check Noise Patterns
-            is_noise = False
-            for pattern in self.NOISE_PATTERNS:
-                if re.search(pattern, line_strip, re.IGNORECASE):
-                    is_noise = True
-                    break
-            
-            if not is_noise and line_strip:
+            # Noise Patterns (page footers, email headers, ...)
+            if not is_noise(lowered):
                 cleaned_lines.append(line_strip)
                 
         return "\n".join(cleaned_lines)
 
     def _redact_entities(self, text: str) -> str:
         """Replaces sensitive bank names and authors with generic placeholders."""
-        if not self.BANNED_ENTITIES:
-            return text
-            
-        redacted_text = text
-        for entity in self.BANNED_ENTITIES:
-            pattern = re.compile(re.escape(entity), re.IGNORECASE)
-            redacted_text = pattern.sub("[REDACTED_ENTITY]", redacted_text)
-        return redacted_text
+        return self.redactor.redact(text)
 
 if __name__ == "__main__":
     loader = PDFLoader()
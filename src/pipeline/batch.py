@@ -0,0 +1,243 @@
+"""
+Batch Mode
+Offline alternative to live scoring for overnight backfills: every pending scorer /
+extractor request is written to a JSONL file in OpenAI Batch API format, submitted,
+polled until done, and the results are parsed back into ScoreResponse / MacroReport
+records and persisted like a live run.
+
+Progress lives in <state_dir>/current/: state.json (rewritten atomically at each
+phase change) plus persisted.log (one custom_id per persisted record), so a restarted
+process resumes the open job instead of re-submitting or double-writing:
+    prepared -> submitted -> completed -> collected
+"""
+import json
+import os
+import time
+from typing import Dict, Iterable, Optional
+from src.evaluation.llm_client import DEFAULT_MODEL, response_format
+from src.evaluation.response_cache import CacheKey
+from src.evaluation.scorer import ScoreResponse, EquityScorer
+from src.evaluation.macro_extractor import MacroReport, MacroExtractor
+from src.pipeline.metrics import get_metrics
+from src.pipeline.records import single_stock_record, macro_record
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+ENDPOINT = "/v1/chat/completions"
+
+
+class BatchRunner:
+    def __init__(self, scorer: EquityScorer, macro_tool: MacroExtractor, validator, lookup,
+                 store, index=None, state_dir: str = "data/batches"):
+        self.scorer = scorer
+        self.macro_tool = macro_tool
+        self.validator = validator
+        self.lookup = lookup
+        self.store = store
+        self.index = index
+        self.client = scorer.client
+        self.job_dir = os.path.join(state_dir, "current")
+        self.state_path = os.path.join(self.job_dir, "state.json")
+        self.input_path = os.path.join(self.job_dir, "requests.jsonl")
+        self.persisted_path = os.path.join(self.job_dir, "persisted.log")
+        self.state = self._load_state()
+        self.persisted = self._load_persisted()
+
+    # --- LIFECYCLE ---
+    def has_open_job(self) -> bool:
+        return bool(self.state) and self.state.get("status") != "collected"
+
+    def run(self, documents: Iterable[Dict], poll_interval: float = 60) -> int:
+        """Resumes an open job if there is one, otherwise batches `documents`. Returns records persisted."""
+        if not self.has_open_job():
+            if self.prepare(documents) == 0:
+                return len(self.persisted)
+        if self.state["status"] == "prepared":
+            self.submit()
+        if self.state["status"] not in TERMINAL_STATUSES:
+            self.wait(poll_interval)
+        return self.collect()
+
+    def prepare(self, documents: Iterable[Dict]) -> int:
+        """
+        Routes + validates each document now (cheap next to the LLM call) and writes one
+        request line per document. Responses already in the LLM cache are persisted
+        straight away instead of being submitted. Returns the number of queued requests.
+        """
+        self._archive_previous()
+        os.makedirs(self.job_dir, exist_ok=True)
+        self.state = {"status": "prepared", "created_at": time.time(), "requests": {}}
+        self.persisted = set()
+        open(self.persisted_path, 'w').close()
+
+        with open(self.input_path, 'w') as f:
+            for i, doc in enumerate(documents):
+                ticker = self.lookup.extract_ticker(doc['content'])
+                if ticker:
+                    engine, schema = self.scorer, ScoreResponse
+                    user_message = self.scorer.user_message(doc['content'][:self.scorer.MAX_CHARS])
+                    fact_checks = self.validator.validate(doc['content'], ticker)
+                else:
+                    engine, schema = self.macro_tool, MacroReport
+                    user_message = self.macro_tool.user_message(doc['content'][:self.macro_tool.MAX_CHARS])
+                    fact_checks = []
+
+                key = engine.cache_key(user_message)
+                meta = {
+                    "kind": "single_stock" if ticker else "macro_deep_dive",
+                    "ticker": ticker,
+                    "fact_checks": fact_checks,
+                    "doc": {k: v for k, v in doc.items() if k != 'content'},
+                    "cache_key": key.__dict__,
+                }
+                custom_id = f"{i:06d}-{meta['kind']}"
+
+                cached = engine.cache.get(key) if engine.cache else None
+                if cached is not None:
+                    self._persist(custom_id, meta, schema.model_validate_json(cached))
+                    continue
+
+                f.write(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": ENDPOINT,
+                    "body": {
+                        "model": DEFAULT_MODEL,
+                        "messages": engine.build_messages(user_message),
+                        "response_format": response_format(schema),
+                    },
+                }) + "\n")
+                self.state["requests"][custom_id] = meta
+
+        queued = len(self.state["requests"])
+        print(f"📦 Batch prepared: {queued} requests ({len(self.persisted)} served from cache)")
+        if queued == 0:
+            self.state["status"] = "collected"
+        self._save_state()
+        return queued
+
+    def submit(self):
+        """Uploads the request file and creates the batch (ids are checkpointed first thing)."""
+        if "input_file_id" not in self.state:
+            with open(self.input_path, 'rb') as f:
+                uploaded = self.client.files.create(file=f, purpose="batch")
+            self.state["input_file_id"] = uploaded.id
+            self._save_state()
+
+        batch = self.client.batches.create(
+            input_file_id=self.state["input_file_id"],
+            endpoint=ENDPOINT,
+            completion_window="24h",
+            metadata={"source": "equity-research-scorer"},
+        )
+        self.state.update(batch_id=batch.id, status=batch.status)
+        self._save_state()
+        print(f"🚀 Batch submitted: {batch.id} ({len(self.state['requests'])} requests)")
+
+    def wait(self, poll_interval: float = 60, timeout: Optional[float] = None) -> str:
+        """Polls until the batch reaches a terminal status."""
+        started = time.time()
+        while True:
+            batch = self.client.batches.retrieve(self.state["batch_id"])
+            self.state["status"] = batch.status
+            self.state["output_file_id"] = batch.output_file_id
+            self.state["error_file_id"] = batch.error_file_id
+            self._save_state()
+
+            counts = batch.request_counts
+            if counts:
+                print(f"   ⏳ Batch {batch.status}: {counts.completed}/{counts.total} done, {counts.failed} failed")
+            if batch.status in TERMINAL_STATUSES:
+                return batch.status
+            if timeout is not None and time.time() - started > timeout:
+                raise TimeoutError(f"batch {self.state['batch_id']} still {batch.status}")
+            time.sleep(poll_interval)
+
+    def collect(self) -> int:
+        """Downloads results and persists every response not already persisted. Returns the total."""
+        if self.state.get("output_file_id"):
+            output = self.client.files.content(self.state["output_file_id"]).text
+            for line in output.splitlines():
+                if line.strip():
+                    self._handle_result(json.loads(line))
+
+        if self.state.get("error_file_id"):
+            errors = self.client.files.content(self.state["error_file_id"]).text
+            for line in errors.splitlines():
+                if line.strip():
+                    item = json.loads(line)
+                    print(f"   ❌ {item.get('custom_id')}: {item.get('error') or item.get('response', {}).get('status_code')}")
+
+        failed = sum(1 for custom_id in self.state["requests"] if custom_id not in self.persisted)
+        if failed:
+            print(f"⚠️ {failed} batch requests failed; their files stay unmarked and will be retried next run")
+        self.state["status"] = "collected"
+        self._save_state()
+        return len(self.persisted)
+
+    # --- HELPERS ---
+    def _handle_result(self, item: Dict):
+        custom_id = item.get("custom_id")
+        meta = self.state["requests"].get(custom_id)
+        if meta is None or custom_id in self.persisted:
+            return  # Unknown id, or already persisted before a restart
+        response = item.get("response") or {}
+        if response.get("status_code") != 200:
+            print(f"   ❌ {custom_id}: HTTP {response.get('status_code')} {item.get('error')}")
+            return
+        usage = (response.get("body") or {}).get("usage") or {}
+        get_metrics().incr("llm_prompt_tokens", usage.get("prompt_tokens") or 0)
+        get_metrics().incr("llm_completion_tokens", usage.get("completion_tokens") or 0)
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            schema = ScoreResponse if meta["kind"] == "single_stock" else MacroReport
+            parsed = schema.model_validate_json(content)
+        except Exception as e:
+            print(f"   ❌ {custom_id}: unparseable response ({e})")
+            return
+
+        engine = self.scorer if meta["kind"] == "single_stock" else self.macro_tool
+        if engine.cache:
+            engine.cache.put(CacheKey(**meta["cache_key"]), content)
+        self._persist(custom_id, meta, parsed)
+
+    def _persist(self, custom_id: str, meta: Dict, parsed):
+        doc = meta["doc"]
+        if meta["kind"] == "single_stock":
+            record = single_stock_record(doc, meta["ticker"], meta["fact_checks"], self.scorer.finalize(parsed))
+        else:
+            record = macro_record(doc, self.macro_tool.to_dict(parsed, doc['source']))
+        with get_metrics().stage("persist"):
+            # A crash after the store write but before the log line must not store it twice on resume
+            content_hash = doc.get('content_hash')
+            if not content_hash or self.store.find_content_hash(content_hash) is None:
+                self.store.append(record)
+            if self.index is not None and content_hash:
+                self.index.mark_processed([(content_hash, doc['source'])])
+        self._log_persisted(custom_id)
+
+    def _log_persisted(self, custom_id: str):
+        with open(self.persisted_path, 'a') as f:
+            f.write(custom_id + "\n")
+        self.persisted.add(custom_id)
+
+    def _load_state(self) -> Dict:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def _load_persisted(self) -> set:
+        if not os.path.exists(self.persisted_path):
+            return set()
+        with open(self.persisted_path, 'r') as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)  # atomic: a crash never leaves half a state file
+
+    def _archive_previous(self):
+        if self.state and self.state.get("batch_id"):
+            os.replace(self.job_dir, os.path.join(os.path.dirname(self.job_dir), self.state["batch_id"]))
@@ -0,0 +1,236 @@
+"""
+Cluster Coordination
+Coordinator + worker scale-out over a shared directory (NFS / SMB mount across hosts,
+or a local folder standing in for a broker on one machine):
+
+    <root>/cluster.db        members, shard leases and settings (rollback journal: no WAL across hosts)
+    <root>/shards/NN.db      one JobQueue per shard; a document's shard is its content hash mod N
+    <root>/docs/<sha>/<file> PDFs staged by the coordinator, until merged or parked as failed
+    <root>/outbox/<sha>.json finished records, written atomically by workers
+    <root>/rate_limits.db    SEC / OpenAI token buckets shared by every node
+
+The coordinator stages new PDFs and merges the outbox into the central score store
+(it is the only writer of scores.db). A worker leases one shard at a time, so each
+shard file is written by a single node, and drains it through the usual job
+checkpoints. Shard and job leases expire after `lease_s` without renewal, so the work
+of a node that dies is taken over by the others. Leases compare wall-clock times
+across hosts: keep node clocks in sync (NTP).
+"""
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from src.pipeline.job_queue import Job, JobQueue
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    owner TEXT PRIMARY KEY,
+    role TEXT NOT NULL,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    heartbeat REAL NOT NULL,
+    jobs_done INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS shard_leases (
+    shard INTEGER PRIMARY KEY,
+    owner TEXT,
+    expires REAL
+);
+"""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=60)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    return conn
+
+
+class Cluster:
+    def __init__(self, root: str, shards: Optional[int] = None, lease_s: float = 900):
+        """shards is fixed when the cluster directory is first created; later values are ignored."""
+        self.root = root
+        self.lease_s = lease_s
+        for sub in ("shards", "docs", "outbox"):
+            os.makedirs(os.path.join(root, sub), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = _connect(os.path.join(root, "cluster.db"))
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            self._conn.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('shards', ?)",
+                               (str(shards or 16),))
+        self.shards = int(self._conn.execute("SELECT value FROM settings WHERE key = 'shards'").fetchone()[0])
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO shard_leases (shard) VALUES (?)",
+                                   [(n,) for n in range(self.shards)])
+        self._queues: Dict[int, JobQueue] = {}
+
+    def configure_env(self):
+        """Points this process's shared rate limiters at the cluster (call before any client is built)."""
+        os.environ["RATE_LIMIT_DB"] = os.path.join(self.root, "rate_limits.db")
+        os.environ["RATE_LIMIT_JOURNAL"] = "DELETE"
+
+    def shard_of(self, content_hash: str) -> int:
+        return int(content_hash[:8], 16) % self.shards
+
+    def queue(self, shard: int, owner: Optional[str] = None) -> JobQueue:
+        with self._lock:
+            if shard not in self._queues:
+                self._queues[shard] = JobQueue(os.path.join(self.root, "shards", f"{shard:02d}.db"),
+                                               lease_s=self.lease_s, owner=owner, journal_mode="DELETE")
+            return self._queues[shard]
+
+    def staged_name(self, job: Job) -> str:
+        """Path of a job's PDF relative to <root>/docs (the workers' loader raw_dir)."""
+        return os.path.join(job.content_hash, job.source)
+
+    # --- COORDINATOR ---
+    def stage(self, path: str, content_hash: str, retry_failed: bool = False) -> bool:
+        """
+        Copies a PDF into the shared folder and queues it on its shard. False if it is already
+        queued or done, or if it failed earlier and retry_failed is off (such a job is re-queued
+        with a fresh copy when retry_failed is on).
+        """
+        queue = self.queue(self.shard_of(content_hash))
+        job = queue.get(content_hash)
+        failed = job is not None and job["state"] == "failed"
+        if failed and not retry_failed:
+            return False
+        name = os.path.basename(path)
+        target = os.path.join(self.root, "docs", content_hash, name)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(path, f"{target}.tmp")
+            os.replace(f"{target}.tmp", target)
+        if failed:
+            return queue.retry_failed(content_hash) == 1
+        return queue.enqueue(content_hash, name)
+
+    def merge(self, store, index) -> int:
+        """Moves finished records from the outbox into the central store. Returns how many were new."""
+        merged = 0
+        outbox = os.path.join(self.root, "outbox")
+        for entry in sorted(os.listdir(outbox)):
+            if not entry.endswith(".json"):
+                continue
+            path = os.path.join(outbox, entry)
+            with open(path) as f:
+                record = json.load(f)
+            content_hash = entry[:-len(".json")]
+            if store.find_content_hash(content_hash) is None:
+                store.append(record)
+                merged += 1
+            index.mark_processed([(content_hash, record["file"])])
+            os.remove(path)
+            shutil.rmtree(os.path.join(self.root, "docs", content_hash), ignore_errors=True)
+        self.sweep_failed()
+        return merged
+
+    def sweep_failed(self) -> int:
+        """
+        Deletes the staged copies of jobs parked as failed (the originals stay in the
+        coordinator's raw folder; --retry-failed stages them again). Returns how many.
+        """
+        swept = 0
+        for shard in range(self.shards):
+            for content_hash in self.queue(shard).content_hashes("failed"):
+                staged = os.path.join(self.root, "docs", content_hash)
+                if os.path.isdir(staged):
+                    shutil.rmtree(staged, ignore_errors=True)
+                    swept += 1
+        return swept
+
+    def counts(self) -> Dict[str, int]:
+        """Job states summed over every shard."""
+        totals: Dict[str, int] = {}
+        for shard in range(self.shards):
+            for state, n in self.queue(shard).counts().items():
+                totals[state] = totals.get(state, 0) + n
+        return totals
+
+    def open_jobs(self) -> int:
+        return sum(n for state, n in self.counts().items() if state not in ("persisted", "failed"))
+
+    def outbox_size(self) -> int:
+        return sum(1 for e in os.listdir(os.path.join(self.root, "outbox")) if e.endswith(".json"))
+
+    # --- WORKERS ---
+    def join(self, owner: str, role: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO members (owner, role, host, pid, started_at, heartbeat) VALUES (?, ?, ?, ?, ?, ?)",
+                (owner, role, socket.gethostname(), os.getpid(), now, now),
+            )
+
+    def heartbeat(self, owner: str, jobs_done: int = 0):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE members SET heartbeat = ?, jobs_done = jobs_done + ? WHERE owner = ?",
+                               (time.time(), jobs_done, owner))
+
+    def leave(self, owner: str):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE shard_leases SET owner = NULL, expires = NULL WHERE owner = ?", (owner,))
+            self._conn.execute("DELETE FROM members WHERE owner = ?", (owner,))
+
+    def members(self, max_age_s: Optional[float] = None) -> List[Dict]:
+        """Registered nodes; with max_age_s only those that sent a heartbeat recently."""
+        cutoff = time.time() - max_age_s if max_age_s else 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT owner, role, host, pid, heartbeat, jobs_done FROM members WHERE heartbeat >= ? "
+                "ORDER BY started_at", (cutoff,)).fetchall()
+        return [dict(zip(("owner", "role", "host", "pid", "heartbeat", "jobs_done"), r)) for r in rows]
+
+    def claim_shard(self, owner: str, skip=()) -> Optional[int]:
+        """Leases a shard no live worker holds, preferring shards with runnable jobs."""
+        now = time.time()
+        with self._lock:
+            free = [r[0] for r in self._conn.execute(
+                "SELECT shard FROM shard_leases WHERE owner IS NULL OR expires < ? OR owner = ? ORDER BY shard",
+                (now, owner))]
+        for shard in free:
+            if shard in skip or not self.queue(shard, owner).has_runnable():
+                continue
+            with self._lock, self._conn:
+                cur = self._conn.execute(
+                    "UPDATE shard_leases SET owner = ?, expires = ? "
+                    "WHERE shard = ? AND (owner IS NULL OR expires < ? OR owner = ?)",
+                    (owner, now + self.lease_s, shard, now, owner),
+                )
+            if cur.rowcount:
+                return shard
+        return None
+
+    def renew_shard(self, shard: int, owner: str) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute("UPDATE shard_leases SET expires = ? WHERE shard = ? AND owner = ?",
+                                     (time.time() + self.lease_s, shard, owner))
+        return cur.rowcount == 1
+
+    def release_shard(self, shard: int, owner: str):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE shard_leases SET owner = NULL, expires = NULL WHERE shard = ? AND owner = ?",
+                               (shard, owner))
+
+    def publish(self, job: Job, record: Dict):
+        """Hands a finished record to the coordinator (atomic rename), then closes the job."""
+        path = os.path.join(self.root, "outbox", f"{job.content_hash}.json")
+        with open(f"{path}.{job.queue.owner.replace(':', '_')}.tmp", "w") as f:
+            json.dump(record, f)
+            tmp = f.name
+        os.replace(tmp, path)
+        job.queue.complete(job)
+
+    def close(self):
+        for queue in self._queues.values():
+            queue.close()
+        self._conn.close()
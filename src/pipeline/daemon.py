@@ -0,0 +1,150 @@
+"""
+Ingestion Daemon
+Long-running alternative to the one-shot run: files reported by the FolderWatcher are
+enqueued on the durable JobQueue and scored by a fixed set of worker threads that share
+one warm pipeline (the same loader, scorer, validator and lookup objects, with their
+HTTP clients and caches), so a dropped PDF is persisted within seconds instead of at
+the next batch run.
+
+Every stage is checkpointed on the job, as in a live run: after a crash the next start
+resumes each document from its last checkpoint, and a failed attempt is retried by the
+daemon itself once the queue's retry delay has passed (until it is parked as failed).
+On shutdown the workers finish the documents in hand; the rest stay queued for the
+next start.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+from src.pipeline.job_queue import Job, JobQueue, LeaseLost
+
+
+@dataclass
+class DaemonStats:
+    queued: int = 0
+    completed: int = 0
+    failed: int = 0             # attempts without a record (retried until the job is parked)
+    skipped: int = 0            # unchanged content already scored, or already queued
+    latency_s_total: float = 0.0  # enqueued -> persisted
+    latency_s_max: float = 0.0
+
+    @property
+    def latency_s_mean(self) -> float:
+        return self.latency_s_total / self.completed if self.completed else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.completed} docs persisted, {self.failed} failed attempts, {self.skipped} skipped "
+                f"(queue-to-result {self.latency_s_mean:.1f}s avg, {self.latency_s_max:.1f}s max)")
+
+
+class IngestDaemon:
+    """
+    run_fn(job) -> (doc, record) runs one job from its last checkpoint (main.run_job with the
+    loader and engines bound); persist_fn(job, record) stores it and closes the job
+    (main.persist_job). on_result(doc, record) is called after each attempt (printing).
+    """
+
+    def __init__(self, jobs: JobQueue, index, raw_dir: str,
+                 run_fn: Callable[[Job], Tuple[Optional[Dict], Optional[Dict]]],
+                 persist_fn: Callable[[Job, Dict], None], workers: int = 4,
+                 on_result: Optional[Callable] = None, poll_s: float = 1.0):
+        self.jobs = jobs
+        self.index = index
+        self.raw_dir = raw_dir
+        self.run_fn = run_fn
+        self.persist_fn = persist_fn
+        self.workers = max(1, workers)
+        self.on_result = on_result
+        self.poll_s = poll_s  # idle workers look for retries that came due at least this often
+        self.stats = DaemonStats()
+        self._in_hand = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"ingest-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, filename: str):
+        """Enqueues a file of raw_dir (FolderWatcher.on_ready)."""
+        if self._stop.is_set():
+            return
+        try:
+            status = self.index.check(os.path.join(self.raw_dir, filename))
+        except OSError as e:
+            print(f"   ❌ Failed to stat {filename}: {e}")
+            return
+        # A failed document dropped again is a request to retry it
+        added = not status.processed and (self.jobs.enqueue(status.sha256, filename)
+                                          or self.jobs.retry_failed(status.sha256) == 1)
+        with self._wake:
+            if added:
+                self.stats.queued += 1
+                self._wake.notify()
+            else:
+                self.stats.skipped += 1
+        if not added:
+            print(f"   ⏩ Skipping {filename} (unchanged content already scored or queued)")
+
+    def backlog(self) -> int:
+        """Jobs not yet persisted or parked (including retries waiting for their delay)."""
+        counts = self.jobs.counts()
+        return sum(n for state, n in counts.items() if state not in ("persisted", "failed")) - self._in_hand
+
+    def idle(self) -> bool:
+        """True when nothing is in hand and no job is runnable right now."""
+        with self._lock:
+            if self._in_hand:
+                return False
+        return not self.jobs.has_runnable()
+
+    def stop(self, timeout: Optional[float] = None) -> int:
+        """Stops after the documents in hand. Returns the number of jobs left for the next start."""
+        self._stop.set()
+        with self._wake:
+            self._wake.notify_all()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return self.backlog()
+
+    def _work(self):
+        while not self._stop.is_set():
+            with self._wake:
+                job = self.jobs.claim()
+                if job is None:
+                    self._wake.wait(self.poll_s)
+                    continue
+                self._in_hand += 1
+            try:
+                self._handle(job)
+            except LeaseLost:
+                pass  # another worker owns it now
+            except Exception as e:
+                with self._lock:
+                    self.stats.failed += 1
+                print(f"   ❌ Daemon error on {job.source}: {e}")
+            finally:
+                with self._lock:
+                    self._in_hand -= 1
+
+    def _handle(self, job: Job):
+        doc, record = self.run_fn(job)  # a failed attempt is released to the queue for a retry
+        if record:
+            self.persist_fn(job, record)
+        created = (self.jobs.get(job.content_hash) or {}).get("created_at")
+        with self._lock:
+            if record:
+                latency = time.time() - created if created else 0.0
+                self.stats.completed += 1
+                self.stats.latency_s_total += latency
+                self.stats.latency_s_max = max(self.stats.latency_s_max, latency)
+            else:
+                self.stats.failed += 1
+        if doc and self.on_result:
+            self.on_result(doc, record)
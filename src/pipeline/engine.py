@@ -0,0 +1,181 @@
+"""
+Concurrent Execution Engine
+Runs per-document work on a thread pool with a bounded number of calls in flight.
+Results come back in input order, so the database is written deterministically.
+Within a document, independent stages (fact-check fetching, the LLM judge) run side
+by side through a StageRunner, each with its own timeout.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Tuple, TypeVar, Optional, Dict
+
+In = TypeVar("In")
+Out = TypeVar("Out")
+
+
+@dataclass
+class RunStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    first_result_s: float = 0.0  # latency until the first item was yielded
+
+    @property
+    def docs_per_minute(self) -> float:
+        if self.elapsed_s <= 0:
+            return 0.0
+        return self.completed / self.elapsed_s * 60
+
+    def summary(self) -> str:
+        return (f"{self.completed} docs in {self.elapsed_s:.1f}s "
+                f"({self.docs_per_minute:.1f} docs/min, {self.failed} failed)")
+
+
+class ConcurrentRunner:
+    """
+    Keeps at most `max_in_flight` calls of `worker_fn` running at once.
+    Finished results are buffered until every earlier item has been yielded,
+    so a slow head document delays output but never reorders it.
+    """
+
+    def __init__(self, worker_fn: Callable[[In], Out], max_in_flight: int = 4):
+        self.worker_fn = worker_fn
+        self.max_in_flight = max(1, max_in_flight)
+        # Cap on running + finished-but-unyielded work (bounds memory)
+        self.max_buffered = self.max_in_flight * 4
+        self.stats = RunStats()
+
+    def _safe_call(self, item: In) -> Optional[Out]:
+        try:
+            return self.worker_fn(item)
+        except Exception as e:
+            print(f"   ❌ Worker error: {e}")
+            raise
+
+    def run(self, items: Iterable[In]) -> Iterator[Tuple[In, Optional[Out]]]:
+        """Yields (item, result) in input order. Failed items yield result=None."""
+        self.stats = RunStats()
+        start = time.perf_counter()
+        source = iter(items)
+        exhausted = False
+
+        running = {}                      # future -> index
+        inputs: Dict[int, In] = {}        # index -> item, until yielded
+        done: Dict[int, Optional[Out]] = {}
+        next_submit = 0
+        next_yield = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            while True:
+                # 1. Top up the window
+                while (not exhausted and len(running) < self.max_in_flight
+                       and len(inputs) < self.max_buffered):
+                    try:
+                        item = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    inputs[next_submit] = item
+                    running[pool.submit(self._safe_call, item)] = next_submit
+                    next_submit += 1
+                    self.stats.submitted += 1
+
+                # 2. Flush everything that is ready, in order
+                while next_yield in done:
+                    result = done.pop(next_yield)
+                    if next_yield == 0:
+                        self.stats.first_result_s = time.perf_counter() - start
+                    yield inputs.pop(next_yield), result
+                    next_yield += 1
+
+                if exhausted and not running:
+                    break
+                if not running:
+                    continue
+
+                # 3. Wait for at least one call to finish
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    idx = running.pop(fut)
+                    try:
+                        done[idx] = fut.result()
+                        self.stats.completed += 1
+                    except Exception:
+                        done[idx] = None
+                        self.stats.failed += 1
+                self.stats.elapsed_s = time.perf_counter() - start
+
+        self.stats.elapsed_s = time.perf_counter() - start
+
+
+@dataclass
+class StageResult:
+    value: Any = None
+    error: Optional[str] = None  # "timeout after Ns" or the exception message
+    elapsed_s: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class StageRunner:
+    """
+    Runs the independent stages of one document concurrently and waits for all of
+    them, giving each its own deadline (`timeouts[name]` seconds from the start;
+    missing or 0 = no limit). A stage that misses its deadline is reported as failed
+    and the document moves on; its thread finishes in the background.
+    The pool is shared by every document and created on first use. max_workers=0 runs
+    the stages one after another in the calling thread, without timeouts (profiling).
+    """
+
+    def __init__(self, timeouts: Optional[Dict[str, float]] = None, max_workers: int = 16):
+        self.timeouts = dict(timeouts or {})
+        self.max_workers = max_workers
+        self.timed_out: Dict[str, int] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def run(self, **stages: Callable[[], Any]) -> Dict[str, StageResult]:
+        """run(fact_checks=fn, score=fn) -> {"fact_checks": StageResult, "score": StageResult}"""
+        if self.max_workers == 0:
+            return {name: self._timed(fn) for name, fn in stages.items()}
+        pool = self._get_pool()
+        start = time.perf_counter()
+        futures = {name: pool.submit(self._timed, fn) for name, fn in stages.items()}
+
+        results = {}
+        # Shortest deadline first, so every wait is measured against the common start
+        for name in sorted(futures, key=lambda n: self.timeouts.get(n) or float("inf")):
+            limit = self.timeouts.get(name) or None
+            remaining = None if limit is None else max(0.0, limit - (time.perf_counter() - start))
+            try:
+                results[name] = futures[name].result(timeout=remaining)
+            except FutureTimeout:
+                with self._lock:
+                    self.timed_out[name] = self.timed_out.get(name, 0) + 1
+                results[name] = StageResult(error=f"timeout after {limit:g}s", elapsed_s=limit)
+        return {name: results[name] for name in stages}
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage")
+            return self._pool
+
+    @staticmethod
+    def _timed(fn: Callable[[], Any]) -> StageResult:
+        start = time.perf_counter()
+        try:
+            return StageResult(value=fn(), elapsed_s=time.perf_counter() - start)
+        except Exception as e:
+            return StageResult(error=str(e) or type(e).__name__, elapsed_s=time.perf_counter() - start)
@@ -0,0 +1,250 @@
+"""
+Durable Job Queue
+SQLite-backed work queue for the live pipeline: one job per document (keyed by content
+hash), with a checkpoint saved after each stage, so a run that dies part-way loses at
+most the stage in flight - a rerun resumes every document from its last checkpoint:
+
+    queued -> ingested -> validated -> scored -> persisted      (or failed)
+
+Several processes can pull from the same queue file. A claim is a single UPDATE (one
+writer at a time under SQLite's lock) that leases the job to its owner for `lease_s`
+seconds; every checkpoint renews the lease, and a job whose lease expired, or whose
+owner process on this host has died, is claimed again by the next worker.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+STAGES = ("queued", "ingested", "validated", "scored", "persisted")
+TERMINAL = ("persisted", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,        -- while leased: lease end; after a failure: retry-not-before
+    error TEXT,
+    record_id INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, lease_expires);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    job_id INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (job_id, stage)
+) WITHOUT ROWID;
+"""
+
+
+class LeaseLost(Exception):
+    """The job was reclaimed by another worker (our lease expired); drop it without saving."""
+
+
+@dataclass
+class Job:
+    id: int
+    content_hash: str
+    source: str
+    state: str
+    attempts: int
+    checkpoints: Dict[str, Any] = field(default_factory=dict)
+    queue: Optional["JobQueue"] = field(default=None, repr=False)
+
+    def checkpoint(self, stage: str) -> Any:
+        """The saved output of `stage`, or None if it has not completed yet."""
+        return self.checkpoints.get(stage)
+
+    def save(self, stage: str, value: Any):
+        """Checkpoints a finished stage (and renews the lease)."""
+        self.queue.save(self, stage, value)
+        self.checkpoints[stage] = value
+
+
+def owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    def __init__(self, db_path: str = "data/processed/jobs.db", lease_s: float = 900,
+                 max_attempts: int = 3, retry_delay_s: float = 60, owner: Optional[str] = None,
+                 journal_mode: str = "WAL"):
+        """journal_mode="DELETE" for a queue on a filesystem shared by several hosts (WAL needs one host)."""
+        self.db_path = db_path
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self.retry_delay_s = retry_delay_s
+        self.owner = owner or owner_id()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    # --- PRODUCER ---
+    def enqueue(self, content_hash: str, source: str) -> bool:
+        """Adds a document unless its content is already queued (or done). Returns True if added."""
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (content_hash, source, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (content_hash, source, now, now),
+            )
+        return cur.rowcount == 1
+
+    def retry_failed(self, content_hash: Optional[str] = None) -> int:
+        """
+        Puts failed jobs (or just the one for content_hash) back in the queue with a fresh
+        attempt budget; their checkpoints are kept.
+        """
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET state = 'queued', attempts = 0, error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE state = 'failed' AND (? IS NULL OR content_hash = ?)",
+                (time.time(), content_hash, content_hash)
+            )
+        return cur.rowcount
+
+    # --- CONSUMER ---
+    def claim(self) -> Optional[Job]:
+        """Leases the oldest runnable job to this owner, or returns None if there is none right now."""
+        self._reap_dead_owners()
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET state = 'failed', lease_owner = NULL, updated_at = ? "
+                "WHERE state NOT IN ('persisted', 'failed') AND attempts >= ? "
+                "AND (lease_expires IS NULL OR lease_expires < ?)", (now, self.max_attempts, now)
+            )
+            row = self._conn.execute(
+                "UPDATE jobs SET lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = (SELECT id FROM jobs WHERE state NOT IN ('persisted', 'failed') "
+                "AND (lease_expires IS NULL OR lease_expires < ?) ORDER BY id LIMIT 1) "
+                "RETURNING id, content_hash, source, state, attempts",
+                (self.owner, now + self.lease_s, now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            checkpoints = {stage: json.loads(payload) for stage, payload in self._conn.execute(
+                "SELECT stage, payload FROM checkpoints WHERE job_id = ?", (row[0],))}
+        return Job(*row, checkpoints=checkpoints, queue=self)
+
+    def drain(self) -> Iterator[Job]:
+        """Claims jobs one at a time (lazily, so other workers share the queue) until none is runnable."""
+        while True:
+            job = self.claim()
+            if job is None:
+                return
+            yield job
+
+    def save(self, job: Job, stage: str, value: Any):
+        now = time.time()
+        with self._lock, self._conn:
+            self._renew(job, now, stage)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (job_id, stage, payload, saved_at) VALUES (?, ?, ?, ?)",
+                (job.id, stage, json.dumps(value), now),
+            )
+
+    def complete(self, job: Job, record_id: Optional[int] = None):
+        """Marks the job persisted and drops its checkpoints."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._renew(job, now, "persisted")
+            self._conn.execute(
+                "UPDATE jobs SET lease_owner = NULL, lease_expires = NULL, error = NULL, record_id = ? WHERE id = ?",
+                (record_id, job.id),
+            )
+            self._conn.execute("DELETE FROM checkpoints WHERE job_id = ?", (job.id,))
+
+    def release(self, job: Job, error: str):
+        """Gives a failed attempt back: retried after retry_delay_s, or failed once attempts run out."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET lease_owner = NULL, lease_expires = ?, error = ?, updated_at = ?, "
+                "state = CASE WHEN attempts >= ? THEN 'failed' ELSE state END "
+                "WHERE id = ? AND lease_owner = ?",
+                (now + self.retry_delay_s, error, now, self.max_attempts, job.id, self.owner),
+            )
+
+    # --- READS ---
+    def has_runnable(self) -> bool:
+        """True if a claim() right now could return a job."""
+        self._reap_dead_owners()
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM jobs WHERE state NOT IN ('persisted', 'failed') "
+                "AND (lease_expires IS NULL OR lease_expires < ?) LIMIT 1", (time.time(),)).fetchone() is not None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        return {state: counts.get(state, 0) for state in STAGES + ("failed",)}
+
+    def content_hashes(self, state: str) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT content_hash FROM jobs WHERE state = ?", (state,))]
+
+    def get(self, content_hash: str) -> Optional[Dict]:
+        with self._lock:
+            cur = self._conn.execute("SELECT * FROM jobs WHERE content_hash = ?", (content_hash,))
+            row = cur.fetchone()
+        return dict(zip([c[0] for c in cur.description], row)) if row else None
+
+    def close(self):
+        self._conn.close()
+
+    # --- HELPERS ---
+    def _renew(self, job: Job, now: float, stage: str):
+        """Caller holds the lock and the transaction. Advances the state and extends the lease."""
+        cur = self._conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ?, "
+            f"state = CASE WHEN ? > ({self._rank_sql('state')}) THEN ? ELSE state END "
+            "WHERE id = ? AND lease_owner = ?",
+            (now + self.lease_s, now, STAGES.index(stage), stage, job.id, self.owner),
+        )
+        if cur.rowcount == 0:
+            raise LeaseLost(f"{job.source}: lease lost (reclaimed by another worker)")
+
+    @staticmethod
+    def _rank_sql(column: str) -> str:
+        return "CASE " + column + " " + " ".join(f"WHEN '{s}' THEN {i}" for i, s in enumerate(STAGES)) + " ELSE -1 END"
+
+    def _reap_dead_owners(self):
+        """Frees leases held by processes on this host that no longer exist (crashed runs)."""
+        host = socket.gethostname()
+        with self._lock:
+            owners = [r[0] for r in self._conn.execute(
+                "SELECT DISTINCT lease_owner FROM jobs WHERE lease_owner LIKE ?", (f"{host}:%",))]
+        dead = [o for o in owners if o != self.owner and not _pid_alive(int(o.rsplit(":", 2)[1]))]
+        if not dead:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE jobs SET lease_owner = NULL, lease_expires = NULL WHERE lease_owner = ?",
+                [(o,) for o in dead],
+            )
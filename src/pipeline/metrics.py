@@ -0,0 +1,197 @@
+"""
+Run Metrics
+Lightweight per-stage instrumentation: wall time, CPU time, bytes and call counts for
+each pipeline stage (PDF extract, clean, redact, ticker lookup, SEC fetch, Yahoo fetch,
+LLM call, persist), plus counters (LLM tokens, cache hits). One registry per process;
+ingestion worker processes ship their numbers back with each document and are merged.
+Run summaries are exported as JSON and, optionally, Prometheus text format.
+profile() wraps a block in cProfile (or pyinstrument, if installed).
+"""
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator
+
+# Pipeline order (used to sort reports); other stage names are accepted too
+STAGES = ("pdf_extract", "pdf_clean", "redact", "ticker_lookup", "sec_fetch", "yahoo_fetch", "llm_call", "persist")
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    errors: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0      # CPU of the thread that ran the stage (time.thread_time)
+    bytes: int = 0
+    max_wall_s: float = 0.0
+
+    def add(self, other: "StageStats"):
+        self.calls += other.calls
+        self.errors += other.errors
+        self.wall_s += other.wall_s
+        self.cpu_s += other.cpu_s
+        self.bytes += other.bytes
+        self.max_wall_s = max(self.max_wall_s, other.max_wall_s)
+
+
+class Span:
+    """Handle yielded by Metrics.stage(); add_bytes() once the payload size is known."""
+
+    def __init__(self, nbytes: int = 0):
+        self.bytes = nbytes
+
+    def add_bytes(self, n: int):
+        self.bytes += n
+
+
+class Metrics:
+    def __init__(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, nbytes: int = 0) -> Iterator[Span]:
+        """Times the block as one call of `name`; an exception counts as an error and propagates."""
+        span = Span(nbytes)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        failed = False
+        try:
+            yield span
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - wall, time.thread_time() - cpu, span.bytes, failed)
+
+    def record(self, name: str, wall_s: float, cpu_s: float = 0.0, nbytes: int = 0, failed: bool = False):
+        with self._lock:
+            stats = self.stages.setdefault(name, StageStats())
+            stats.add(StageStats(1, int(failed), wall_s, cpu_s, nbytes, wall_s))
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stages = {name: asdict(stats) for name, stats in sorted(self.stages.items(), key=_stage_order)}
+            counters = dict(sorted(self.counters.items()))
+        return {
+            "started_at": self.started_at,
+            "elapsed_s": round(time.perf_counter() - self._start, 3),
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def merge(self, snapshot: Dict):
+        """Adds another registry's snapshot (e.g. from an ingestion worker process)."""
+        with self._lock:
+            for name, values in snapshot.get("stages", {}).items():
+                self.stages.setdefault(name, StageStats()).add(StageStats(**values))
+            for name, value in snapshot.get("counters", {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.started_at = time.time()
+            self._start = time.perf_counter()
+
+    def summary_lines(self):
+        snap = self.snapshot()
+        for name, s in snap["stages"].items():
+            mb = f", {s['bytes'] / 1e6:.1f} MB" if s["bytes"] else ""
+            errors = f", {s['errors']} errors" if s["errors"] else ""
+            yield (f"{name:<14} {s['calls']:>5} calls  wall {s['wall_s']:8.2f}s  cpu {s['cpu_s']:7.2f}s  "
+                   f"max {s['max_wall_s']:.2f}s{mb}{errors}")
+        if snap["counters"]:
+            yield "  ".join(f"{k}={v:g}" for k, v in snap["counters"].items())
+
+    def to_prometheus(self, prefix: str = "equity_scorer") -> str:
+        """Prometheus text exposition format (for the node_exporter textfile collector)."""
+        snap = self.snapshot()
+        series = (("calls_total", "counter", "calls"), ("errors_total", "counter", "errors"),
+                  ("wall_seconds_total", "counter", "wall_s"), ("cpu_seconds_total", "counter", "cpu_s"),
+                  ("bytes_total", "counter", "bytes"), ("max_wall_seconds", "gauge", "max_wall_s"))
+        lines = []
+        for metric, kind, field in series:
+            lines.append(f"# TYPE {prefix}_stage_{metric} {kind}")
+            for name, s in snap["stages"].items():
+                lines.append(f'{prefix}_stage_{metric}{{stage="{name}"}} {s[field]:g}')
+        for name, value in snap["counters"].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value:g}")
+        lines.append(f"# TYPE {prefix}_run_seconds gauge")
+        lines.append(f"{prefix}_run_seconds {snap['elapsed_s']:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str, **extra) -> Dict:
+        report = {**self.snapshot(), **extra}
+        _atomic_write(path, json.dumps(report, indent=2))
+        return report
+
+    def write_prometheus(self, path: str):
+        _atomic_write(path, self.to_prometheus())
+
+
+def _stage_order(item):
+    name = item[0]
+    return (STAGES.index(name) if name in STAGES else len(STAGES), name)
+
+
+def _atomic_write(path: str, content: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """The process-wide registry every instrumented stage reports into."""
+    return _metrics
+
+
+@contextmanager
+def profile(label: str, kind: str = "cprofile", out_dir: str = "data/profiles") -> Iterator[Dict]:
+    """
+    Profiles the block (calling thread only). Writes <out_dir>/<label>.prof for cProfile
+    (open with snakeviz / pstats) or <label>.html for pyinstrument; the yielded dict
+    receives the output path.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    out = {"path": None}
+    if kind == "pyinstrument":
+        from pyinstrument import Profiler  # optional dependency
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield out
+        finally:
+            profiler.stop()
+            out["path"] = os.path.join(out_dir, f"{label}.html")
+            with open(out["path"], "w") as f:
+                f.write(profiler.output_html())
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield out
+    finally:
+        profiler.disable()
+        out["path"] = os.path.join(out_dir, f"{label}.prof")
+        profiler.dump_stats(out["path"])
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
@@ -0,0 +1,31 @@
+"""
+Record Builders
+The stored shape of a scored document, shared by the live, batch and worker paths.
+"""
+import datetime
+from typing import Dict, List
+
+
+def single_stock_record(doc: Dict, ticker: str, fact_checks: List[Dict], score_data: Dict) -> Dict:
+    return {
+        "file": doc['source'],
+        "content_hash": doc.get('content_hash'),
+        "timestamp": datetime.datetime.now().isoformat(),
+        "type": "single_stock",
+        "ticker": ticker,
+        "boilerplate_removed": doc.get('boilerplate_removed_pct', "0%"),
+        "fact_checks": fact_checks,
+        **score_data
+    }
+
+
+def macro_record(doc: Dict, macro_data: Dict) -> Dict:
+    return {
+        "file": doc['source'],
+        "content_hash": doc.get('content_hash'),
+        "timestamp": datetime.datetime.now().isoformat(),
+        "type": "macro_deep_dive",
+        "ticker": "MACRO", # Placeholder for UI sorting
+        "boilerplate_removed": doc.get('boilerplate_removed_pct', "0%"),
+        **macro_data
+    }
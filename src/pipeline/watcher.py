@@ -0,0 +1,186 @@
+"""
+Folder Watcher
+Notices PDFs dropped into the raw folder and hands each one off once it is fully
+written. Change events come from watchdog (inotify on Linux, FSEvents / kqueue
+elsewhere) when it is installed, otherwise from polling the folder. Either way a file
+is only reported after its size and mtime have been stable for `settle_s` and it ends
+with a PDF trailer (%%EOF), so copies still in progress are never picked up half-written.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+PDF_TRAILER = b"%%EOF"
+TRAILER_WINDOW = 1024  # %%EOF may be followed by whitespace or a short tail
+
+
+@dataclass
+class _Pending:
+    stat: Optional[Tuple[int, int]]  # (size, mtime_ns) at the last check
+    changed_at: float                # last time the file (or an event for it) changed
+    first_seen: float
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def looks_complete(path: str) -> bool:
+    """True if the file ends with a PDF trailer (writers append it last)."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - TRAILER_WINDOW))
+            return PDF_TRAILER in f.read()
+    except OSError:
+        return False
+
+
+class FolderWatcher:
+    """
+    Calls on_ready(filename) from a background thread for every PDF in `folder` that
+    appears or changes. backend: "auto" (watchdog if installed, else polling),
+    "watchdog" or "poll". A file without a trailer is still handed off after
+    `max_wait_s`, so a malformed PDF fails in the loader instead of waiting forever.
+    """
+
+    def __init__(self, folder: str, on_ready: Callable[[str], None], settle_s: float = 2.0,
+                 poll_s: float = 1.0, backend: str = "auto", max_wait_s: float = 120.0, suffix: str = ".pdf"):
+        self.folder = os.path.abspath(folder)
+        self.on_ready = on_ready
+        self.settle_s = settle_s
+        self.poll_s = poll_s
+        self.backend = backend
+        self.max_wait_s = max_wait_s
+        self.suffix = suffix
+        self._pending: Dict[str, _Pending] = {}
+        self._seen: Dict[str, Tuple[int, int]] = {}  # name -> stat when it was handed off
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def start(self, initial_scan: bool = True) -> str:
+        """Starts watching; returns the backend in use. initial_scan queues files already present."""
+        os.makedirs(self.folder, exist_ok=True)
+        if self.backend in ("auto", "watchdog"):
+            self._observer = self._start_observer(required=self.backend == "watchdog")
+        self.backend = "watchdog" if self._observer else "poll"
+        if initial_scan:
+            self.scan()
+        self._thread = threading.Thread(target=self._loop, name="folder-watcher", daemon=True)
+        self._thread.start()
+        return self.backend
+
+    def stop(self):
+        """Stops watching. Files still settling are dropped; they are seen again by the next initial scan."""
+        self._stop.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread:
+            self._thread.join()
+
+    def notify(self, name: str):
+        """Marks a file as changed (restarts its settle timer)."""
+        if not name.lower().endswith(self.suffix) or name.startswith("."):
+            return
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending.get(name)
+            if pending:
+                pending.changed_at = now
+            else:
+                self._pending[name] = _Pending(None, now, now)
+
+    def scan(self):
+        """
+        Notifies every new file, and every file whose stat differs from when it was last
+        handed off. Files already settling are left alone: their stat is tracked by the loop.
+        """
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError as e:
+            print(f"⚠️ Could not scan {self.folder}: {e}")
+            return
+        for entry in entries:
+            with self._lock:
+                known = entry.name in self._pending
+            if not known and entry.is_file() and self._seen.get(entry.name) != _stat(entry.path):
+                self.notify(entry.name)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _loop(self):
+        interval = min(self.poll_s, max(self.settle_s / 2, 0.05))
+        last_scan = time.monotonic()
+        while not self._stop.wait(interval):
+            if not self._observer and time.monotonic() - last_scan >= self.poll_s:
+                self.scan()
+                last_scan = time.monotonic()
+            for name in self._settled():
+                try:
+                    self.on_ready(name)
+                except Exception as e:
+                    print(f"   ❌ Watcher callback failed for {name}: {e}")
+
+    def _settled(self):
+        """Pops the files that are stable and complete."""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            items = list(self._pending.items())
+        for name, pending in items:
+            path = os.path.join(self.folder, name)
+            stat = _stat(path)
+            with self._lock:
+                if stat is None:  # deleted or renamed away
+                    self._pending.pop(name, None)
+                    continue
+                if stat != pending.stat:
+                    pending.stat, pending.changed_at = stat, now
+                    continue
+                if now - pending.changed_at < self.settle_s:
+                    continue
+                if stat == self._seen.get(name):  # event without a content change
+                    self._pending.pop(name, None)
+                    continue
+            if not looks_complete(path) and now - pending.first_seen < self.max_wait_s:
+                continue
+            with self._lock:
+                self._pending.pop(name, None)
+                self._seen[name] = stat
+            ready.append(name)
+        return ready
+
+    def _start_observer(self, required: bool):
+        try:
+            from watchdog.events import FileSystemEventHandler  # optional dependency
+            from watchdog.observers import Observer
+        except ImportError:
+            if required:
+                raise
+            return None
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                path = getattr(event, "dest_path", "") or event.src_path
+                if os.path.dirname(os.path.abspath(path)) == watcher.folder:
+                    watcher.notify(os.path.basename(path))
+
+        observer = Observer()
+        observer.schedule(Handler(), self.folder, recursive=False)
+        observer.start()
+        return observer
@@ -28,4 +28,10 @@ class PromptManager:
             raise KeyError(f"Prompt '{name}' not found in configuration.")
         
         # Return the content string
-        return self.prompts[name]['content']
\ No newline at end of file
+        return self.prompts[name]['content']
+
+    def get_version(self, name: str) -> str:
+        """Returns the prompt's `version` field (used to invalidate cached responses)."""
+        if name not in self.prompts:
+            raise KeyError(f"Prompt '{name}' not found in configuration.")
+        return str(self.prompts[name].get('version', '0'))
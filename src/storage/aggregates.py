@@ -0,0 +1,166 @@
+"""
+Report Aggregates
+Materialized cross-report tables kept next to the records in scores.db, so the
+analytics page reads a few small indexed tables instead of every JSON payload:
+
+    agg_ticker_scores   reports and score sums per (ticker, day, 0.5-point score bucket)
+    agg_fact_checks     fact checks and mismatches per (source, metric, day)
+    agg_themes          top_ideas mentions per normalized idea name
+
+Updated incrementally inside the same transaction that inserts a record (ScoreStore
+calls apply()); a watermark of the last applied record id lets an existing database
+be backfilled once and keeps the tables consistent with the records table.
+"""
+import json
+import re
+import sqlite3
+import threading
+from typing import Dict, Optional
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agg_ticker_scores (
+    ticker TEXT NOT NULL,
+    day TEXT NOT NULL,
+    bucket REAL NOT NULL,
+    reports INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    PRIMARY KEY (ticker, day, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS agg_fact_checks (
+    source TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    day TEXT NOT NULL,
+    checks INTEGER NOT NULL,
+    mismatches INTEGER NOT NULL,
+    PRIMARY KEY (source, metric, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS agg_themes (
+    name_key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT,
+    mentions INTEGER NOT NULL,
+    first_seen TEXT,
+    last_seen TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS agg_watermark (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL
+);
+"""
+
+PERIOD_SUFFIX_RE = re.compile(r"\s*\((?:FY|Q|CY)?[^)]*\)\s*$")
+
+
+def _day(record: Dict) -> str:
+    return (record.get("timestamp") or "")[:10] or "unknown"
+
+
+def metric_family(metric: str) -> str:
+    """'Revenue (FY2024)' -> 'Revenue'; 'Forward EPS (Consensus)' -> 'Forward EPS'."""
+    return PERIOD_SUFFIX_RE.sub("", metric or "").strip() or "unknown"
+
+
+def theme_key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class Aggregates:
+    """
+    Operates on a ScoreStore's connection and (reentrant) lock. apply() runs inside the
+    caller's lock and transaction; every other method takes the lock itself.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, lock: Optional[threading.RLock] = None):
+        self._conn = conn
+        self._lock = lock or threading.RLock()
+        self._conn.executescript(SCHEMA)
+
+    # --- WRITES ---
+    def apply(self, record_id: int, record: Dict):
+        """Folds one newly inserted record into every aggregate."""
+        day = _day(record)
+        score = record.get("overall_score")
+        if record.get("type") == "single_stock" and isinstance(score, (int, float)):
+            self._conn.execute(
+                "INSERT INTO agg_ticker_scores (ticker, day, bucket, reports, score_sum) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT (ticker, day, bucket) DO UPDATE SET "
+                "reports = reports + 1, score_sum = score_sum + excluded.score_sum",
+                (record.get("ticker") or "unknown", day, round(score * 2) / 2, float(score)),
+            )
+
+        for check in record.get("fact_checks") or []:
+            self._conn.execute(
+                "INSERT INTO agg_fact_checks (source, metric, day, checks, mismatches) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT (source, metric, day) DO UPDATE SET "
+                "checks = checks + 1, mismatches = mismatches + excluded.mismatches",
+                (check.get("source") or "unknown", metric_family(check.get("metric")), day,
+                 int(check.get("status") == "MISMATCH")),
+            )
+
+        for idea in record.get("top_ideas") or []:
+            name = (idea.get("name") or "").strip()
+            if not name:
+                continue
+            self._conn.execute(
+                "INSERT INTO agg_themes (name_key, name, type, mentions, first_seen, last_seen) "
+                "VALUES (?, ?, ?, 1, ?, ?) ON CONFLICT (name_key) DO UPDATE SET "
+                "mentions = mentions + 1, first_seen = MIN(first_seen, excluded.first_seen), "
+                "last_seen = MAX(last_seen, excluded.last_seen)",
+                (theme_key(name), name, idea.get("type"), day, day),
+            )
+
+        self._conn.execute(
+            "INSERT INTO agg_watermark (name, last_id) VALUES ('records', ?) "
+            "ON CONFLICT (name) DO UPDATE SET last_id = MAX(last_id, excluded.last_id)", (record_id,)
+        )
+
+    def catch_up(self, batch_size: int = 500) -> int:
+        """Applies records newer than the watermark (first run on an existing database). Returns the count."""
+        applied = 0
+        while True:
+            with self._lock, self._conn:
+                rows = self._conn.execute(
+                    "SELECT id, payload FROM records WHERE id > ? ORDER BY id LIMIT ?",
+                    (self.watermark(), batch_size),
+                ).fetchall()
+                for record_id, payload in rows:
+                    self.apply(record_id, json.loads(payload))
+            applied += len(rows)
+            if len(rows) < batch_size:
+                return applied
+
+    def rebuild(self) -> int:
+        """Recomputes every aggregate from the records table."""
+        with self._lock, self._conn:
+            for table in ("agg_ticker_scores", "agg_fact_checks", "agg_themes", "agg_watermark"):
+                self._conn.execute(f"DELETE FROM {table}")
+        return self.catch_up()
+
+    # --- READS ---
+    def watermark(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT last_id FROM agg_watermark WHERE name = 'records'").fetchone()
+        return row[0] if row else 0
+
+    def ticker_scores(self, ticker: Optional[str] = None) -> pd.DataFrame:
+        """ticker, day, bucket, reports, score_sum (one row per score bucket per day)."""
+        where, params = ("WHERE ticker = ?", [ticker]) if ticker else ("", [])
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT ticker, day, bucket, reports, score_sum FROM agg_ticker_scores {where} "
+                "ORDER BY ticker, day, bucket", self._conn, params=params)
+
+    def fact_checks(self) -> pd.DataFrame:
+        """source, metric, day, checks, mismatches."""
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT source, metric, day, checks, mismatches FROM agg_fact_checks ORDER BY source, metric, day",
+                self._conn)
+
+    def themes(self, limit: int = 25) -> pd.DataFrame:
+        """Most-cited top_ideas across macro reports."""
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT name, type, mentions, first_seen, last_seen FROM agg_themes "
+                "ORDER BY mentions DESC, last_seen DESC LIMIT ?", self._conn, params=[limit])
@@ -0,0 +1,115 @@
+"""
+Processed-File Index
+Remembers which PDFs have been scored, keyed by content hash (SHA-256).
+(size, mtime) per path is a fast pre-check so unchanged files are never re-hashed,
+and both maps live in memory for O(1) lookups, backed by a small SQLite file.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+
+@dataclass
+class FileStatus:
+    path: str
+    sha256: str
+    size: int
+    mtime_ns: int
+    processed: bool
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ProcessedIndex:
+    def __init__(self, db_path: str = "data/processed/file_index.db"):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS processed (
+                sha256 TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                processed_at TEXT DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE IF NOT EXISTS file_stats (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            );
+        """)
+        # Warm in-memory maps: hash -> source, path -> (size, mtime, hash)
+        self._by_hash: Dict[str, str] = dict(self._conn.execute("SELECT sha256, source FROM processed"))
+        self._by_path: Dict[str, Tuple[int, int, str]] = {
+            path: (size, mtime, sha)
+            for path, size, mtime, sha in self._conn.execute("SELECT path, size, mtime_ns, sha256 FROM file_stats")
+        }
+
+    def __len__(self) -> int:
+        return len(self._by_hash)
+
+    def __contains__(self, sha256: str) -> bool:
+        return sha256 in self._by_hash
+
+    def check(self, path: str) -> FileStatus:
+        """
+        Resolves a file's content hash and whether it has already been scored.
+        Only re-hashes when size or mtime changed since we last saw the path.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        cached = self._by_path.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            sha = cached[2]
+        else:
+            sha = hash_file(path)
+            with self._lock:
+                self._by_path[path] = (st.st_size, st.st_mtime_ns, sha)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO file_stats (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+                    (path, st.st_size, st.st_mtime_ns, sha),
+                )
+                self._conn.commit()
+        return FileStatus(path, sha, st.st_size, st.st_mtime_ns, sha in self._by_hash)
+
+    def mark_processed(self, items: Iterable[Tuple[str, str]]):
+        """Records (sha256, source) pairs in one transaction, after results are persisted."""
+        items = list(items)
+        if not items:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO processed (sha256, source) VALUES (?, ?)", items
+            )
+            self._by_hash.update(items)
+
+    def seed_from_history(self, sources: Iterable[str], raw_dir: str) -> int:
+        """
+        One-time bootstrap for histories that predate hashing: files still on disk
+        under a name we already scored are recorded by their current content hash.
+        """
+        if self._by_hash:
+            return 0
+        seeded = []
+        for source in set(sources):
+            path = os.path.join(raw_dir, source)
+            if os.path.exists(path):
+                seeded.append((self.check(path).sha256, source))
+        self.mark_processed(seeded)
+        return len(seeded)
+
+    def get_source(self, sha256: str) -> Optional[str]:
+        return self._by_hash.get(sha256)
+
+    def close(self):
+        self._conn.close()
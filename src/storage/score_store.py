@@ -0,0 +1,219 @@
+"""
+Score Store
+SQLite-backed history of scored reports (replaces the monolithic scores.json).
+Each record is stored as JSON plus indexed columns (file, ticker, type, timestamp),
+appends are transactional, and WAL mode lets the dashboard read while main.py writes.
+Every insert also updates the cross-report aggregates (src/storage/aggregates.py) in
+the same transaction.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.storage.aggregates import Aggregates
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file TEXT NOT NULL,
+    ticker TEXT,
+    type TEXT,
+    timestamp TEXT,
+    content_hash TEXT,
+    overall_score REAL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_file ON records(file);
+CREATE INDEX IF NOT EXISTS idx_records_ticker ON records(ticker);
+CREATE INDEX IF NOT EXISTS idx_records_type ON records(type);
+CREATE INDEX IF NOT EXISTS idx_records_timestamp ON records(timestamp);
+CREATE INDEX IF NOT EXISTS idx_records_content_hash ON records(content_hash);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Indexed columns: enough for list views without parsing any payload
+SUMMARY_COLUMNS = ("id", "file", "ticker", "type", "timestamp", "overall_score")
+
+
+class ScoreStore:
+    def __init__(self, db_path: str = "data/processed/scores.db"):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # Guards the connection, which worker threads share: reads take it as well as writes.
+        # Reentrant, so the aggregates can take it inside a write the store already holds.
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self.aggregates = Aggregates(self._conn, self._lock)
+        with self._lock:
+            backfilled = self.aggregates.catch_up()
+        if backfilled:
+            print(f"📊 Aggregated {backfilled} existing records")
+
+    # --- WRITES ---
+    def append(self, record: Dict) -> int:
+        """Inserts one record and commits. Returns its row id."""
+        return self.append_many([record])[0]
+
+    def append_many(self, records: Iterable[Dict]) -> List[int]:
+        """Inserts records in a single transaction (all or nothing)."""
+        ids = []
+        with self._lock, self._conn:
+            for record in records:
+                ids.append(self._insert(record))
+        return ids
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        One-shot import of the legacy scores.json (newest-first list).
+        Recorded in the meta table so it never runs twice; the JSON file is left untouched.
+        """
+        if self._get_meta("migrated_from_json") or not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, 'r') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read legacy history {json_path}: {e}")
+            return 0
+
+        # Oldest first, so row ids grow with time like new appends do
+        with self._lock, self._conn:
+            for record in reversed(legacy):
+                self._insert(record)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from_json', ?)", (json_path,)
+            )
+        return len(legacy)
+
+    # --- READS ---
+    def get(self, record_id: int) -> Optional[Dict]:
+        row = self._fetchone("SELECT id, payload FROM records WHERE id = ?", (record_id,))
+        return self._decode(row) if row else None
+
+    def has_file(self, file: str) -> bool:
+        return self._fetchone("SELECT 1 FROM records WHERE file = ? LIMIT 1", (file,)) is not None
+
+    def find_content_hash(self, content_hash: str) -> Optional[int]:
+        """Row id of a record for this content, if one was stored (resumed jobs check before persisting)."""
+        row = self._fetchone("SELECT id FROM records WHERE content_hash = ? ORDER BY id DESC LIMIT 1", (content_hash,))
+        return row[0] if row else None
+
+    def files(self) -> List[str]:
+        return [r[0] for r in self._fetchall("SELECT DISTINCT file FROM records")]
+
+    def count(self, ticker: Optional[str] = None, type: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None) -> int:
+        where, params = self._where(ticker, type, since, until)
+        return self._fetchone(f"SELECT COUNT(*) FROM records {where}", params)[0]
+
+    def summaries(self, ticker: Optional[str] = None, type: Optional[str] = None,
+                  since: Optional[str] = None, until: Optional[str] = None,
+                  limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """
+        SUMMARY_COLUMNS of matching records, newest first, without decoding payloads.
+        since/until bound the ISO timestamp (since inclusive, until exclusive).
+        """
+        where, params = self._where(ticker, type, since, until)
+        sql = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM records {where} ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        return [dict(zip(SUMMARY_COLUMNS, row)) for row in self._fetchall(sql, params)]
+
+    def tickers(self) -> List[str]:
+        """Distinct tickers (walks the ticker index)."""
+        return [r[0] for r in self._fetchall(
+            "SELECT DISTINCT ticker FROM records WHERE ticker IS NOT NULL ORDER BY ticker")]
+
+    def timestamp_range(self) -> Tuple[Optional[str], Optional[str]]:
+        return self._fetchone("SELECT MIN(timestamp), MAX(timestamp) FROM records")
+
+    def version(self) -> Tuple[int, int]:
+        """
+        Changes whenever the table does: (commits by other connections, newest row id).
+        Cheap enough to check on every dashboard rerun.
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            max_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM records").fetchone()[0]
+        return data_version, max_id
+
+    def iter_records(self, ticker: Optional[str] = None, type: Optional[str] = None,
+                     limit: Optional[int] = None, offset: int = 0) -> Iterator[Dict]:
+        """Newest first. Filters hit the column indexes; nothing else is parsed."""
+        where, params = self._where(ticker, type)
+        sql = f"SELECT id, payload FROM records {where} ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        while True:
+            # Fetched in pages, so the lock is never held while the caller consumes records
+            with self._lock:
+                rows = cursor.fetchmany(500)
+            if not rows:
+                return
+            for row in rows:
+                yield self._decode(row)
+
+    def all(self) -> List[Dict]:
+        return list(self.iter_records())
+
+    def close(self):
+        self._conn.close()
+
+    # --- HELPERS ---
+    def _insert(self, record: Dict) -> int:
+        """Caller holds the lock and the transaction."""
+        cur = self._conn.execute(
+            "INSERT INTO records (file, ticker, type, timestamp, content_hash, overall_score, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                record.get("file"),
+                record.get("ticker"),
+                record.get("type"),
+                record.get("timestamp"),
+                record.get("content_hash"),
+                record.get("overall_score"),
+                json.dumps({k: v for k, v in record.items() if k != "id"}),
+            ),
+        )
+        self.aggregates.apply(cur.lastrowid, record)
+        return cur.lastrowid
+
+    @staticmethod
+    def _where(ticker: Optional[str], type: Optional[str], since: Optional[str] = None,
+               until: Optional[str] = None):
+        clauses, params = [], []
+        for clause, value in (("ticker = ?", ticker), ("type = ?", type),
+                              ("timestamp >= ?", since), ("timestamp < ?", until)):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _decode(row) -> Dict:
+        record = json.loads(row[1])
+        record["id"] = row[0]
+        return record
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._fetchone("SELECT value FROM meta WHERE key = ?", (key,))
+        return row[0] if row else None
+
+    def _fetchone(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql: str, params=()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
@@ -0,0 +1,43 @@
+"""
+Portfolio Analytics
+Vectorized pandas views over the materialized aggregates (src/storage/aggregates.py):
+score trend and distribution per ticker, fact-check mismatch rates per source, and
+the most-cited macro themes. Inputs are already grouped per day, so these frames stay
+small however many reports the history holds.
+"""
+import pandas as pd
+
+FREQUENCIES = {"Daily": "D", "Weekly": "W", "Monthly": "M"}
+
+
+def _with_period(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    days = pd.to_datetime(df["day"], errors="coerce")
+    df = df.loc[days.notna()].copy()
+    df["period"] = days[days.notna()].dt.to_period(freq).dt.start_time
+    return df
+
+
+def score_trend(scores: pd.DataFrame, freq: str = "W") -> pd.DataFrame:
+    """Mean score per ticker per period: columns period, ticker, reports, mean_score."""
+    if scores.empty:
+        return pd.DataFrame(columns=["period", "ticker", "reports", "mean_score"])
+    grouped = _with_period(scores, freq).groupby(["period", "ticker"], as_index=False)[["reports", "score_sum"]].sum()
+    grouped["mean_score"] = (grouped["score_sum"] / grouped["reports"]).round(2)
+    return grouped.drop(columns="score_sum")
+
+
+def score_distribution(scores: pd.DataFrame) -> pd.DataFrame:
+    """Reports per 0.5-point score bucket (rows) and ticker (columns)."""
+    if scores.empty:
+        return pd.DataFrame()
+    return scores.pivot_table(index="bucket", columns="ticker", values="reports", aggfunc="sum", fill_value=0)
+
+
+def mismatch_rates(checks: pd.DataFrame, by=("source",)) -> pd.DataFrame:
+    """checks, mismatches and mismatch_rate (0-1) per source (or any columns in `by`), worst first."""
+    by = list(by)
+    if checks.empty:
+        return pd.DataFrame(columns=by + ["checks", "mismatches", "mismatch_rate"])
+    grouped = checks.groupby(by, as_index=False)[["checks", "mismatches"]].sum()
+    grouped["mismatch_rate"] = (grouped["mismatches"] / grouped["checks"]).round(3)
+    return grouped.sort_values(["mismatch_rate", "checks"], ascending=False, ignore_index=True)
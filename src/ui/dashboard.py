@@ -1,6 +1,6 @@
 import streamlit as st
-import json
 import os
+import sys
 import pandas as pd
 
 # --- CONFIG ---
@@ -8,27 +8,52 @@ st.set_page_config(page_title="AI Research Analyst", page_icon="📈", layout="w
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-DATA_FILE = os.path.join(BASE_DIR, "data/processed/scores.json")
+LEGACY_FILE = os.path.join(BASE_DIR, "data/processed/scores.json")
+DB_FILE = os.path.join(BASE_DIR, "data/processed/scores.db")
+
+# `streamlit run` puts src/ui on the path, not the repo root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+from src.ui.data_layer import DashboardData, Filters
 
 # --- LOAD DATA ---
-def load_data():
-    if not os.path.exists(DATA_FILE):
-        return []
-    with open(DATA_FILE, 'r') as f:
-        return json.load(f)
+@st.cache_resource
+def get_data() -> DashboardData:
+    """One data layer per server process: its memo survives reruns and invalidates itself."""
+    return DashboardData(DB_FILE, LEGACY_FILE)
 
-data = load_data()
+data = get_data()
+options = data.options()
 
 # --- SIDEBAR ---
 st.sidebar.title("📚 Research History")
-if not data:
+if not options["total"]:
     st.sidebar.info("No analysis found. Run 'python main.py' first.")
     st.stop()
 
+# Filters run in SQL; only the current page of summaries is loaded
+ticker = st.sidebar.selectbox("Ticker", ["All"] + options["tickers"])
+report_type = st.sidebar.selectbox("Type", ["All"] + options["types"],
+                                   format_func=lambda t: t.replace("_", " ").title())
+dates = (st.sidebar.date_input("Date range", value=(options["first_date"], options["last_date"]))
+         if options["first_date"] else ())
+start, end = (dates if isinstance(dates, tuple) and len(dates) == 2 else (None, None))
+filters = Filters(ticker=None if ticker == "All" else ticker,
+                  type=None if report_type == "All" else report_type, start=start, end=end)
+
+page_size = st.sidebar.select_slider("Reports per page", options=[25, 50, 100, 200], value=50)
+first = data.page(filters, 1, page_size)
+page_number = st.sidebar.number_input(f"Page (of {first.pages})", min_value=1, max_value=first.pages, value=1)
+page = data.page(filters, int(page_number), page_size)
+st.sidebar.caption(f"{page.total} matching reports")
+if not page.rows:
+    st.sidebar.info("No reports match these filters.")
+    st.stop()
+
 # Create a clear label for the sidebar dropdown
-options = [f"{d.get('ticker', 'MACRO')} | {os.path.basename(d['file'])[:25]}..." for d in data]
-selected_idx = st.sidebar.selectbox("Select Report", range(len(data)), format_func=lambda x: options[x])
-report = data[selected_idx]
+labels = {r["id"]: f"{r.get('ticker') or 'MACRO'} | {os.path.basename(r['file'])[:25]}..." for r in page.rows}
+selected_id = st.sidebar.selectbox("Select Report", list(labels), format_func=labels.get)
+report = data.detail(selected_id)
 
 # --- MAIN HEADER ---
 st.title("🤖 AI Investment Committee")
@@ -0,0 +1,147 @@
+"""
+Dashboard Data Layer
+What the Streamlit dashboard reads, without re-reading the whole history on every
+click: list views page through indexed summary columns (filtered and paginated in
+SQL), a report's full payload is decoded only when it is opened, and results are
+memoized until the score store changes. The analytics
+page reads the materialized aggregates the store maintains on every insert.
+"""
+import datetime
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from src.storage.score_store import ScoreStore
+from src.ui import analytics
+
+REPORT_TYPES = ("single_stock", "macro_deep_dive")
+
+
+@dataclass(frozen=True)
+class Filters:
+    ticker: Optional[str] = None
+    type: Optional[str] = None
+    start: Optional[datetime.date] = None  # inclusive
+    end: Optional[datetime.date] = None    # inclusive
+
+    def bounds(self) -> Tuple[Optional[str], Optional[str]]:
+        """ISO timestamp bounds for ScoreStore (until is exclusive: the day after `end`)."""
+        since = self.start.isoformat() if self.start else None
+        until = (self.end + datetime.timedelta(days=1)).isoformat() if self.end else None
+        return since, until
+
+
+@dataclass
+class Page:
+    rows: List[Dict] = field(default_factory=list)  # SUMMARY_COLUMNS dicts
+    total: int = 0
+    page: int = 1
+    page_size: int = 50
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.total // self.page_size))
+
+
+class DashboardData:
+    def __init__(self, db_path: str = "data/processed/scores.db",
+                 legacy_path: Optional[str] = "data/processed/scores.json", max_entries: int = 256):
+        self.store = ScoreStore(db_path)
+        self.legacy_path = legacy_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memo: "OrderedDict[tuple, object]" = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def version(self) -> tuple:
+        """Store change token: memoized results are dropped when it moves."""
+        return self.store.version()
+
+    def page(self, filters: Filters = Filters(), page: int = 1, page_size: int = 50) -> Page:
+        """One page of summaries, newest first. Out-of-range pages are clamped."""
+        since, until = filters.bounds()
+
+        def load():
+            total = self.store.count(filters.ticker, filters.type, since, until)
+            number = min(max(1, page), max(1, -(-total // page_size)))
+            rows = self.store.summaries(filters.ticker, filters.type, since, until,
+                                        limit=page_size, offset=(number - 1) * page_size)
+            return Page(rows, total, number, page_size)
+
+        return self._cached(("page", filters, page, page_size), load)
+
+    def detail(self, record_id: int) -> Optional[Dict]:
+        """Full record (payload decoded) for one report."""
+        return self._cached(("detail", record_id), lambda: self.store.get(record_id))
+
+    def options(self) -> Dict:
+        """Filter choices: tickers, report types and the date span of the history."""
+        def load():
+            first, last = self.store.timestamp_range()
+            return {
+                "total": self.store.count(),
+                "tickers": self.store.tickers(),
+                "types": list(REPORT_TYPES),
+                "first_date": _to_date(first),
+                "last_date": _to_date(last),
+            }
+
+        return self._cached(("options",), load)
+
+    def analytics(self, freq: str = "W", ticker: Optional[str] = None, top_themes: int = 25) -> Dict:
+        """Portfolio views: score trend / distribution, fact-check mismatch rates, top macro themes."""
+        def load():
+            aggregates = self.store.aggregates
+            scores = aggregates.ticker_scores(ticker)
+            checks = aggregates.fact_checks()
+            return {
+                "score_trend": analytics.score_trend(scores, freq),
+                "score_distribution": analytics.score_distribution(scores),
+                "mismatch_by_source": analytics.mismatch_rates(checks),
+                "mismatch_by_metric": analytics.mismatch_rates(checks, by=("source", "metric")),
+                "themes": aggregates.themes(top_themes),
+            }
+
+        return self._cached(("analytics", freq, ticker, top_themes), load)
+
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._memo)}
+
+    def _cached(self, key: tuple, load):
+        with self._lock:
+            self._refresh()
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return self._memo[key]
+            self.misses += 1
+            value = load()
+            self._memo[key] = value
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+            return value
+
+    def _refresh(self):
+        """
+        Caller holds the lock. Drops memoized results when the store changed. The legacy
+        scores.json is imported once, when it first appears (ScoreStore.migrate_from_json
+        is a no-op after that, so later edits to the file are not picked up).
+        """
+        if self.legacy_path:
+            self.store.migrate_from_json(self.legacy_path)
+        version = self.version()
+        if version == self._version:
+            return
+        self._memo.clear()
+        self._version = version
+
+
+def _to_date(timestamp: Optional[str]) -> Optional[datetime.date]:
+    if not timestamp:
+        return None
+    try:
+        return datetime.date.fromisoformat(timestamp[:10])
+    except ValueError:
+        return None
@@ -0,0 +1,77 @@
+import streamlit as st
+import os
+import sys
+
+# --- CONFIG ---
+st.set_page_config(page_title="Portfolio Analytics", page_icon="📊", layout="wide")
+
+# Paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+LEGACY_FILE = os.path.join(BASE_DIR, "data/processed/scores.json")
+DB_FILE = os.path.join(BASE_DIR, "data/processed/scores.db")
+
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+from src.ui.analytics import FREQUENCIES
+from src.ui.data_layer import DashboardData
+
+# --- LOAD DATA ---
+@st.cache_resource
+def get_data() -> DashboardData:
+    return DashboardData(DB_FILE, LEGACY_FILE)
+
+data = get_data()
+options = data.options()
+
+# --- SIDEBAR ---
+st.sidebar.title("📊 Portfolio Analytics")
+if not options["total"]:
+    st.sidebar.info("No analysis found. Run 'python main.py' first.")
+    st.stop()
+
+ticker = st.sidebar.selectbox("Ticker", ["All"] + options["tickers"])
+freq = st.sidebar.radio("Bucket scores by", list(FREQUENCIES), index=1)
+top_themes = st.sidebar.slider("Themes to show", min_value=5, max_value=50, value=15)
+views = data.analytics(FREQUENCIES[freq], None if ticker == "All" else ticker, top_themes)
+
+st.title("📊 Cross-Report Analytics")
+st.caption(f"Precomputed from {options['total']} reports")
+st.markdown("---")
+
+# 1. SCORES PER TICKER OVER TIME
+st.markdown("### 📈 Score Trend per Ticker")
+trend = views["score_trend"]
+if trend.empty:
+    st.info("No single-stock scores yet.")
+else:
+    st.line_chart(trend.pivot(index="period", columns="ticker", values="mean_score"))
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("**Score distribution (reports per 0.5-point bucket)**")
+        st.bar_chart(views["score_distribution"])
+    with c2:
+        st.markdown("**Reports per period**")
+        st.dataframe(trend.pivot(index="period", columns="ticker", values="reports").fillna(0).astype(int),
+                     use_container_width=True)
+
+# 2. FACT-CHECK MISMATCH RATES
+st.markdown("### 🛡️ Fact-Check Mismatch Rate")
+by_source = views["mismatch_by_source"]
+if by_source.empty:
+    st.info("No fact checks recorded yet.")
+else:
+    rate = {"mismatch_rate": st.column_config.ProgressColumn("Mismatch rate", min_value=0, max_value=1, format="%.2f")}
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        st.dataframe(by_source, column_config=rate, use_container_width=True, hide_index=True)
+    with c2:
+        st.dataframe(views["mismatch_by_metric"], column_config=rate, use_container_width=True, hide_index=True)
+
+# 3. MOST-CITED MACRO THEMES
+st.markdown("### 🌊 Most-Cited Ideas Across Macro Reports")
+themes = views["themes"]
+if themes.empty:
+    st.info("No macro deep dives yet.")
+else:
+    st.bar_chart(themes.set_index("name")["mentions"], horizontal=True)
+    st.dataframe(themes, use_container_width=True, hide_index=True)
@@ -0,0 +1,13 @@
+import pytest
+from src.pipeline.metrics import get_metrics
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """Keep on-disk caches out of the repo's data/ folder and fresh per test."""
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm_responses.db"))
+    monkeypatch.setenv("SEC_TICKER_DB", str(tmp_path / "sec_tickers.db"))
+    monkeypatch.setenv("RATE_LIMIT_DB", str(tmp_path / "rate_limits.db"))
+    monkeypatch.setenv("SEC_FACT_DB", str(tmp_path / "sec_facts.db"))
+    monkeypatch.setenv("YAHOO_CACHE_PATH", str(tmp_path / "yahoo.db"))
+    get_metrics().reset()
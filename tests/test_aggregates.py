@@ -0,0 +1,69 @@
+import sqlite3
+from src.storage.aggregates import metric_family
+from src.storage.score_store import ScoreStore
+from src.ui import analytics
+from src.ui.data_layer import DashboardData
+
+
+def _stock(ticker, day, score, statuses=()):
+    return {"file": f"{ticker}_{day}.pdf", "ticker": ticker, "type": "single_stock",
+            "timestamp": f"2025-01-{day:02d}T09:00:00", "overall_score": score,
+            "fact_checks": [{"metric": "Revenue (FY2024)", "source": "SEC 10-K", "status": s} for s in statuses]}
+
+
+def _macro(day, names):
+    return {"file": f"macro_{day}.pdf", "type": "macro_deep_dive", "timestamp": f"2025-01-{day:02d}T09:00:00",
+            "top_ideas": [{"name": n, "type": "Theme", "rationale": ""} for n in names]}
+
+
+def test_aggregates_follow_appends(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    store.append_many([_stock("NVDA", 1, 4.2, ["MATCH", "MISMATCH"]), _stock("NVDA", 1, 3.9),
+                       _stock("AVGO", 8, 3.0, ["MATCH"])])
+    store.append(_macro(2, ["Grid Capex", "Copper"]))
+    store.append(_macro(9, ["grid  capex"]))
+
+    scores = store.aggregates.ticker_scores("NVDA")
+    assert scores[["day", "bucket", "reports"]].values.tolist() == [["2025-01-01", 4.0, 2]]
+    assert round(scores["score_sum"].sum(), 2) == 8.1
+
+    checks = store.aggregates.fact_checks()
+    assert checks.groupby("source")[["checks", "mismatches"]].sum().loc["SEC 10-K"].tolist() == [3, 1]
+
+    themes = store.aggregates.themes()
+    assert themes.iloc[0][["name", "mentions", "first_seen", "last_seen"]].tolist() == \
+        ["Grid Capex", 2, "2025-01-02", "2025-01-09"]
+    assert store.aggregates.watermark() == 5
+
+
+def test_existing_database_is_backfilled_once(tmp_path):
+    db = str(tmp_path / "scores.db")
+    ScoreStore(db).append_many([_stock("NVDA", d, 4.0) for d in range(1, 4)])
+    conn = sqlite3.connect(db)  # a database written before the aggregates existed
+    conn.executescript("DROP TABLE agg_ticker_scores; DROP TABLE agg_watermark;")
+    conn.close()
+
+    store = ScoreStore(db)
+    assert store.aggregates.ticker_scores()["reports"].sum() == 3
+    assert ScoreStore(db).aggregates.ticker_scores()["reports"].sum() == 3  # not applied twice
+    assert store.aggregates.rebuild() == 3
+
+
+def test_analytics_views(tmp_path):
+    db = str(tmp_path / "scores.db")
+    ScoreStore(db).append_many([_stock("NVDA", 6, 4.0, ["MISMATCH"]), _stock("NVDA", 7, 3.0),
+                                _stock("NVDA", 14, 5.0), _stock("AVGO", 7, 2.0, ["MATCH", "MATCH"])])
+    views = DashboardData(db, None).analytics(freq="W")
+
+    nvda = views["score_trend"].query("ticker == 'NVDA'")  # weeks of Jan 6 and Jan 13
+    assert nvda[["reports", "mean_score"]].values.tolist() == [[2, 3.5], [1, 5.0]]
+    assert views["score_trend"].groupby("ticker")["reports"].sum().to_dict() == {"AVGO": 1, "NVDA": 3}
+    assert views["score_distribution"].loc[2.0, "AVGO"] == 1
+    assert views["mismatch_by_source"].iloc[0][["checks", "mismatches", "mismatch_rate"]].tolist() == [3, 1, 0.333]
+    assert analytics.score_trend(DashboardData(str(tmp_path / "empty.db"), None).store.aggregates.ticker_scores()).empty
+
+
+def test_metric_family():
+    assert metric_family("Revenue (FY2024)") == "Revenue"
+    assert metric_family("Forward EPS (Consensus)") == "Forward EPS"
+    assert metric_family(None) == "unknown"
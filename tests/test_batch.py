@@ -0,0 +1,118 @@
+import json
+import pytest
+from src.evaluation.llm_client import RetryPolicy, response_format
+from src.evaluation.scorer import EquityScorer, ScoreResponse
+from src.evaluation.macro_extractor import MacroExtractor
+from src.pipeline.batch import BatchRunner
+from src.storage.score_store import ScoreStore
+from benchmarks.fakes import FakeOpenAIServer
+
+
+class StubLookup:
+    def extract_ticker(self, text):
+        return "NVDA" if "NVDA" in text else None
+
+
+class StubValidator:
+    def validate(self, text, ticker):
+        return [{"metric": "Revenue (FY2024)", "status": "MATCH"}]
+
+
+DOCS = [
+    {"source": "nvda.pdf", "content": "NVIDIA (NVDA) Buy", "boilerplate_removed_pct": "10.0%"},
+    {"source": "china_ag.pdf", "content": "China food security", "boilerplate_removed_pct": "50.0%"},
+]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with FakeOpenAIServer() as fake:
+        monkeypatch.setenv("OPENAI_BASE_URL", fake.base_url)
+        yield fake
+
+
+def _runner(tmp_path, store):
+    scorer, macro = EquityScorer(), MacroExtractor()
+    scorer.retry = macro.retry = RetryPolicy(base_delay=0.01)
+    return BatchRunner(scorer, macro, StubValidator(), StubLookup(), store, state_dir=str(tmp_path / "batches"))
+
+
+def test_batch_round_trip(tmp_path, server):
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    assert _runner(tmp_path, store).run(DOCS, poll_interval=0) == 2
+
+    lines = [json.loads(l) for l in open(tmp_path / "batches" / "current" / "requests.jsonl")]
+    assert {l["url"] for l in lines} == {"/v1/chat/completions"}
+    assert lines[0]["body"]["response_format"]["type"] == "json_schema"
+
+    records = {r["file"]: r for r in store.all()}
+    assert records["nvda.pdf"]["overall_score"] == 4.0
+    assert records["nvda.pdf"]["fact_checks"][0]["status"] == "MATCH"
+    assert records["china_ag.pdf"]["topic"] == "China Agriculture"
+    assert server.requests == []  # nothing went through the live endpoint
+
+
+def test_batch_resumes_after_restart(tmp_path, server):
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    first = _runner(tmp_path, store)
+    first.prepare(DOCS)
+    first.submit()
+    # ...process dies here; a new process picks the job back up
+    resumed = _runner(tmp_path, store)
+    assert resumed.has_open_job()
+    assert resumed.run([], poll_interval=0) == 2
+    assert len(server.batches) == 1  # not re-submitted
+    assert store.count() == 2
+
+    # Collecting again is a no-op: nothing is double-written
+    resumed.collect()
+    assert store.count() == 2
+
+
+def test_crash_between_store_write_and_log_is_not_double_written(tmp_path, server, monkeypatch):
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    docs = [dict(doc, content_hash=f"h{i}") for i, doc in enumerate(DOCS)]
+    first = _runner(tmp_path, store)
+    first.prepare(docs)
+    first.submit()
+
+    def killed(custom_id):
+        raise SystemExit("process killed")
+    monkeypatch.setattr(first, "_log_persisted", killed)
+    with pytest.raises(SystemExit):
+        first.run([], poll_interval=0)
+    assert store.count() == 1  # written, but not in persisted.log
+
+    assert _runner(tmp_path, store).run([], poll_interval=0) == 2
+    assert sorted(r["file"] for r in store.all()) == ["china_ag.pdf", "nvda.pdf"]
+
+
+def test_cached_responses_skip_the_batch(tmp_path, server):
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    _runner(tmp_path, store).run(DOCS, poll_interval=0)
+    assert _runner(tmp_path, store).prepare(DOCS) == 0
+    assert store.count() == 4
+
+
+def test_response_format_is_strict_json_schema():
+    payload = response_format(ScoreResponse)
+    assert payload["type"] == "json_schema"
+    assert payload["json_schema"]["name"] == "ScoreResponse" and payload["json_schema"]["strict"]
+
+    def objects(node):
+        if isinstance(node, dict):
+            if node.get("type") == "object":
+                yield node
+            for value in node.values():
+                yield from objects(value)
+        elif isinstance(node, list):
+            for item in node:
+                yield from objects(item)
+
+    schema = payload["json_schema"]["schema"]
+    checked = list(objects(schema))
+    assert len(checked) == 1 + len(schema["$defs"])
+    for node in checked:
+        assert node["additionalProperties"] is False
+        assert node["required"] == list(node["properties"])  # optional fields included
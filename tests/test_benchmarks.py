@@ -0,0 +1,38 @@
+import json
+from benchmarks import suite
+
+
+def _run(results, **config):
+    return {"config": config, "results": results, "commit": None, "machine": "test"}
+
+
+def test_compare_is_direction_aware():
+    before = _run({"pipeline": {"docs_per_min": 100.0, "scored": 6}, "validator": {"warm_p50_ms": 10.0}})
+    after = _run({"pipeline": {"docs_per_min": 80.0, "scored": 7}, "validator": {"warm_p50_ms": 5.0}})
+    rows = {r["metric"]: r for r in suite.compare(after, before)}
+    assert rows["pipeline.docs_per_min"]["regression_pct"] == 20.0   # slower
+    assert rows["validator.warm_p50_ms"]["regression_pct"] == -50.0  # faster
+    assert "pipeline.scored" not in rows                              # counts are not tracked
+
+
+def test_previous_run_matches_config():
+    history = [_run({}, docs=6), _run({}, docs=24), _run({"x": 1}, docs=6)]
+    assert suite.previous_run(history, {"docs": 6}) is history[2]
+    assert suite.previous_run(history, {"docs": 3}) is None
+
+
+def test_quick_run_is_offline_and_saved(tmp_path, monkeypatch, capsys):
+    for var in ("OPENAI_API_KEY", "OPENAI_BASE_URL", "LLM_CACHE", "SEC_MAX_RPS"):
+        monkeypatch.setenv(var, "")  # restored after the test (the suite rewrites them)
+    history = tmp_path / "history.jsonl"
+
+    assert suite.main(["--quick", "--history", str(history)]) == 0
+    assert suite.main(["--quick", "--history", str(history)]) == 0
+
+    runs = [json.loads(line) for line in history.read_text().splitlines()]
+    assert len(runs) == 2
+    results = runs[-1]["results"]
+    assert results["pipeline"]["scored"] == 6 and results["pipeline"]["failed"] == 0
+    assert results["tickers"]["resolved_pct"] == 100
+    assert results["validator"]["checks_per_doc"] > 0
+    assert "vs " in capsys.readouterr().out  # second run compared with the first
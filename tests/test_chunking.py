@@ -0,0 +1,98 @@
+from src.evaluation.chunking import chunk_text, split_sections, TokenCounter
+from src.evaluation.llm_client import RetryPolicy
+from src.evaluation.scorer import EquityScorer, ScoreResponse, merge_scores
+from src.evaluation.macro_extractor import MacroReport, merge_reports
+from benchmarks.fakes import FakeOpenAIServer, SCORE_RESPONSE, MACRO_REPORT
+
+REPORT = "\n".join(
+    ["INVESTMENT THESIS"] + [f"Data center demand point {i}." for i in range(120)]
+    + ["VALUATION"] + [f"DCF assumption {i}." for i in range(120)]
+    + ["KEY RISKS"] + [f"Risk factor {i}." for i in range(120)]
+)
+
+
+def test_chunks_respect_budget_and_sections():
+    counter = TokenCounter()
+    chunks = chunk_text(REPORT, max_tokens=1200, counter=counter)
+    assert len(chunks) > 1
+    assert all(counter.count(c) <= 1200 for c in chunks)
+    assert "\n".join(chunks) == REPORT           # nothing dropped
+    assert chunks[1].startswith("VALUATION")     # split on a heading, not mid-section
+
+
+class OneTokenPerChar:
+    def count(self, text):
+        return len(text)
+
+
+def test_giant_dense_lines_still_fit_the_budget():
+    table = " ".join(f"{n}.{n % 7}" for n in range(2000))  # flattened numeric table, one line
+    chunks = chunk_text("HEADER\n" + table, max_tokens=500, counter=OneTokenPerChar())
+    assert all(len(c) <= 500 for c in chunks)
+    assert "".join(chunks).replace("\n", "") == ("HEADER\n" + table).replace("\n", "")
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("Buy NVDA.", max_tokens=1000) == ["Buy NVDA."]
+    assert len(split_sections(REPORT)) == 3
+
+
+def test_merge_scores_uses_covering_chunks_and_unions_flags():
+    other = ScoreResponse(**SCORE_RESPONSE).model_copy(deep=True)
+    other.risk_analysis.score = 1
+    other.risk_analysis.quote_verbatim = "N/A"  # this excerpt has no risk section
+    other.risk_analysis.red_flags = ["No downside case"]
+    risks = ScoreResponse(**SCORE_RESPONSE).model_copy(deep=True)
+    risks.risk_analysis.score = 5
+    risks.risk_analysis.red_flags = ["no downside case", "Customer concentration"]
+
+    merged = merge_scores([other, risks], weights=[1, 1])
+    assert merged.risk_analysis.score == 5
+    assert merged.risk_analysis.red_flags == ["No downside case", "Customer concentration"]
+
+    risks.thesis_logic.score, other.thesis_logic.score = 2, 4  # both quote evidence: weighted mean
+    assert merge_scores([other, risks], weights=[3, 1]).thesis_logic.score == 4
+    assert merge_scores([other, risks], weights=[1, 3]).thesis_logic.score == 3  # 2.5 rounds half up
+
+
+def test_chunked_and_whole_scores_stay_close():
+    whole = {"thesis_logic": 4, "catalyst_quality": 3, "risk_analysis": 2, "professional_standards": 4}
+    sections = [["thesis_logic", "professional_standards"], ["catalyst_quality"],
+                ["risk_analysis", "professional_standards"], ["thesis_logic"]]
+
+    def excerpt(covered):
+        # An excerpt scores what it covers like the whole report; elsewhere it guesses high, without evidence
+        response = ScoreResponse(**SCORE_RESPONSE).model_copy(deep=True)
+        for dim, score in whole.items():
+            getattr(response, dim).score = score if dim in covered else 5
+            getattr(response, dim).quote_verbatim = "Quoted evidence." if dim in covered else ""
+        return response
+
+    baseline = EquityScorer.finalize(excerpt(set(whole)))["overall_score"]
+    for n in (2, 4):
+        chunks = [sum(sections[i::n], []) for i in range(n)]
+        merged = merge_scores([excerpt(c) for c in chunks], weights=[1] * n)
+        assert abs(EquityScorer.finalize(merged)["overall_score"] - baseline) <= 0.2
+
+
+def test_merge_reports_ranks_ideas_by_citations():
+    a = MacroReport(**MACRO_REPORT)
+    b = MacroReport(**{**MACRO_REPORT, "top_5_ideas": [
+        {"name": "Fertilizer", "type": "Theme", "rationale": "x"},
+        {"name": "seed security", "type": "Theme", "rationale": "y"},
+    ]})
+    merged = merge_reports([a, b])
+    assert [i.name for i in merged.top_5_ideas] == ["Seed Security", "Fertilizer"]
+
+
+def test_chunked_scoring_fans_out_and_merges(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with FakeOpenAIServer(latency=0.05) as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        scorer = EquityScorer(chunk_tokens=1200)
+        scorer.retry = RetryPolicy(base_delay=0.01)
+        result = scorer.evaluate(REPORT, "long.pdf")
+
+    assert result["chunks_scored"] == len(server.requests) > 1
+    assert result["overall_score"] == 4.0
+    assert server.max_concurrent > 1
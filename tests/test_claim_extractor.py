@@ -0,0 +1,51 @@
+from src.evaluation.claim_extractor import ClaimExtractor
+
+
+def extract(text):
+    return ClaimExtractor().extract(text)
+
+
+def test_all_metrics_in_one_pass_with_offsets():
+    text = ("In FY2024 revenue of $60.9 billion, a 73.8% gross margin, FCF of $27bn and "
+            "diluted EPS of $11.93.")
+    claims = extract(text)
+    assert [c.metric for c in claims] == ["revenue", "gross_margin", "fcf", "eps"]
+    assert [c.value for c in claims] == [60.9e9, 73.8, 27e9, 11.93]
+    for claim in claims:
+        assert text[claim.start:claim.end] == claim.raw
+        assert claim.fiscal_year == 2024 and not claim.forward
+
+
+def test_units_and_number_formats():
+    claims = extract("Sales of $1,250 million. Revenue: $2.1T. Top-line reached $850m.")
+    assert [c.value for c in claims] == [1.25e9, 2.1e12, 850e6]
+
+
+def test_periods_quarters_and_estimates():
+    quarter, estimate, calendar = extract(
+        "Q3 FY25 revenue of $35.1B. "
+        "For FY2026E we model EPS of $4.10. "
+        "CY2025 sales of $190 billion.")
+    assert quarter.quarterly and quarter.period == "Q3 2025"
+    assert estimate.forward and estimate.period == "FY2026E"
+    assert calendar.period == "CY2025" and calendar.fiscal_year == 2025
+
+
+def test_guidance_is_forward_revenue():
+    (claim,) = extract("Management raised guidance for next quarter to $37.5 billion.")
+    assert claim.metric == "revenue" and claim.forward and claim.value == 37.5e9
+
+
+def test_no_false_claims():
+    assert extract("EPS grew 15% while revenue rose strongly; 2024 was a good year.") == []
+
+
+def test_revenue_after_a_growth_clause():
+    (claim,) = extract("FY2024 revenue grew 20% to $60.9bn.")
+    assert (claim.metric, claim.value, claim.period) == ("revenue", 60.9e9, "FY2024")
+    assert [c.value for c in extract("Data center sales rose 154% y/y to USD 26.3bn.")] == [26.3e9]
+
+
+def test_unit_volumes_are_not_revenue():
+    assert extract("Unit sales of 5 million iPhones in FY2024.") == []
+    assert extract("Sales were 12m units; top-line volume reached 3 billion impressions.") == []
@@ -0,0 +1,126 @@
+import argparse
+import multiprocessing
+import os
+import time
+import fitz
+from main import process_document, run_cluster_worker
+from src.ingestion.pdf_loader import PDFLoader
+from src.pipeline.cluster import Cluster
+from src.pipeline.engine import StageRunner
+from src.pipeline.job_queue import JobQueue
+from src.storage.file_index import ProcessedIndex, hash_file
+from src.storage.score_store import ScoreStore
+
+
+def _write_pdfs(raw_dir, count):
+    os.makedirs(raw_dir, exist_ok=True)
+    for n in range(count):
+        pdf = fitz.open()
+        pdf.new_page().insert_text((36, 36), f"NVIDIA (NVDA) note {n}")
+        pdf.save(os.path.join(raw_dir, f"note_{n}.pdf"))
+        pdf.close()
+
+
+class Engines:
+    def extract_ticker(self, text):
+        return "NVDA"
+
+    def validate(self, text, ticker):
+        return []
+
+    def evaluate(self, text, source):
+        return {"overall_score": 4.0, "worker_pid": os.getpid()}
+
+
+def _worker_node(root, entity_file):
+    args = argparse.Namespace(concurrency=2, ingest_workers=1, merge_interval=0.05, exit_when_idle=True)
+    engines, stages = Engines(), StageRunner(max_workers=0)
+
+    def process_fn(doc, job=None):
+        return process_document(doc, engines, engines, engines, None, stages=stages, job=job)
+
+    run_cluster_worker(args, Cluster(root), PDFLoader(entity_file=entity_file), process_fn, stages)
+
+
+def test_staging_is_sharded_by_content_hash(tmp_path):
+    raw = str(tmp_path / "raw")
+    _write_pdfs(raw, 6)
+    cluster = Cluster(str(tmp_path / "cluster"), shards=4)
+    for name in sorted(os.listdir(raw)):
+        sha = hash_file(os.path.join(raw, name))
+        assert cluster.stage(os.path.join(raw, name), sha)
+        assert cluster.queue(int(sha[:8], 16) % 4).get(sha)["source"] == name
+        assert os.path.exists(os.path.join(cluster.root, "docs", sha, name))
+    assert not cluster.stage(os.path.join(raw, "note_0.pdf"), hash_file(os.path.join(raw, "note_0.pdf")))
+    assert cluster.counts()["queued"] == 6
+    assert Cluster(cluster.root, shards=99).shards == 4  # fixed at creation
+
+
+def test_shard_leases_expire_and_move(tmp_path):
+    root = str(tmp_path / "cluster")
+    Cluster(root, shards=1).queue(0).enqueue("ab" * 32, "a.pdf")
+    node_a, node_b = Cluster(root, lease_s=0.1), Cluster(root, lease_s=0.1)
+    assert node_a.claim_shard("a") == 0
+    assert node_b.claim_shard("b") is None  # held by a
+    time.sleep(0.15)  # a stops renewing (e.g. its host went down)
+    assert node_b.claim_shard("b") == 0
+    assert not node_a.renew_shard(0, "a")
+
+
+def test_job_of_a_lost_node_is_taken_over(tmp_path):
+    root = str(tmp_path / "cluster")
+    Cluster(root, shards=1).queue(0).enqueue("cd" * 32, "a.pdf")
+    lost = JobQueue(os.path.join(root, "shards", "00.db"), lease_s=0.05, owner="other-host:123:x",
+                    journal_mode="DELETE")
+    lost.claim().save("scored", {"overall_score": 3.0})
+    time.sleep(0.1)
+    job = Cluster(root).queue(0).claim()
+    assert job is not None and job.checkpoint("scored") == {"overall_score": 3.0}
+
+
+def test_workers_score_every_document_once_and_coordinator_merges(tmp_path):
+    raw, root = str(tmp_path / "raw"), str(tmp_path / "cluster")
+    _write_pdfs(raw, 12)
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    index = ProcessedIndex(str(tmp_path / "index.db"))
+    coordinator = Cluster(root, shards=4)
+    loader = PDFLoader(raw_dir=raw, entity_file=str(tmp_path / "none.json"))
+    assert sum(coordinator.stage(os.path.join(raw, f), sha) for f, sha in loader.pending_files(index)) == 12
+
+    ctx = multiprocessing.get_context("fork")
+    nodes = [ctx.Process(target=_worker_node, args=(root, str(tmp_path / "none.json"))) for _ in range(2)]
+    for node in nodes:
+        node.start()
+    for node in nodes:
+        node.join(timeout=60)
+    assert all(node.exitcode == 0 for node in nodes)
+
+    assert coordinator.merge(store, index) == 12
+    records = store.all()
+    assert sorted(r["file"] for r in records) == [f"note_{n}.pdf" for n in sorted(range(12), key=str)]
+    assert len({r["content_hash"] for r in records}) == 12
+    assert coordinator.open_jobs() == 0 and coordinator.outbox_size() == 0
+    assert os.listdir(os.path.join(root, "docs")) == []  # staged copies are cleaned up after the merge
+    assert len(os.listdir(os.path.join(root, "metrics"))) == 2
+    assert list(loader.pending_files(index)) == []
+
+
+def test_staged_copies_of_failed_jobs_are_removed(tmp_path):
+    raw, root = str(tmp_path / "raw"), str(tmp_path / "cluster")
+    _write_pdfs(raw, 1)
+    path = os.path.join(raw, "note_0.pdf")
+    sha = hash_file(path)
+    cluster = Cluster(root, shards=1)
+    cluster.stage(path, sha)
+    worker = JobQueue(os.path.join(root, "shards", "00.db"), max_attempts=1, journal_mode="DELETE")
+    worker.release(worker.claim(), "could not load PDF")  # parked as failed
+
+    store, index = ScoreStore(str(tmp_path / "scores.db")), ProcessedIndex(str(tmp_path / "index.db"))
+    assert cluster.merge(store, index) == 0
+    assert os.listdir(os.path.join(root, "docs")) == []
+    assert not cluster.stage(path, sha)  # stays failed, nothing copied again
+    assert os.listdir(os.path.join(root, "docs")) == []
+
+    assert cluster.stage(path, sha, retry_failed=True)
+    assert os.path.exists(os.path.join(root, "docs", sha, "note_0.pdf"))
+    assert cluster.queue(0).get(sha)["state"] == "queued"
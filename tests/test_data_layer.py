@@ -0,0 +1,62 @@
+import datetime
+import json
+import pytest
+from src.storage.score_store import ScoreStore
+from src.ui.data_layer import DashboardData, Filters
+
+
+def _record(file, ticker="NVDA", type="single_stock", day=1):
+    return {"file": file, "ticker": ticker, "type": type, "timestamp": f"2025-01-{day:02d}T09:00:00",
+            "overall_score": 4.0, "fact_checks": [{"metric": "Revenue (FY2024)"}]}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    db = str(tmp_path / "scores.db")
+    ScoreStore(db).append_many(
+        [_record(f"nvda_{d}.pdf", day=d) for d in range(1, 8)]
+        + [_record("macro.pdf", ticker="MACRO", type="macro_deep_dive", day=3)]
+    )
+    return db, str(tmp_path / "scores.json")
+
+
+def test_pages_are_filtered_in_sql_and_clamped(paths):
+    data = DashboardData(*paths)
+    page = data.page(Filters(ticker="NVDA"), page=2, page_size=3)
+    assert page.total == 7 and page.pages == 3
+    assert [r["file"] for r in page.rows] == ["nvda_4.pdf", "nvda_3.pdf", "nvda_2.pdf"]
+    assert "fact_checks" not in page.rows[0]  # summary columns only
+
+    assert data.page(Filters(ticker="NVDA"), page=99, page_size=3).page == 3
+    assert data.page(Filters(type="macro_deep_dive")).total == 1
+
+    window = Filters(start=datetime.date(2025, 1, 2), end=datetime.date(2025, 1, 3))
+    assert sorted(r["file"] for r in data.page(window).rows) == ["macro.pdf", "nvda_2.pdf", "nvda_3.pdf"]
+
+
+def test_detail_on_demand_and_options(paths):
+    data = DashboardData(*paths)
+    summary = data.page(Filters(type="macro_deep_dive")).rows[0]
+    assert data.detail(summary["id"])["file"] == "macro.pdf"
+    options = data.options()
+    assert options["tickers"] == ["MACRO", "NVDA"] and options["total"] == 8
+    assert options["first_date"] == datetime.date(2025, 1, 1)
+
+
+def test_memo_invalidated_by_a_writer(paths):
+    data = DashboardData(*paths)
+    data.page()
+    data.page()
+    assert data.stats()["hits"] == 1
+
+    ScoreStore(paths[0]).append(_record("nvda_9.pdf", day=9))  # e.g. main.py in another process
+    page = data.page()
+    assert page.total == 9 and page.rows[0]["file"] == "nvda_9.pdf"
+
+
+def test_legacy_file_is_imported_and_invalidates(tmp_path):
+    db, legacy = str(tmp_path / "scores.db"), tmp_path / "scores.json"
+    data = DashboardData(db, str(legacy))
+    assert data.page().total == 0
+    legacy.write_text(json.dumps([_record("old.pdf")]))
+    assert data.page().total == 1
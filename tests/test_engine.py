@@ -0,0 +1,121 @@
+import time
+import pytest
+from src.pipeline.engine import ConcurrentRunner, StageRunner
+from src.evaluation.llm_client import RetryPolicy
+from src.evaluation.scorer import EquityScorer
+from benchmarks.fakes import FakeOpenAIServer
+
+
+@pytest.fixture
+def fast_retry(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return RetryPolicy(max_attempts=4, base_delay=0.01, max_delay=0.05)
+
+
+def test_results_keep_input_order():
+    """Later items finish first, but output order must match input order."""
+    def work(x):
+        time.sleep(0.05 * (5 - x))
+        return x * 10
+
+    runner = ConcurrentRunner(work, max_in_flight=5)
+    out = list(runner.run(range(5)))
+    assert out == [(i, i * 10) for i in range(5)]
+    assert runner.stats.completed == 5
+
+
+def test_in_flight_is_bounded():
+    active, peak = [0], [0]
+
+    def work(x):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        active[0] -= 1
+        return x
+
+    list(ConcurrentRunner(work, max_in_flight=3).run(range(12)))
+    assert peak[0] <= 3
+
+
+def test_failed_item_yields_none():
+    def work(x):
+        if x == 1:
+            raise ValueError("boom")
+        return x
+
+    runner = ConcurrentRunner(work, max_in_flight=2)
+    assert [r for _, r in runner.run(range(3))] == [0, None, 2]
+    assert runner.stats.failed == 1
+
+
+def test_stages_overlap():
+    """Independent stages run side by side: wall time is the slowest stage, not the sum."""
+    stages = StageRunner()
+    start = time.perf_counter()
+    results = stages.run(fetch=lambda: time.sleep(0.2) or "facts", score=lambda: time.sleep(0.2) or 4.0)
+    assert time.perf_counter() - start < 0.35
+    assert results["fetch"].value == "facts" and results["score"].value == 4.0
+    stages.shutdown()
+
+
+def test_stage_timeout_and_error_are_isolated():
+    stages = StageRunner(timeouts={"fetch": 0.05})
+    start = time.perf_counter()
+    results = stages.run(fetch=lambda: time.sleep(1), score=lambda: 4.0, broken=lambda: 1 / 0)
+    assert time.perf_counter() - start < 0.5
+    assert not results["fetch"].ok and results["fetch"].error.startswith("timeout")
+    assert results["score"].ok and results["score"].value == 4.0
+    assert results["broken"].error == "division by zero"
+    assert stages.timed_out == {"fetch": 1}
+    stages.shutdown()
+
+
+def test_slow_fact_checks_do_not_block_the_score():
+    from main import process_document
+
+    class SlowValidator:
+        def validate(self, text, ticker):
+            time.sleep(1)
+            return [{"metric": "Revenue (FY2024)"}]
+
+    class Scorer:
+        def evaluate(self, text, source):
+            time.sleep(0.05)
+            return {"overall_score": 4.0, "dimension_scores": {}, "overall_rationale": ""}
+
+    class Lookup:
+        def extract_ticker(self, text):
+            return "NVDA"
+
+    doc = {"content": "NVDA", "source": "nvda.pdf", "path": "nvda.pdf"}
+    stages = StageRunner(timeouts={"fact_checks": 0.1})
+    start = time.perf_counter()
+    record = process_document(doc, Scorer(), SlowValidator(), Lookup(), None, stages=stages)
+    assert time.perf_counter() - start < 0.5
+    assert record["overall_score"] == 4.0 and record["fact_checks"] == []
+    stages.shutdown()
+
+
+def test_scorer_retries_429_against_local_endpoint(monkeypatch, fast_retry):
+    with FakeOpenAIServer(fail_first=2, fail_status=429) as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        scorer = EquityScorer()
+        scorer.retry = fast_retry
+        result = scorer.evaluate("NVIDIA (NVDA) Buy. Revenue of $60 billion.", "nvda.pdf")
+
+    assert len(server.requests) == 3
+    assert result["overall_score"] == 4.0
+
+
+def test_concurrent_scoring_against_local_endpoint(monkeypatch, fast_retry):
+    with FakeOpenAIServer(latency=0.1) as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        scorer = EquityScorer()
+        scorer.retry = fast_retry
+        runner = ConcurrentRunner(lambda doc: scorer.evaluate(doc, "x.pdf"), max_in_flight=4)
+        results = list(runner.run([f"note {i}" for i in range(8)]))
+
+    assert all(r["verdict"] == "STRONG" for _, r in results)
+    assert 1 < server.max_concurrent <= 4
+    assert runner.stats.docs_per_minute > 0
@@ -0,0 +1,41 @@
+from src.data.fact_store import FactStore
+from benchmarks.fakes import company_facts
+
+CIK = "0001045810"
+
+
+def _payload():
+    payload = company_facts(1045810, "NVIDIA CORP", {2023: 26_974_000_000, 2024: 60_922_000_000})
+    usd = payload["facts"]["us-gaap"]["Revenues"]["units"]["USD"]
+    # The FY2023 figure restated in the FY2024 10-K, plus a quarterly fact
+    usd.append({**usd[0], "val": 27_000_000_000, "filed": "2024-03-01", "accn": "0001045810-24-000001"})
+    usd.append({"start": "2024-02-01", "end": "2024-04-28", "val": 26_044_000_000, "fy": 2025,
+                "fp": "Q1", "form": "10-Q", "filed": "2024-05-29", "accn": "q1"})
+    payload["facts"]["us-gaap"]["RevenueFromContractWithCustomerExcludingAssessedTax"] = {"units": {"USD": []}}
+    payload["facts"]["dei"] = {"EntityCommonStockSharesOutstanding": {"units": {"shares": [
+        {"end": "2024-05-17", "val": 2_460_000_000, "form": "10-Q", "accn": "q1"}]}}}
+    return payload
+
+
+def test_ingest_and_index_queries(tmp_path):
+    store = FactStore(str(tmp_path / "facts.db"))
+    assert store.ingest(CIK, _payload(), etag='"abc"') == 5
+    assert store.filer(CIK)["name"] == "NVIDIA CORP" and store.filer(CIK)["etag"] == '"abc"'
+
+    latest = store.latest(CIK, ["RevenueFromContractWithCustomerExcludingAssessedTax", "Revenues"])
+    assert (latest.val, latest.fy, latest.period_end) == (60_922_000_000, 2024, "2024-01-31")
+    assert store.latest(CIK, ["Revenues"], form="10-Q").fp == "Q1"
+    assert store.latest(CIK, ["EntityCommonStockSharesOutstanding"], form=None, unit="shares").val == 2_460_000_000
+
+    annual = store.series(CIK, "Revenues")
+    assert [(f.period_end, f.val) for f in annual] == [("2023-01-31", 27_000_000_000), ("2024-01-31", 60_922_000_000)]
+    assert [f.form for f in store.series(CIK, "Revenues", form=None, start="2024-02-01")] == ["10-Q"]
+
+
+def test_reingest_replaces_filer(tmp_path):
+    store = FactStore(str(tmp_path / "facts.db"))
+    store.ingest(CIK, _payload())
+    store.ingest(CIK, company_facts(1045810, "NVIDIA CORP", {2025: 130_497_000_000}))
+    assert store.count(CIK) == 1
+    assert store.latest(CIK, ["Revenues"]).fy == 2025
+    assert store.filer("0000000001") is None
@@ -0,0 +1,63 @@
+import os
+import pytest
+import src.storage.file_index as file_index
+from src.storage.file_index import ProcessedIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ProcessedIndex(str(tmp_path / "index.db"))
+
+
+def test_renamed_file_is_still_recognised(tmp_path, index):
+    original = tmp_path / "note.pdf"
+    original.write_bytes(b"%PDF report v1")
+    index.mark_processed([(index.check(str(original)).sha256, "note.pdf")])
+
+    renamed = tmp_path / "note_renamed.pdf"
+    original.rename(renamed)
+    assert index.check(str(renamed)).processed
+
+
+def test_reissued_file_with_same_name_is_rescored(tmp_path, index):
+    path = tmp_path / "note.pdf"
+    path.write_bytes(b"%PDF report v1")
+    index.mark_processed([(index.check(str(path)).sha256, "note.pdf")])
+
+    path.write_bytes(b"%PDF report v2 (re-issued)")
+    os.utime(path, ns=(0, 10**18))  # make sure the stat pre-check sees a change
+    assert not index.check(str(path)).processed
+
+
+def test_unchanged_file_is_not_rehashed(tmp_path, index, monkeypatch):
+    path = tmp_path / "note.pdf"
+    path.write_bytes(b"%PDF report")
+    index.check(str(path))
+
+    calls = []
+    monkeypatch.setattr(file_index, "hash_file", lambda p: calls.append(p))
+    index.check(str(path))
+    assert calls == []
+
+
+def test_index_persists_across_instances(tmp_path, index):
+    path = tmp_path / "note.pdf"
+    path.write_bytes(b"%PDF report")
+    index.mark_processed([(index.check(str(path)).sha256, "note.pdf")])
+    index.close()
+
+    assert ProcessedIndex(str(tmp_path / "index.db")).check(str(path)).processed
+
+
+def test_loader_skips_processed_files_before_opening(tmp_path, index, monkeypatch):
+    from src.ingestion.pdf_loader import PDFLoader
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "done.pdf").write_bytes(b"%PDF already scored")
+    index.mark_processed([(index.check(str(raw / "done.pdf")).sha256, "done.pdf")])
+
+    loader = PDFLoader(raw_dir=str(raw), entity_file="missing.json")
+    opened = []
+    monkeypatch.setattr(loader, "_extract_text", lambda p: opened.append(p) or "")
+    assert loader.load_documents(index=index) == []
+    assert opened == []
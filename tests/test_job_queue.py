@@ -0,0 +1,163 @@
+import multiprocessing
+import socket
+import subprocess
+import sys
+import time
+import pytest
+from main import persist_job, process_document, run_job
+from src.evaluation.llm_client import RetryPolicy
+from src.evaluation.macro_extractor import MacroExtractor
+from src.pipeline.engine import StageRunner
+from src.pipeline.job_queue import JobQueue, LeaseLost
+from src.storage.file_index import ProcessedIndex
+from src.storage.score_store import ScoreStore
+from benchmarks.fakes import FakeOpenAIServer
+
+
+class Counting:
+    """Stand-in scorer / validator / lookup / loader that counts calls."""
+
+    def __init__(self):
+        self.calls = {"validate": 0, "evaluate": 0, "load": 0}
+        self.raw_dir = "unused"
+
+    def extract_ticker(self, text):
+        return "NVDA"
+
+    def validate(self, text, ticker):
+        self.calls["validate"] += 1
+        return [{"metric": "Revenue (FY2024)", "status": "MATCH"}]
+
+    def evaluate(self, text, source):
+        self.calls["evaluate"] += 1
+        return {"overall_score": 4.0}
+
+    def load_file(self, filename, content_hash=None, pool=None):
+        self.calls["load"] += 1
+        return {"source": filename, "content": "NVDA note", "content_hash": content_hash}
+
+
+def _process(fakes):
+    def process_fn(doc, job=None):
+        return process_document(doc, fakes, fakes, fakes, None, stages=StageRunner(max_workers=0), job=job)
+    return process_fn
+
+
+def _dead_owner() -> str:
+    proc = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    return f"{socket.gethostname()}:{proc.stdout.strip()}:crashed"
+
+
+def test_lifecycle_and_dedupe(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    assert queue.enqueue("h1", "a.pdf") and queue.enqueue("h2", "b.pdf")
+    assert not queue.enqueue("h1", "copy_of_a.pdf")  # same content
+
+    job = queue.claim()
+    assert (job.source, job.state, job.attempts) == ("a.pdf", "queued", 1)
+    job.save("ingested", {"content": "x"})
+    job.save("scored", {"overall_score": 4.0})
+    job.save("validated", [])  # finished after the score: state does not move back
+    assert queue.get("h1")["state"] == "scored"
+
+    queue.complete(job, record_id=7)
+    assert queue.get("h1")["record_id"] == 7
+    assert [j.source for j in queue.drain()] == ["b.pdf"]
+    assert queue.claim() is None  # b.pdf is leased to us
+    assert queue.counts()["persisted"] == 1
+
+
+def test_crashed_run_resumes_from_checkpoints(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    store, index = ScoreStore(str(tmp_path / "scores.db")), ProcessedIndex(str(tmp_path / "index.db"))
+    first = Counting()
+
+    crashed = JobQueue(db, owner=_dead_owner())  # the run that died after scoring
+    crashed.enqueue("h1", "nvda.pdf")
+    doc, record = run_job(crashed.claim(), first, _process(first))
+    assert record["overall_score"] == 4.0 and first.calls == {"validate": 1, "evaluate": 1, "load": 1}
+
+    rerun, second = JobQueue(db), Counting()
+    job = rerun.claim()  # the dead owner's lease is released at once
+    assert job.state == "scored" and job.attempts == 2
+    doc, record = run_job(job, second, _process(second))
+    assert second.calls == {"validate": 0, "evaluate": 0, "load": 0}  # nothing re-extracted or re-billed
+    assert record["fact_checks"] == [{"metric": "Revenue (FY2024)", "status": "MATCH"}]
+
+    store.append(record)  # the crash came after the write but before the job was closed
+    persist_job(job, record, store, index)
+    assert store.count() == 1 and index.get_source("h1") == "nvda.pdf"
+    assert rerun.get("h1")["state"] == "persisted"
+
+
+def test_failed_macro_extraction_is_retried_not_stored(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    queue = JobQueue(str(tmp_path / "jobs.db"), retry_delay_s=0)
+    queue.enqueue("h1", "china_ag.pdf")
+    macro_note = Counting()
+    macro_note.extract_ticker = lambda text: None
+
+    with FakeOpenAIServer(fail_first=1, fail_status=400) as server:  # not retried inside the call
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        macro = MacroExtractor()
+        macro.retry = RetryPolicy(base_delay=0.01)
+
+        def process_fn(doc, job=None):
+            return process_document(doc, None, None, macro_note, macro, job=job)
+
+        job = queue.claim()
+        assert run_job(job, macro_note, process_fn)[1] is None
+        assert queue.get("h1")["error"] == "no result" and "scored" not in job.checkpoints
+
+        job = queue.claim()
+        doc, record = run_job(job, macro_note, process_fn)
+    assert job.attempts == 2 and record["topic"] == "China Agriculture"
+    assert len(server.requests) == 2
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    slow, fast = JobQueue(db, lease_s=0.05), JobQueue(db)
+    slow.enqueue("h1", "a.pdf")
+    stale = slow.claim()
+    time.sleep(0.1)
+    assert fast.claim().id == stale.id
+    with pytest.raises(LeaseLost):
+        stale.save("scored", {"overall_score": 1.0})
+
+
+def test_failures_are_retried_then_parked(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), max_attempts=2, retry_delay_s=0)
+    queue.enqueue("h1", "broken.pdf")
+    for _ in range(2):
+        queue.release(queue.claim(), "could not load PDF")
+    assert queue.claim() is None
+    assert queue.get("h1")["state"] == "failed" and queue.get("h1")["error"] == "could not load PDF"
+    assert queue.retry_failed() == 1 and queue.claim().attempts == 1
+
+
+def _drain_worker(db, results):
+    queue = JobQueue(db)
+    for job in queue.drain():
+        time.sleep(0.002)
+        queue.complete(job)
+        results.put(job.content_hash)
+
+
+def test_worker_processes_share_the_queue(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    queue = JobQueue(db)
+    for n in range(60):
+        queue.enqueue(f"h{n}", f"{n}.pdf")
+
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_drain_worker, args=(db, results)) for _ in range(4)]
+    for w in workers:
+        w.start()
+    claimed = [results.get(timeout=30) for _ in range(60)]
+    for w in workers:
+        w.join(timeout=30)
+
+    assert sorted(claimed) == sorted(f"h{n}" for n in range(60))  # each job exactly once
+    assert queue.counts()["persisted"] == 60
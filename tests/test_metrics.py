@@ -0,0 +1,67 @@
+import json
+import time
+import pytest
+from src.evaluation.llm_client import RetryPolicy
+from src.evaluation.scorer import EquityScorer
+from src.pipeline.metrics import Metrics, get_metrics, profile
+from benchmarks.fakes import FakeOpenAIServer
+
+
+def test_stage_records_wall_cpu_bytes_and_errors():
+    metrics = Metrics()
+    with metrics.stage("pdf_clean", 100) as span:
+        sum(range(200_000))
+        span.add_bytes(50)
+    with pytest.raises(ValueError):
+        with metrics.stage("pdf_clean"):
+            raise ValueError("bad page")
+    with metrics.stage("sec_fetch"):
+        time.sleep(0.05)
+
+    stages = metrics.snapshot()["stages"]
+    assert list(stages) == ["pdf_clean", "sec_fetch"]  # pipeline order
+    assert stages["pdf_clean"]["calls"] == 2 and stages["pdf_clean"]["errors"] == 1
+    assert stages["pdf_clean"]["bytes"] == 150 and stages["pdf_clean"]["cpu_s"] > 0
+    assert stages["sec_fetch"]["wall_s"] >= 0.05 and stages["sec_fetch"]["cpu_s"] < 0.05
+
+
+def test_merge_and_exports(tmp_path):
+    worker = Metrics()
+    worker.record("pdf_extract", 0.5, 0.4, 1000)
+    worker.incr("llm_cache_hits", 2)
+    metrics = Metrics()
+    metrics.record("pdf_extract", 0.25, 0.2, 500)
+    metrics.merge(worker.snapshot())
+
+    report = metrics.write_json(str(tmp_path / "run.json"), mode="live")
+    assert json.loads((tmp_path / "run.json").read_text()) == report
+    assert report["stages"]["pdf_extract"]["calls"] == 2
+    assert report["stages"]["pdf_extract"]["max_wall_s"] == 0.5
+    assert report["counters"] == {"llm_cache_hits": 2}
+
+    prom = metrics.to_prometheus()
+    assert 'equity_scorer_stage_wall_seconds_total{stage="pdf_extract"} 0.75' in prom
+    assert "equity_scorer_llm_cache_hits_total 2" in prom
+
+
+def test_llm_calls_tokens_and_cache_hits_are_counted(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with FakeOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        scorer = EquityScorer()
+        scorer.retry = RetryPolicy(base_delay=0.01)
+        scorer.evaluate("NVIDIA (NVDA) Buy.", "a.pdf")
+        scorer.evaluate("NVIDIA (NVDA) Buy.", "a.pdf")
+
+    snap = get_metrics().snapshot()
+    assert snap["stages"]["llm_call"]["calls"] == 1
+    assert snap["counters"]["llm_prompt_tokens"] == 100
+    assert snap["counters"]["llm_completion_tokens"] == 50
+    assert snap["counters"]["llm_cache_hits"] == 1
+
+
+def test_cprofile_hook_writes_stats(tmp_path):
+    with profile("one_doc", out_dir=str(tmp_path)) as out:
+        sorted(range(10_000), key=lambda x: -x)
+    assert out["path"].endswith("one_doc.prof")
+    assert (tmp_path / "one_doc.prof").stat().st_size > 0
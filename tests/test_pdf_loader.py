@@ -0,0 +1,69 @@
+import fitz
+import pytest
+from src.ingestion.pdf_loader import PDFLoader
+
+
+def _write_pdf(path, lines):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "\n".join(lines))
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    _write_pdf(tmp_path / "b_note.pdf", ["NVIDIA (NVDA) Buy", "Page 1 of 3", "Revenue of $60 billion"])
+    _write_pdf(tmp_path / "a_newsletter.pdf", ["Macro weekly", "View in browser", "Rates are falling"])
+    (tmp_path / "c_broken.pdf").write_bytes(b"not a pdf")
+    return tmp_path
+
+
+def test_process_pool_matches_serial(raw_dir):
+    loader = PDFLoader(raw_dir=str(raw_dir), entity_file="missing.json")
+    serial = loader.load_documents(workers=1)
+    pooled = loader.load_documents(workers=2)
+
+    assert pooled == serial
+    assert [d["source"] for d in pooled] == ["a_newsletter.pdf", "b_note.pdf"]
+    assert set(pooled[0]) == {"source", "content", "type", "boilerplate_removed_pct"}
+
+
+def test_worker_stage_metrics_reach_the_parent(raw_dir):
+    from src.pipeline.metrics import get_metrics
+    PDFLoader(raw_dir=str(raw_dir), entity_file="missing.json").load_documents(workers=2)
+    stages = get_metrics().snapshot()["stages"]
+    assert [stages[s]["calls"] for s in ("pdf_extract", "pdf_clean", "redact")] == [2, 2, 2]
+    assert stages["pdf_extract"]["bytes"] > 0
+
+
+def test_cleaning_runs_in_workers(raw_dir):
+    docs = PDFLoader(raw_dir=str(raw_dir), entity_file="missing.json").load_documents(workers=0)
+    note = next(d for d in docs if d["source"] == "b_note.pdf")
+    assert "Page 1 of 3" not in note["content"]
+    assert "Revenue of $60 billion" in note["content"]
+
+
+def test_iter_documents_is_lazy(raw_dir, monkeypatch):
+    loader = PDFLoader(raw_dir=str(raw_dir), entity_file="missing.json")
+    calls = []
+    real_load = loader._load_file
+    monkeypatch.setattr(loader, "_load_file", lambda f: calls.append(f) or real_load(f))
+
+    stream = loader.iter_documents()
+    first = next(stream)
+    assert first["source"] == "a_newsletter.pdf"
+    assert calls == ["a_newsletter.pdf"]
+
+
+def test_remove_legal_bloat_stop_and_noise():
+    loader = PDFLoader(entity_file="missing.json")
+    long_line = "We flag regulatory disclosures risk in the body of the note, " + "x" * 60
+    text = "\n".join([
+        "  NVIDIA (NVDA) Buy  ", "", "PAGE 2 OF 9", "subject: weekly wrap",
+        long_line,                       # marker inside a long body line - kept
+        "Margins expand",
+        "IMPORTANT DISCLOSURES",         # stop marker (any case) - everything after dropped
+        "Revenue of $60 billion",
+    ])
+    assert loader._remove_legal_bloat(text) == "\n".join(["NVIDIA (NVDA) Buy", long_line, "Margins expand"])
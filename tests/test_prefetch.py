@@ -0,0 +1,54 @@
+import pytest
+from src.data import prefetch
+from src.data.http import TokenBucket
+from src.data.prefetch import prefetch_sec, tickers_from_documents
+from src.data.sec_edgar import SECEdgarClient
+from src.data.ticker_index import get_shared_index
+from benchmarks.fakes import FakeSECServer, company_facts
+
+
+@pytest.fixture
+def sec(monkeypatch):
+    facts = {
+        "0001045810": company_facts(1045810, "NVIDIA CORP", {2024: 60_922_000_000}),
+        "0001652044": company_facts(1652044, "Alphabet Inc.", {2023: 307_394_000_000}),
+        "0001730168": company_facts(1730168, "Broadcom Inc.", {2023: 35_819_000_000}),
+    }
+    with FakeSECServer(facts=facts) as server:
+        get_shared_index().url = server.tickers_url
+        monkeypatch.setattr(SECEdgarClient, "BASE_URL", server.facts_url)
+        client = SECEdgarClient()
+        client.http.limiter = TokenBucket(rate=200, burst=10)
+        client.server = server
+        yield client
+
+
+def test_prefetch_warms_every_filer_once(sec):
+    seen = []
+    report = prefetch_sec(["nvda", "GOOG", "GOOGL", "AVGO", "ZZZZ", "NVDA"], client=sec, workers=4,
+                          progress=lambda done, total, label, status: seen.append((label, status)))
+
+    assert (report.tickers, report.companies, report.unresolved) == (5, 3, ["ZZZZ"])
+    assert report.statuses == {"downloaded": 3}
+    assert sorted(label for label, _ in seen) == ["AVGO", "GOOG/GOOGL", "NVDA"]
+    assert report.requests == 3 and report.bytes > 0 and report.hit_rate == 0.0
+
+    again = prefetch_sec(["NVDA", "GOOG", "AVGO"], client=sec, progress=lambda *a: None)
+    assert again.statuses == {"fresh": 3} and again.hit_rate == 1.0 and again.requests == 0
+
+
+def test_validation_after_prefetch_is_offline(sec):
+    prefetch_sec(["NVDA"], client=sec, progress=lambda *a: None)
+    requests_before = len(sec.server.requests)
+    assert SECEdgarClient().get_latest_revenue("NVDA") == (60_922_000_000.0, 2024, "10-K")
+    assert len(sec.server.requests) == requests_before
+
+
+def test_cli_reads_ticker_file_and_ticker_pass(sec, tmp_path):
+    universe = tmp_path / "universe.txt"
+    universe.write_text("NVDA, AVGO  # semis\nGOOGL\n")
+    report = prefetch.main(["--file", str(universe), "--workers", "2"])
+    assert report.companies == 3 and report.failed == 0
+
+    docs = [{"content": "NVIDIA (NVDA) Buy"}, {"content": "Macro weekly"}, {"content": "Ticker: NVDA"}]
+    assert tickers_from_documents(docs, sec.lookup) == {"NVDA": 2}
@@ -0,0 +1,47 @@
+import re
+from src.ingestion import redactor as redactor_module
+from src.ingestion.redactor import EntityRedactor, build_trie_pattern
+
+
+def _legacy(entities, text):
+    for entity in entities:
+        text = re.compile(re.escape(entity), re.IGNORECASE).sub("[REDACTED_ENTITY]", text)
+    return text
+
+
+def test_trie_pattern_shares_prefixes():
+    assert build_trie_pattern(["gs", "goldman", "goldman sachs"]) == r"g(?:oldman(?:\ sachs)?|s)"
+
+
+def test_matches_legacy_case_insensitive(tmp_path):
+    entities = ["Jane Analyst", "Acme Securities", "ACME Research", "O'Brien (PhD)"]
+    text = "By JANE ANALYST, acme securities.\nacme research and o'brien (phd) agree; Acme Bank does not."
+    assert EntityRedactor(entities, cache_dir=str(tmp_path)).redact(text) == _legacy(entities, text)
+
+
+def test_longest_entity_wins_and_blanks_ignored(tmp_path):
+    red = EntityRedactor(["Goldman", "Goldman Sachs", "", "  "], cache_dir=str(tmp_path))
+    assert len(red) == 2
+    assert red.redact("goldman sachs and Goldman") == "[REDACTED_ENTITY] and [REDACTED_ENTITY]"
+
+
+def test_length_changing_lowercase_falls_back(tmp_path):
+    red = EntityRedactor(["Acme"], cache_dir=str(tmp_path))
+    assert red.redact("İstanbul desk of ACME") == "İstanbul desk of [REDACTED_ENTITY]"
+
+
+def test_pattern_cached_on_disk_by_list_hash(tmp_path, monkeypatch):
+    entities = ["Jane Analyst", "Acme Securities"]
+    first = EntityRedactor(entities, cache_dir=str(tmp_path))
+    first.redact("x")
+    assert [p.name for p in tmp_path.iterdir()] == [f"{first.digest}.pattern"]
+
+    def no_build(_):
+        raise AssertionError("pattern should come from the disk cache")
+    monkeypatch.setattr(redactor_module, "build_trie_pattern", no_build)
+    monkeypatch.setattr(redactor_module, "_compiled", {})
+    again = EntityRedactor(list(reversed(entities)), cache_dir=str(tmp_path))  # same list, other order
+    assert again.digest == first.digest
+    assert again.redact("jane analyst") == "[REDACTED_ENTITY]"
+
+    assert EntityRedactor(entities + ["New Bank"], cache_dir=str(tmp_path)).digest != first.digest
@@ -0,0 +1,56 @@
+import pytest
+from src.evaluation.response_cache import ResponseCache, CacheKey
+from src.evaluation.llm_client import RetryPolicy
+from src.evaluation.scorer import EquityScorer, ScoreResponse
+from benchmarks.fakes import FakeOpenAIServer, SCORE_RESPONSE
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "cache.db"))
+
+
+def _key(text="note", version="1.0"):
+    return CacheKey.build(text, "equity_scorer_system", version, "gpt-4o", ScoreResponse)
+
+
+def test_hit_after_miss(cache):
+    calls = []
+    fn = lambda: calls.append(1) or ScoreResponse(**SCORE_RESPONSE)
+
+    first = cache.get_or_call(_key(), ScoreResponse, fn)
+    second = cache.get_or_call(_key(), ScoreResponse, fn)
+    assert first == second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_prompt_version_bump_is_a_miss(cache):
+    cache.put(_key(version="1.0"), "{}")
+    assert cache.get(_key(version="1.1")) is None
+    assert cache.invalidate_prompt("equity_scorer_system", "1.1") == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_bytes=250)
+    cache.put(_key("a"), "x" * 100)
+    cache.put(_key("b"), "x" * 100)
+    cache.get(_key("a"))                 # a is now most recently used
+    cache.put(_key("c"), "x" * 100)      # over budget -> evict b
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("a")) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_scorer_skips_llm_on_repeat(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with FakeOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        scorer = EquityScorer()
+        scorer.retry = RetryPolicy(base_delay=0.01)
+        first = scorer.evaluate("NVIDIA (NVDA) Buy.", "a.pdf")
+        second = scorer.evaluate("NVIDIA (NVDA) Buy.", "renamed.pdf")
+
+    assert first == second
+    assert len(server.requests) == 1
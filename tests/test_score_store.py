@@ -0,0 +1,68 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.storage.score_store import ScoreStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ScoreStore(str(tmp_path / "scores.db"))
+
+
+def _record(file, ticker="NVDA", type="single_stock", ts="2025-01-01T00:00:00"):
+    return {"file": file, "ticker": ticker, "type": type, "timestamp": ts, "overall_score": 4.2}
+
+
+def test_filters_and_newest_first(store):
+    store.append_many([
+        _record("a.pdf", ts="2025-01-01T00:00:00"),
+        _record("b.pdf", ticker="MACRO", type="macro_deep_dive", ts="2025-01-02T00:00:00"),
+        _record("c.pdf", ts="2025-01-03T00:00:00"),
+    ])
+    assert [r["file"] for r in store.iter_records()] == ["c.pdf", "b.pdf", "a.pdf"]
+    assert [r["file"] for r in store.iter_records(ticker="NVDA")] == ["c.pdf", "a.pdf"]
+    assert store.count(type="macro_deep_dive") == 1
+    assert store.has_file("b.pdf") and not store.has_file("z.pdf")
+
+
+def test_append_many_is_atomic(store):
+    with pytest.raises(Exception):
+        store.append_many([_record("ok.pdf"), {"file": None}])  # file is NOT NULL
+    assert store.count() == 0
+
+
+def test_migration_runs_once(tmp_path, store):
+    legacy = tmp_path / "scores.json"
+    legacy.write_text(json.dumps([_record("new.pdf", ts="2025-02-01"), _record("old.pdf", ts="2025-01-01")]))
+
+    assert store.migrate_from_json(str(legacy)) == 2
+    assert store.migrate_from_json(str(legacy)) == 0
+    records = store.all()
+    assert [r["file"] for r in records] == ["new.pdf", "old.pdf"]
+    assert store.get(records[0]["id"])["file"] == "new.pdf"
+
+
+def test_threads_share_one_store(store):
+    done = threading.Event()
+
+    def write(n):
+        store.append(_record(f"{n}.pdf", ts=f"2025-01-01T00:00:{n % 60:02d}"))
+
+    def read():
+        seen = 0
+        while not done.is_set():
+            assert store.count() >= seen
+            seen = store.count()
+            store.summaries(limit=5)
+            store.find_content_hash("missing")
+            sum(1 for _ in store.iter_records(limit=20))
+            store.aggregates.ticker_scores("NVDA")
+        return seen
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        readers = [pool.submit(read) for _ in range(4)]
+        list(pool.map(write, range(200)))
+        done.set()
+        assert all(r.result() <= 200 for r in readers)
+    assert store.count() == 200 and store.aggregates.watermark() == 200
@@ -0,0 +1,77 @@
+import json
+import os
+import time
+import pytest
+from src.data.http import TokenBucket
+from src.data.sec_edgar import SECEdgarClient
+from src.data.ticker_index import get_shared_index
+from benchmarks.fakes import FakeSECServer, company_facts
+
+
+@pytest.fixture
+def sec(tmp_path):
+    with FakeSECServer() as server:
+        get_shared_index().url = server.tickers_url
+        client = SECEdgarClient(cache_dir=str(tmp_path / "sec"))
+        client.BASE_URL = server.facts_url
+        client.http.limiter = TokenBucket(rate=100, burst=10)
+        client.server = server
+        yield client
+
+
+def test_latest_revenue_cached_on_disk(sec):
+    assert sec.get_latest_revenue("NVDA") == (60_922_000_000.0, 2024, "10-K")
+    assert sec.get_latest_revenue("NVDA") == (60_922_000_000.0, 2024, "10-K")
+    assert len(sec.server.paths("/api/xbrl")) == 1
+
+
+def test_stale_facts_are_revalidated_not_redownloaded(sec):
+    sec.get_latest_revenue("NVDA")
+    expired = time.time() - sec.CACHE_TTL - 60
+    sec.store.ingest("0001045810", sec.server.facts["0001045810"],
+                     etag=sec.store.filer("0001045810")["etag"], fetched_at=expired)
+
+    assert sec.get_latest_revenue("NVDA")[0] == 60_922_000_000.0
+    assert sec.http.not_modified == 1
+    assert sec.store.filer("0001045810")["fetched_at"] > expired  # fresh for another TTL
+    assert [etag is not None for path, etag, _ in sec.server.requests if path.startswith("/api")] == [False, True]
+
+
+def test_legacy_json_cache_is_imported_without_a_request(sec):
+    os.makedirs(sec.cache_dir)
+    with open(os.path.join(sec.cache_dir, "0001045810.json"), "w") as f:
+        json.dump(company_facts(1045810, "NVIDIA CORP", {2022: 26_914_000_000}), f)
+
+    assert sec.get_latest_revenue("NVDA") == (26_914_000_000.0, 2022, "10-K")
+    assert sec.server.paths("/api/xbrl") == []
+
+
+def test_failed_refresh_keeps_stale_facts(sec):
+    sec.store.ingest("0001045810", sec.server.facts["0001045810"], fetched_at=1)
+    sec.BASE_URL = "http://127.0.0.1:9/CIK{cik}.json"
+    sec.http.max_attempts = 1
+    assert sec.sync_facts("0001045810") == "stale"
+    assert sec.get_latest_revenue("NVDA")[1] == 2024
+
+
+def test_unknown_ticker_makes_no_facts_request(sec):
+    assert sec.get_latest_revenue("ZZZZ") is None
+    assert sec.server.paths("/api/xbrl") == []
+
+
+def test_fact_set_is_annual_by_fiscal_year(sec):
+    payload = company_facts(1045810, "NVIDIA CORP", {2023: 26_974_000_000, 2024: 60_922_000_000})
+    payload["facts"]["us-gaap"]["Revenues"]["units"]["USD"].append(  # a quarter reported in the 10-K
+        {"start": "2023-11-01", "end": "2024-01-31", "val": 22_103_000_000, "fy": 2024, "fp": "FY",
+         "form": "10-K", "filed": "2024-03-01", "accn": "0001045810-24-000001"})
+    payload["facts"]["us-gaap"]["EarningsPerShareDiluted"] = {"units": {"USD/shares": [
+        {"start": "2023-02-01", "end": "2024-01-31", "val": 11.93, "fy": 2024, "fp": "FY",
+         "form": "10-K", "filed": "2024-03-01", "accn": "0001045810-24-000001"}]}}
+    sec.server.facts["0001045810"] = payload
+
+    facts = sec.get_fact_set("NVDA")
+    assert facts.revenue == {2023: 26_974_000_000.0, 2024: 60_922_000_000.0}
+    assert facts.get("revenue") == (60_922_000_000.0, 2024)
+    assert facts.get("eps", 2024) == (11.93, 2024)
+    assert facts.get("gross_margin") is None
+    assert sec.get_fact_set("ZZZZ") is None
@@ -0,0 +1,45 @@
+import pytest
+from src.data.ticker_extractor import TickerExtractor
+
+KNOWN = {"NVDA", "AMD", "INTC", "AAPL", "MSFT", "AVGO", "AI", "KEY", "CAT"}
+
+
+@pytest.fixture
+def extractor():
+    return TickerExtractor(KNOWN)
+
+
+def test_name_and_label_forms_win(extractor):
+    assert extractor.extract("NVIDIA (NVDA) Buy - data center beat") == "NVDA"
+    assert extractor.extract("Ticker: avgo is not a ticker. Symbol: AVGO") == "AVGO"
+    assert extractor.extract("Broadcom Inc. (NASDAQ: AVGO) Overweight") == "AVGO"
+
+
+def test_ranks_by_frequency_and_position(extractor):
+    text = ("Semis weekly: AMD (AMD) initiation.\n" + "AMD share gains continue. " * 3
+            + "x" * 600 + "\nWe compare with NVIDIA (NVDA) and INTC.")
+    ranked = extractor.rank(text)
+    assert [c.ticker for c in ranked] == ["AMD", "NVDA", "INTC"]
+    assert ranked[0].mentions == 5 and ranked[0].first_position < 500
+    assert ranked[0].confidence > 0.5
+    assert abs(sum(c.confidence for c in ranked) - 1) < 0.01
+
+
+def test_name_dropping_macro_note_is_not_routed(extractor):
+    text = "Macro weekly. Rates fall; AAPL, MSFT and NVDA rallied. KEY RISKS: AI capex."
+    assert extractor.extract(text) is None
+    assert {c.ticker for c in extractor.rank(text)} == {"AAPL", "MSFT", "NVDA"}  # KEY / AI are stop words
+
+
+def test_single_bare_header_ticker_is_routed(extractor):
+    assert extractor.extract("NVDA: Q3 preview\nGuidance should be raised.") == "NVDA"
+    assert extractor.extract("Earnings per Share (EPS) and Artificial Intelligence (AI)") is None
+
+
+def test_known_tickers_resolved_lazily():
+    calls = []
+    extractor = TickerExtractor(lambda: calls.append(1) or {"NVDA"})
+    assert calls == []
+    extractor.extract("NVDA")
+    extractor.extract("NVDA")
+    assert calls == [1]
@@ -0,0 +1,73 @@
+import time
+import pytest
+from src.data.company_lookup import CompanyLookup
+from src.data.ticker_index import TickerIndex, get_shared_index
+from benchmarks.fakes import FakeSECServer
+
+
+@pytest.fixture
+def sec_server():
+    with FakeSECServer() as server:
+        yield server
+
+
+def test_lookups_by_ticker_cik_and_name(tmp_path, sec_server):
+    index = TickerIndex(str(tmp_path / "t.db"), url=sec_server.tickers_url)
+    assert index.by_ticker("nvda") == ("NVDA", "0001045810", "NVIDIA CORP")
+    assert [r[0] for r in index.by_cik("1652044")] == ["GOOG", "GOOGL"]
+    assert [r[2] for r in index.search_name("NV")] == ["NVE CORP", "NVIDIA CORP"]
+    assert index.search_name("") == []
+    assert index.tickers() == {"NVDA", "GOOGL", "GOOG", "AVGO", "NVEC"}
+    assert len(sec_server.paths()) == 1  # TTL checked once, not per lookup
+
+
+def test_fresh_copy_is_reused_across_processes(tmp_path, sec_server):
+    TickerIndex(str(tmp_path / "t.db"), url=sec_server.tickers_url).by_ticker("NVDA")
+    again = TickerIndex(str(tmp_path / "t.db"), url=sec_server.tickers_url)  # e.g. another worker process
+    assert again.by_ticker("AVGO")[2] == "Broadcom Inc."
+    assert len(sec_server.paths()) == 1
+
+
+def test_stale_copy_refreshes_and_survives_failed_refresh(tmp_path, sec_server):
+    index = TickerIndex(str(tmp_path / "t.db"), ttl_days=1, url=sec_server.tickers_url)
+    index.load_rows([("OLD", "0000000001", "Old Co", "old co")], fetched_at=time.time() - 2 * 86400)
+    assert index.by_ticker("OLD") is None and index.by_ticker("NVDA") is not None
+
+    offline = TickerIndex(str(tmp_path / "t.db"), ttl_days=0, url="http://127.0.0.1:9/unreachable", timeout=1)
+    assert offline.by_ticker("NVDA") is not None
+
+
+def test_company_lookup_shares_one_index(sec_server):
+    shared = get_shared_index()
+    shared.url = sec_server.tickers_url
+    a, b = CompanyLookup(), CompanyLookup()
+    assert a.index is b.index is shared
+
+    assert a.lookup("AAPL").fiscal_year_end == "09-30"  # hard-coded entries keep their metadata
+    assert sec_server.paths() == []
+    assert a.lookup("avgo").cik == "0001730168"
+    assert b.lookup("XXXX") is None
+    assert [c.ticker for c in b.lookup_cik("0001652044")] == ["GOOG", "GOOGL"]
+    assert b.search("alpha", limit=1)[0].name == "Alphabet Inc."
+    assert len(sec_server.paths()) == 1
+
+
+def test_stale_copy_revalidated_with_etag(tmp_path, sec_server):
+    index = TickerIndex(str(tmp_path / "t.db"), url=sec_server.tickers_url)
+    assert index.refresh() and index.refresh()
+    assert [etag is not None for _, etag, _ in sec_server.requests] == [False, True]  # 2nd answered 304
+    assert len(index) == 5
+
+
+def test_long_running_process_sees_ttl_refresh(tmp_path, sec_server, monkeypatch):
+    monkeypatch.setattr("src.data.ticker_index.RECHECK_S", 0)
+    index = TickerIndex(str(tmp_path / "t.db"), ttl_days=0.3 / 86400, url=sec_server.tickers_url)
+    index.load_rows([("OLDCO", "0000000001", "Old Co", "old co")])
+    lookup = CompanyLookup(index)
+    assert lookup.extract_ticker("Old Co (OLDCO) initiation") == "OLDCO"
+    assert sec_server.paths() == []
+
+    time.sleep(0.4)  # the daemon outlives the TTL
+    assert lookup.extract_ticker("Broadcom (AVGO) initiation") == "AVGO"
+    assert "OLDCO" not in lookup.extractor.known
+    assert len(sec_server.paths()) == 1
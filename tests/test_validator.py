@@ -1,16 +1,32 @@
 import pytest
+from src.data.fact_store import FactSet
 from src.evaluation.financial_validator import FinancialValidator
 
 # --- MOCKS ---
 class MockSECClient:
-    def get_latest_revenue(self, ticker):
+    def __init__(self):
+        self.calls = 0
+
+    def get_fact_set(self, ticker):
+        self.calls += 1
         if ticker == "NVDA":
-            return (60_000_000_000.0, 2024, "10-K") 
+            return FactSet(
+                revenue={2023: 26_974_000_000.0, 2024: 60_000_000_000.0},
+                gross_profit={2024: 44_301_000_000.0},
+                operating_cash_flow={2024: 28_090_000_000.0},
+                capex={2024: 1_069_000_000.0},
+                eps_diluted={2024: 11.93},
+            )
         return None
 
 class MockYahooClient:
-    def get_consensus(self, ticker):
-        return {} 
+    def __init__(self, consensus_eps=None):
+        self.consensus_eps = consensus_eps
+        self.calls = 0
+
+    def get_consensus(self, ticker, need=None):
+        self.calls += 1
+        return {"consensus_eps": self.consensus_eps}
 
 @pytest.fixture
 def validator():
@@ -32,3 +48,34 @@ def test_revenue_hallucination(validator):
     results = validator.validate(text, "NVDA")
     rev_check = next(r for r in results if "Revenue" in r['metric'])
     assert rev_check['status'] == "MISMATCH"
+
+
+def test_multi_metric_report_single_fetch(validator):
+    """Every claim is checked; SEC and Yahoo are each hit once per document"""
+    validator.yahoo = MockYahooClient(consensus_eps=2.80)
+    text = ("NVDA FY2024: revenue of $60.9 billion, gross margin of 73.8%, free cash flow of $27.0B "
+            "and diluted EPS of $11.93. Revenue of $60.9 billion was a record. "
+            "For next year we model EPS of $2.95.")
+    results = validator.validate(text, "NVDA")
+    by_metric = {r['metric']: r for r in results}
+
+    assert by_metric["Revenue (FY2024)"]['status'] == "MATCH"
+    assert by_metric["Gross Margin (FY2024)"]['status'] == "MATCH"
+    assert by_metric["Free Cash Flow (FY2024)"]['status'] == "MATCH"
+    assert by_metric["Diluted EPS (FY2024)"]['status'] == "MATCH"
+    assert by_metric["Forward EPS (Consensus)"]['status'] == "MATCH"
+    assert len(results) == 5  # the repeated revenue claim is reported once
+    assert results[0]['offset'] == text.index("revenue")
+    assert validator.sec.calls == 1 and validator.yahoo.calls == 1
+
+def test_year_specific_and_skipped_claims(validator):
+    """Claims are compared with their own fiscal year; quarterly and guidance claims are not checked"""
+    text = ("FY2023 revenue of $27.0 billion. Q3 2024 revenue of $18.1 billion. "
+            "Management guided revenue to $80 billion next year.")
+    results = validator.validate(text, "NVDA")
+    assert [r['metric'] for r in results] == ["Revenue (FY2023)"]
+    assert results[0]['status'] == "MATCH"
+
+def test_no_sources_needed_no_fetch(validator):
+    assert validator.validate("No numbers in this note.", "NVDA") == []
+    assert validator.sec.calls == 0 and validator.yahoo.calls == 0
@@ -0,0 +1,155 @@
+import threading
+import time
+from functools import partial
+import fitz
+import pytest
+from main import persist_job, run_job
+from src.ingestion.pdf_loader import PDFLoader
+from src.pipeline.daemon import IngestDaemon
+from src.pipeline.job_queue import JobQueue
+from src.pipeline.watcher import FolderWatcher, looks_complete
+from src.storage.file_index import ProcessedIndex
+from src.storage.score_store import ScoreStore
+
+
+def _pdf_bytes(text: str) -> bytes:
+    pdf = fitz.open()
+    pdf.new_page().insert_text((36, 36), text)
+    data = pdf.tobytes()
+    pdf.close()
+    return data
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.mark.parametrize("backend", ["poll", "watchdog"])
+def test_partial_writes_are_debounced(tmp_path, backend):
+    if backend == "watchdog":
+        pytest.importorskip("watchdog")
+    ready = []
+    watcher = FolderWatcher(str(tmp_path), ready.append, settle_s=0.2, poll_s=0.05, backend=backend)
+    assert watcher.start() == backend
+
+    data = _pdf_bytes("Buy NVDA")
+    path = tmp_path / "note.pdf"
+    with open(path, "wb") as f:
+        f.write(data[: len(data) // 2])  # copy still in progress: no trailer yet
+        f.flush()
+        time.sleep(0.6)
+        assert ready == []
+        f.write(data[len(data) // 2:])
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    assert _wait_for(lambda: ready == ["note.pdf"])
+    time.sleep(0.3)
+    watcher.stop()
+    assert ready == ["note.pdf"]  # reported once
+
+
+def test_initial_scan_and_incomplete_file_timeout(tmp_path):
+    (tmp_path / "existing.pdf").write_bytes(_pdf_bytes("Old note"))
+    (tmp_path / "broken.pdf").write_bytes(b"%PDF-1.7 truncated")
+    assert not looks_complete(str(tmp_path / "broken.pdf"))
+
+    ready = []
+    watcher = FolderWatcher(str(tmp_path), ready.append, settle_s=0.05, poll_s=0.05, backend="poll", max_wait_s=0.5)
+    watcher.start()
+    assert _wait_for(lambda: ready == ["existing.pdf"], timeout=0.4)
+    assert _wait_for(lambda: sorted(ready) == ["broken.pdf", "existing.pdf"])  # handed off after max_wait_s
+    watcher.stop()
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    loader = PDFLoader(raw_dir=str(raw), entity_file=str(tmp_path / "none.json"))
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    index = ProcessedIndex(str(tmp_path / "index.db"))
+    jobs = JobQueue(str(tmp_path / "jobs.db"), retry_delay_s=0)
+    return raw, loader, store, index, jobs
+
+
+def _record(doc, job=None):
+    return {"file": doc["source"], "content_hash": doc["content_hash"], "type": "single_stock",
+            "ticker": "NVDA", "timestamp": "2025-01-01T09:00:00", "overall_score": 4.0}
+
+
+def _daemon(pipeline, process_fn=_record, **kwargs):
+    raw, loader, store, index, jobs = pipeline
+    return IngestDaemon(jobs, index, str(raw), partial(run_job, loader=loader, process_fn=process_fn),
+                        partial(persist_job, store=store, index=index), poll_s=0.05, **kwargs)
+
+
+def test_daemon_persists_and_skips_duplicates(pipeline):
+    raw, loader, store, index, jobs = pipeline
+    (raw / "a.pdf").write_bytes(_pdf_bytes("Buy NVDA"))
+    (raw / "copy_of_a.pdf").write_bytes((raw / "a.pdf").read_bytes())
+
+    results = []
+    daemon = _daemon(pipeline, workers=2, on_result=lambda d, r: results.append(r))
+    daemon.start()
+    daemon.submit("a.pdf")
+    assert _wait_for(daemon.idle)
+    daemon.submit("copy_of_a.pdf")
+    daemon.submit("a.pdf")
+    assert _wait_for(daemon.idle)
+    assert daemon.stop() == 0
+
+    assert store.count() == 1 and len(results) == 1
+    assert daemon.stats.completed == 1 and daemon.stats.skipped == 2
+    assert index.check(str(raw / "a.pdf")).processed
+
+
+def test_daemon_stop_keeps_queued_work_for_next_start(pipeline):
+    raw, loader, store, index, jobs = pipeline
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        (raw / name).write_bytes(_pdf_bytes(f"Note {name}"))
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow(doc, job=None):
+        started.set()
+        release.wait(5)
+        return _record(doc)
+
+    daemon = _daemon(pipeline, slow, workers=1)
+    daemon.start()
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        daemon.submit(name)
+    assert started.wait(5)
+    threading.Timer(0.2, release.set).start()
+    assert daemon.stop() == 2  # the document in hand is finished, the rest stays queued
+    assert [r["file"] for r in store.all()] == ["a.pdf"]
+    assert not index.check(str(raw / "b.pdf")).processed
+
+    restarted = _daemon(pipeline, workers=2)  # nothing is resubmitted: the queue remembers
+    restarted.start()
+    assert _wait_for(lambda: store.count() == 3)
+    assert restarted.stop() == 0
+
+
+def test_daemon_retries_failed_attempts_from_checkpoints(pipeline):
+    raw, loader, store, index, jobs = pipeline
+    (raw / "a.pdf").write_bytes(_pdf_bytes("Buy NVDA"))
+    attempts = []
+
+    def flaky(doc, job=None):
+        attempts.append(job.checkpoint("ingested") is not None)
+        return _record(doc) if len(attempts) > 1 else None  # e.g. a transient OpenAI error
+
+    daemon = _daemon(pipeline, flaky, workers=1)
+    daemon.start()
+    daemon.submit("a.pdf")
+    assert _wait_for(lambda: store.count() == 1)
+    daemon.stop()
+    assert attempts == [True, True]  # the retry reused the extracted text
+    assert daemon.stats.failed == 1 and daemon.stats.completed == 1
+    assert jobs.get(index.check(str(raw / "a.pdf")).sha256)["attempts"] == 2
@@ -0,0 +1,67 @@
+import threading
+import time
+import pytest
+from src.data.yahoo_finance import QuoteCache, YahooFinanceClient
+from benchmarks.fakes import FakeYFinance as StubYFinance
+
+
+@pytest.fixture
+def backend():
+    return StubYFinance()
+
+
+def test_consensus_cached_in_memory_and_on_disk(backend, tmp_path):
+    db = str(tmp_path / "quotes.db")
+    client = YahooFinanceClient(backend=backend, cache=QuoteCache(db))
+    assert client.get_consensus("nvda") == {"current_price": 120.5, "consensus_eps": 2.95,
+                                            "target_mean": 140.0, "market_cap": 2.9e12}
+    client.get_consensus("NVDA")
+    assert backend.calls == ["NVDA"]
+
+    restarted = YahooFinanceClient(backend=backend, cache=QuoteCache(db))  # new process, same disk cache
+    assert restarted.get_consensus("NVDA")["current_price"] == 120.5
+    assert backend.calls == ["NVDA"]
+
+
+def test_price_ttl_shorter_than_estimates(backend, tmp_path):
+    client = YahooFinanceClient(backend=backend, cache=QuoteCache(None, ttls={"price": 0, "estimates": 3600}))
+    client.get_consensus("AAPL")
+    time.sleep(0.01)
+
+    assert client.get_consensus("AAPL", need=["estimates"])["consensus_eps"] == 7.1
+    assert backend.calls == ["AAPL"]  # only the price expired
+    client.get_consensus("AAPL")
+    assert backend.calls == ["AAPL", "AAPL"]
+
+
+def test_concurrent_lookups_share_one_fetch(tmp_path):
+    backend = StubYFinance(latency=0.2)
+    client = YahooFinanceClient(backend=backend, cache=QuoteCache(None))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get_consensus("NVDA"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert backend.calls == ["NVDA"]
+    assert len(results) == 8 and all(r["consensus_eps"] == 2.95 for r in results)
+    assert client.stats()["coalesced"] == 7
+
+
+def test_batch_lookup_fetches_missing_tickers_in_parallel(tmp_path):
+    backend = StubYFinance(latency=0.2)
+    client = YahooFinanceClient(backend=backend, cache=QuoteCache(None))
+    client.get_consensus("NVDA")
+
+    start = time.monotonic()
+    quotes = client.get_consensus_many(["NVDA", "aapl", "ZZZZ", "AAPL"])
+    assert time.monotonic() - start < 0.35  # AAPL and ZZZZ fetched side by side
+
+    assert list(quotes) == ["NVDA", "AAPL", "ZZZZ"]
+    assert quotes["AAPL"]["current_price"] == 225.0
+    assert quotes["ZZZZ"] == {"current_price": None, "consensus_eps": None, "target_mean": None, "market_cap": None}
+    assert sorted(backend.calls) == ["AAPL", "NVDA", "ZZZZ"]
+
+    client.get_consensus("ZZZZ")  # failures are not cached
+    assert backend.calls.count("ZZZZ") == 2